@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from main import SessionLocal, User, get_password_hash
+from main import SessionLocal, User, get_password_hash, prepare_database
 
 
 def add_user(username: str, password: str):
@@ -16,6 +16,7 @@ def add_user(username: str, password: str):
     Returns:
         None: Prints success or error messages.
     """
+    prepare_database()
     db: Session = SessionLocal()
     try:
         # Check if user already exists
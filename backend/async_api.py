@@ -0,0 +1,613 @@
+import os
+from datetime import date
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from bookings import booking_lookback, longest_booking_statement, overlapping_trip_statement
+from conditional import etag_matches, make_etag, not_modified
+from database import engine_options, install_sqlite_pragmas
+from fuel_ledger import (
+    accumulate_fuel_entry,
+    fuel_endpoint_statements,
+    fuel_entry,
+    fuel_ledger_statement,
+    is_fuel_fill,
+    new_fuel_ledger,
+    refresh_fuel_totals,
+)
+import main
+from main import (
+    DATABASE_URL,
+    MAX_PAGE_SIZE,
+    TAG_DRIVERS,
+    TAG_FUEL_EXPENSES,
+    TAG_MAINTENANCE,
+    TAG_TRIPS,
+    TAG_VEHICLES,
+    DashboardStats,
+    DashboardSummary,
+    DueItemSchema,
+    Driver,
+    DriverCreate,
+    DriverSchema,
+    DriverUpdate,
+    FleetFuelAnalytics,
+    FuelExpense,
+    FuelExpenseCreate,
+    FuelExpenseSchema,
+    FuelExpenseStats,
+    FuelExpenseUpdate,
+    Maintenance,
+    MaintenanceCostData,
+    MaintenanceCreate,
+    MaintenanceSchema,
+    MonthlyTripData,
+    Trip,
+    TripCreate,
+    TripSchema,
+    Vehicle,
+    VehicleCreate,
+    VehicleSchema,
+    VehicleUpdate,
+)
+from models import DueItem, VehicleFuelLedger
+from pagination import list_statement, page_rows, paginate, render_page, split_page
+from revisions import current_revision_statement, entity_revision_statement
+from rollups import (
+    ROLLUP_DRIVERS,
+    ROLLUP_MAINTENANCE_COST,
+    ROLLUP_TOTAL_PERIOD,
+    ROLLUP_TRIPS,
+    ROLLUP_VEHICLES,
+    month_key,
+    rollup_months_statement,
+    rollup_upsert,
+    rollup_value_statement,
+)
+from upcoming import due_item_dicts, due_item_schemas, due_item_source_statement, due_items_statement
+
+# Async drivers used for each sync database URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Derives the async driver URL from the sync DATABASE_URL.
+
+    Args:
+        url (str): The sync database URL.
+
+    Returns:
+        str: The same database addressed through its async driver.
+    """
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", async_database_url(DATABASE_URL))
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+install_sqlite_pragmas(async_engine.sync_engine)
+main.query_monitor.install(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: async_engine.sync_engine.dispose(close=False))
+
+
+async def get_async_db():
+    """
+    Dependency to get an async database session.
+
+    Yields:
+        AsyncSession: The database session.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+router = APIRouter()
+
+# The handlers below mirror the sync ones in main, sharing their statement
+# builders and result shaping, and await every query through the async
+# driver. The stats cache, the invalidation bus and the live dashboard are
+# blocking to reach, so they are called through the threadpool, as is the
+# NumPy fleet analysis. Bulk bookings, availability search, CSV imports,
+# exports, auth and jobs stay on the sync handlers.
+
+
+async def entity_revision(db: AsyncSession, model) -> int:
+    """
+    Returns the revision of the last insert, update or delete of a model.
+    """
+    return max(revision or 0 for revision in (await db.execute(entity_revision_statement(model))).one())
+
+
+async def revisioned_list(
+    db: AsyncSession, model, response: Response, if_none_match: Optional[str], since: Optional[int],
+    limit: Optional[int], cursor: Optional[str], fields: Optional[str],
+    expand: Optional[str] = None, schema=None, expansions: Optional[dict] = None, accept: Optional[str] = None
+):
+    """
+    Serves a list endpoint as a conditional GET, or as a delta with ?since=;
+    see main.revisioned_list.
+    """
+    related = main.list_related_models(since, limit, cursor, fields, expand, expansions)
+    revision = await entity_revision(db, model)
+    related_revisions = [await entity_revision(db, related_model) for related_model in related]
+    etag, headers, fast = main.list_etag(model, revision, related_revisions, since, limit, cursor, fields, expand, accept)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, headers)
+    if since is not None:
+        changed_statement, tombstones_statement = main.delta_statements(model, schema, since)
+        rows = (await db.execute(changed_statement)).all()
+        tombstones = (await db.execute(tombstones_statement)).all()
+        return main.delta_response(rows, tombstones, schema, revision, headers, fast, accept)
+
+    statement, columns, relations = list_statement(model, fields, expand, schema, expansions, fast)
+    statement, page_size = paginate(statement, model, limit, cursor)
+    rows, next_cursor = split_page(page_rows(await db.execute(statement), columns, relations), page_size)
+    result = render_page(rows, next_cursor, response, columns, relations, schema, expansions, fast, accept)
+    (result if isinstance(result, Response) else response).headers.update(headers)
+    return result
+
+
+async def conditional_stats(db: AsyncSession, response: Response, if_none_match: Optional[str], endpoint: str, compute):
+    """
+    Serves a stats endpoint as a conditional GET; see main.conditional_stats.
+    """
+    etag = main.stats_etag(endpoint, (await db.execute(current_revision_statement())).scalar() or 0)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return await compute()
+
+
+async def bump_rollup(db: AsyncSession, metric: str, period: str, delta: float):
+    """
+    Adds delta to a rollup value inside the caller's transaction.
+    """
+    if delta:
+        await db.execute(rollup_upsert(db.get_bind().dialect.name, metric, period, delta))
+
+
+async def refresh_due_items(db: AsyncSession, vehicle_ids):
+    """
+    Recomputes the due items of the given vehicles inside the caller's transaction.
+    """
+    vehicle_ids = sorted(set(vehicle_ids))
+    if not vehicle_ids:
+        return
+    await db.flush()
+    await db.execute(
+        delete(DueItem).where(DueItem.vehicle_id.in_(vehicle_ids)).execution_options(synchronize_session=False)
+    )
+    rows = due_item_dicts(await db.execute(due_item_source_statement(vehicle_ids)))
+    if rows:
+        await db.execute(insert(DueItem), rows)
+
+
+async def apply_fuel_entry(db: AsyncSession, entry, sign: int):
+    """
+    Adds (sign=1) or removes (sign=-1) one record from its vehicle's ledger;
+    see fuel_ledger.apply_fuel_entry.
+    """
+    ledger = (await db.execute(fuel_ledger_statement(entry.vehicle_id))).scalars().first()
+    if ledger is None:
+        ledger = new_fuel_ledger(entry.vehicle_id)
+        db.add(ledger)
+        await db.flush()
+    accumulate_fuel_entry(ledger, entry, sign)
+    if sign < 0 and is_fuel_fill(entry) and entry.id in (ledger.first_fill_id, ledger.last_fill_id):
+        for set_fill, statement in fuel_endpoint_statements(ledger, entry.id).items():
+            set_fill(ledger, (await db.execute(statement)).scalars().first())
+    refresh_fuel_totals(ledger)
+
+
+async def get_or_404(db: AsyncSession, model, record_id: int, detail: str):
+    """
+    Loads a record by id or raises 404 Not Found.
+    """
+    record = await db.get(model, record_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return record
+
+
+@router.get("/vehicles")
+async def get_vehicles(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await revisioned_list(
+        db, Vehicle, response, if_none_match, since, limit, cursor, fields, schema=VehicleSchema, accept=accept
+    )
+
+
+@router.post("/vehicles")
+async def create_vehicle(vehicle: VehicleCreate, db: AsyncSession = Depends(get_async_db)):
+    db_vehicle = Vehicle(**vehicle.model_dump())
+    db.add(db_vehicle)
+    await bump_rollup(db, ROLLUP_VEHICLES, ROLLUP_TOTAL_PERIOD, 1)
+    await db.flush()
+    await refresh_due_items(db, [db_vehicle.id])
+    await db.commit()
+    await run_in_threadpool(main.notify_change, TAG_VEHICLES)
+    await db.refresh(db_vehicle)
+    return db_vehicle
+
+
+@router.put("/vehicles/{vehicle_id}")
+async def update_vehicle(vehicle_id: int, vehicle: VehicleUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_vehicle = await get_or_404(db, Vehicle, vehicle_id, "Vehicle not found")
+    for field, value in vehicle.model_dump().items():
+        setattr(db_vehicle, field, value)
+    await refresh_due_items(db, [vehicle_id])
+    await db.commit()
+    await run_in_threadpool(main.notify_change, TAG_VEHICLES)
+    await db.refresh(db_vehicle)
+    return db_vehicle
+
+
+@router.delete("/vehicles/{vehicle_id}")
+async def delete_vehicle(vehicle_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_vehicle = await get_or_404(db, Vehicle, vehicle_id, "Vehicle not found")
+    await db.delete(db_vehicle)
+    await bump_rollup(db, ROLLUP_VEHICLES, ROLLUP_TOTAL_PERIOD, -1)
+    await refresh_due_items(db, [vehicle_id])
+    await db.commit()
+    await run_in_threadpool(main.notify_change, TAG_VEHICLES)
+    return {"detail": "Vehicle deleted"}
+
+
+@router.get("/drivers")
+async def get_drivers(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await revisioned_list(
+        db, Driver, response, if_none_match, since, limit, cursor, fields, schema=DriverSchema, accept=accept
+    )
+
+
+@router.post("/drivers")
+async def create_driver(driver: DriverCreate, db: AsyncSession = Depends(get_async_db)):
+    db_driver = Driver(name=driver.name, vehicle_id=driver.vehicle_id)
+    db.add(db_driver)
+    await bump_rollup(db, ROLLUP_DRIVERS, ROLLUP_TOTAL_PERIOD, 1)
+    await db.commit()
+    await run_in_threadpool(main.notify_change, TAG_DRIVERS)
+    await db.refresh(db_driver)
+    return db_driver
+
+
+@router.put("/drivers/{driver_id}")
+async def update_driver(driver_id: int, driver: DriverUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_driver = await get_or_404(db, Driver, driver_id, "Driver not found")
+    db_driver.name = driver.name
+    db_driver.vehicle_id = driver.vehicle_id
+    await db.commit()
+    await run_in_threadpool(main.notify_change, TAG_DRIVERS)
+    await db.refresh(db_driver)
+    return db_driver
+
+
+@router.delete("/drivers/{driver_id}")
+async def delete_driver(driver_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_driver = await get_or_404(db, Driver, driver_id, "Driver not found")
+    await db.delete(db_driver)
+    await bump_rollup(db, ROLLUP_DRIVERS, ROLLUP_TOTAL_PERIOD, -1)
+    await db.commit()
+    await run_in_threadpool(main.notify_change, TAG_DRIVERS)
+    return {"detail": "Driver deleted"}
+
+
+@router.get("/trips", response_model=List[TripSchema])
+async def get_trips(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await revisioned_list(
+        db, Trip, response, if_none_match, since, limit, cursor, fields, expand,
+        TripSchema, main.TRIP_EXPANSIONS, accept
+    )
+
+
+@router.post("/trips")
+async def create_trip(trip: TripCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Books a trip after checking the driver and vehicle for double-booking
+    with two bounded range probes, as main.book_trip does without the
+    in-process schedule index.
+    """
+    lookback = booking_lookback((await db.execute(longest_booking_statement())).scalar())
+    for column, resource_id in ((Trip.driver_id, trip.driver_id), (Trip.vehicle_id, trip.vehicle_id)):
+        statement = overlapping_trip_statement(column, resource_id, trip.start_time, trip.end_time, lookback)
+        if (await db.execute(statement)).scalar() is not None:
+            raise HTTPException(status_code=400, detail="Driver or vehicle is already booked for this time period")
+
+    db_trip = Trip(
+        driver_id=trip.driver_id,
+        vehicle_id=trip.vehicle_id,
+        start_location=trip.start_location,
+        end_location=trip.end_location,
+        start_time=trip.start_time,
+        end_time=trip.end_time
+    )
+    db.add(db_trip)
+    await bump_rollup(db, ROLLUP_TRIPS, ROLLUP_TOTAL_PERIOD, 1)
+    await bump_rollup(db, ROLLUP_TRIPS, month_key(trip.start_time), 1)
+    await db.commit()
+    await run_in_threadpool(main.notify_change, TAG_TRIPS)
+    await db.refresh(db_trip)
+    return db_trip
+
+
+@router.get("/maintenance", response_model=List[MaintenanceSchema])
+async def get_maintenance_records(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await revisioned_list(
+        db, Maintenance, response, if_none_match, since, limit, cursor, fields, expand,
+        MaintenanceSchema, main.MAINTENANCE_EXPANSIONS, accept
+    )
+
+
+@router.post("/maintenance", response_model=MaintenanceSchema)
+async def create_maintenance_record(maintenance: MaintenanceCreate, db: AsyncSession = Depends(get_async_db)):
+    db_maintenance = Maintenance(**maintenance.model_dump())
+    db.add(db_maintenance)
+    await bump_rollup(db, ROLLUP_MAINTENANCE_COST, month_key(maintenance.maintenance_date), maintenance.cost)
+    await refresh_due_items(db, [maintenance.vehicle_id])
+    await db.commit()
+    await run_in_threadpool(main.notify_change, TAG_MAINTENANCE)
+    await db.refresh(db_maintenance)
+    return db_maintenance
+
+
+@router.get("/maintenance/vehicle/{vehicle_id}", response_model=List[MaintenanceSchema])
+async def get_maintenance_by_vehicle(vehicle_id: int, db: AsyncSession = Depends(get_async_db)):
+    return (await db.execute(select(Maintenance).where(Maintenance.vehicle_id == vehicle_id))).scalars().all()
+
+
+@router.get("/upcoming", response_model=List[DueItemSchema])
+async def get_upcoming(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    within_days: Optional[int] = Query(None, ge=0),
+    kind: Optional[Literal["maintenance", "license"]] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if limit is None and within_days is None:
+        limit = 50
+    endpoint = f"upcoming?limit={limit}&within_days={within_days}&kind={kind}"
+
+    async def compute():
+        today = date.today()
+        return due_item_schemas(today, await db.execute(due_items_statement(today, limit, within_days, kind)))
+
+    return await conditional_stats(db, response, if_none_match, endpoint, compute)
+
+
+@router.get("/fuel-expenses", response_model=List[FuelExpenseSchema])
+async def get_fuel_expenses(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await revisioned_list(
+        db, FuelExpense, response, if_none_match, since, limit, cursor, fields, expand,
+        FuelExpenseSchema, main.FUEL_EXPENSE_EXPANSIONS, accept
+    )
+
+
+@router.post("/fuel-expenses", response_model=FuelExpenseSchema)
+async def create_fuel_expense(expense: FuelExpenseCreate, db: AsyncSession = Depends(get_async_db)):
+    db_expense = FuelExpense(**expense.model_dump())
+    db.add(db_expense)
+    await db.flush()
+    await apply_fuel_entry(db, fuel_entry(db_expense), 1)
+    await db.commit()
+    await run_in_threadpool(main.notify_change, TAG_FUEL_EXPENSES)
+    await db.refresh(db_expense)
+    return db_expense
+
+
+@router.put("/fuel-expenses/{expense_id}", response_model=FuelExpenseSchema)
+async def update_fuel_expense(expense_id: int, expense: FuelExpenseUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_expense = await get_or_404(db, FuelExpense, expense_id, "Expense record not found")
+    await apply_fuel_entry(db, fuel_entry(db_expense), -1)
+    for field, value in expense.model_dump().items():
+        setattr(db_expense, field, value)
+    await apply_fuel_entry(db, fuel_entry(db_expense), 1)
+    await db.commit()
+    await run_in_threadpool(main.notify_change, TAG_FUEL_EXPENSES)
+    await db.refresh(db_expense)
+    return db_expense
+
+
+@router.delete("/fuel-expenses/{expense_id}")
+async def delete_fuel_expense(expense_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_expense = await get_or_404(db, FuelExpense, expense_id, "Expense record not found")
+    await apply_fuel_entry(db, fuel_entry(db_expense), -1)
+    await db.delete(db_expense)
+    await db.commit()
+    await run_in_threadpool(main.notify_change, TAG_FUEL_EXPENSES)
+    return {"detail": "Expense record deleted"}
+
+
+@router.get("/fuel-expenses/vehicle/{vehicle_id}", response_model=List[FuelExpenseSchema])
+async def get_fuel_expenses_by_vehicle(vehicle_id: int, db: AsyncSession = Depends(get_async_db)):
+    return (await db.execute(select(FuelExpense).where(FuelExpense.vehicle_id == vehicle_id))).scalars().all()
+
+
+@router.get("/fuel-expenses/stats/fleet", response_model=FleetFuelAnalytics)
+async def get_fleet_fuel_analytics(
+    response: Response,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    etag = make_etag("fuel-expenses/stats/fleet", await entity_revision(db, FuelExpense), date_from, date_to)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    rows = (await db.execute(main.fleet_fuel_statement(date_from, date_to))).all()
+    return await run_in_threadpool(main.fleet_fuel_report, rows, date_from, date_to)
+
+
+@router.get("/fuel-expenses/stats/vehicle/{vehicle_id}", response_model=FuelExpenseStats)
+async def get_fuel_expense_stats_by_vehicle(vehicle_id: int, db: AsyncSession = Depends(get_async_db)):
+    ledger = (await db.execute(
+        select(VehicleFuelLedger).where(VehicleFuelLedger.vehicle_id == vehicle_id)
+    )).scalars().first()
+    return main.fuel_expense_stats(ledger)
+
+
+async def monthly_trip_counts(db: AsyncSession) -> List[MonthlyTripData]:
+    """
+    Computes monthly trip counts for the last 12 months.
+    """
+    window_start = main.stats_window_start()
+    first_month_count = (await db.execute(main.first_month_trips_statement(window_start))).scalar()
+    months = (await db.execute(rollup_months_statement(ROLLUP_TRIPS, month_key(window_start)))).all()
+    return main.monthly_trip_data(window_start, first_month_count, months)
+
+
+async def monthly_maintenance_costs(db: AsyncSession) -> List[MaintenanceCostData]:
+    """
+    Computes monthly maintenance costs for the last 12 months.
+    """
+    window_start = main.stats_window_start()
+    first_month_cost = (await db.execute(main.first_month_costs_statement(window_start))).scalar()
+    months = (await db.execute(rollup_months_statement(ROLLUP_MAINTENANCE_COST, month_key(window_start)))).all()
+    return main.monthly_cost_data(window_start, first_month_cost, months)
+
+
+async def build_dashboard_stats(db: AsyncSession, maintenance_costs_by_month: List[MaintenanceCostData]) -> DashboardStats:
+    """
+    Builds the summary statistics from the rollups.
+    """
+    counts = {}
+    for field, (metric, period) in main.dashboard_rollups().items():
+        counts[field] = int((await db.execute(rollup_value_statement(metric, period))).scalar() or 0)
+    return main.dashboard_stats(counts, maintenance_costs_by_month)
+
+
+async def build_dashboard(db: AsyncSession) -> DashboardSummary:
+    """
+    Computes the complete dashboard summary.
+    """
+    maintenance_costs = await monthly_maintenance_costs(db)
+    return DashboardSummary(
+        stats=await build_dashboard_stats(db, maintenance_costs),
+        monthly_trips=await monthly_trip_counts(db),
+        maintenance_costs=maintenance_costs
+    )
+
+
+@router.get("/stats/summary", response_model=DashboardStats)
+async def get_dashboard_summary(
+    response: Response, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)
+):
+    async def compute():
+        return await build_dashboard_stats(db, await monthly_maintenance_costs(db))
+
+    return await conditional_stats(db, response, if_none_match, "stats/summary", lambda: main.stats_cache.get_or_set_async(
+        main.stats_cache_key("stats/summary"), (TAG_VEHICLES, TAG_DRIVERS, TAG_TRIPS, TAG_MAINTENANCE), compute
+    ))
+
+
+@router.get("/stats/monthly-trips", response_model=List[MonthlyTripData])
+async def get_monthly_trips(
+    response: Response, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)
+):
+    return await conditional_stats(db, response, if_none_match, "stats/monthly-trips", lambda: main.stats_cache.get_or_set_async(
+        main.stats_cache_key("stats/monthly-trips"), (TAG_TRIPS,), lambda: monthly_trip_counts(db)
+    ))
+
+
+@router.get("/stats/maintenance-costs", response_model=List[MaintenanceCostData])
+async def get_maintenance_costs(
+    response: Response, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)
+):
+    return await conditional_stats(db, response, if_none_match, "stats/maintenance-costs", lambda: main.stats_cache.get_or_set_async(
+        main.stats_cache_key("stats/maintenance-costs"), (TAG_MAINTENANCE,), lambda: monthly_maintenance_costs(db)
+    ))
+
+
+@router.get("/stats/dashboard", response_model=DashboardSummary)
+async def get_complete_dashboard(
+    response: Response, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)
+):
+    return await conditional_stats(db, response, if_none_match, "stats/dashboard", lambda: main.stats_cache.get_or_set_async(
+        main.stats_cache_key("stats/dashboard"),
+        (TAG_VEHICLES, TAG_DRIVERS, TAG_TRIPS, TAG_MAINTENANCE),
+        lambda: build_dashboard(db)
+    ))
+
+
+def install_async_routes(app: FastAPI):
+    """
+    Replaces the sync routes of app with the async ones from this module.
+
+    Routes without an async counterpart (bulk bookings, availability, auth,
+    exports, CSV imports, jobs) stay on the sync path, and so does booking
+    single trips while the in-process schedule index is enabled, since the
+    index is guarded by a thread lock.
+
+    Args:
+        app (FastAPI): The application to switch to async database access.
+    """
+    routes = [
+        route for route in router.routes
+        if not (main.trip_schedule is not None and route.path == "/trips" and "POST" in route.methods)
+    ]
+    replaced = {(route.path, method) for route in routes for method in route.methods}
+    app.router.routes = [
+        route for route in app.router.routes
+        if not (isinstance(route, APIRoute) and any((route.path, method) in replaced for method in route.methods))
+    ] + routes
@@ -0,0 +1,513 @@
+"""
+Load-testing benchmark for the Fleet Manager API.
+
+Seeds a synthetic fleet into a separate database, drives the API with a
+fixed set of scenarios and writes latency percentiles, throughput and peak
+RSS to a JSON file that can be compared between commits.
+
+Targets:
+    inprocess: requests go straight to the ASGI app through httpx, measuring
+        the application without network or server overhead.
+    uvicorn: the app is started with `uvicorn --workers N` on a local port
+        and driven over HTTP.
+
+Examples:
+    python benchmark.py --target inprocess --vehicles 200 --years 2
+    python benchmark.py --target uvicorn --workers 4 --concurrency 64
+    python benchmark.py --compare old.json new.json
+
+Comparing the default and the fast list serialization on large pages:
+    python benchmark.py --page-size 1000 --output lists-default.json
+    python benchmark.py --page-size 1000 --fast-lists --msgpack --output lists-fast.json
+    python benchmark.py --compare lists-default.json lists-fast.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import httpx
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+LIST_ENDPOINTS = ["/vehicles", "/drivers", "/trips", "/maintenance", "/fuel-expenses"]
+SEED_CHUNK_SIZE = 10000
+SERVER_START_TIMEOUT = 60
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Fleet Manager API under load.")
+    parser.add_argument("--target", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=4, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765, help="uvicorn port")
+    parser.add_argument("--database", help="SQLite file to seed and benchmark (default: a temporary file)")
+    parser.add_argument("--reuse", action="store_true", help="benchmark an already seeded --database as is")
+    parser.add_argument("--vehicles", type=int, default=100)
+    parser.add_argument("--drivers", type=int, default=100)
+    parser.add_argument("--years", type=float, default=1.0, help="years of history to generate")
+    parser.add_argument("--trips-per-week", type=int, default=5, help="trips per driver per week")
+    parser.add_argument("--fuel-per-month", type=int, default=4, help="fill-ups per vehicle per month")
+    parser.add_argument("--maintenance-per-year", type=int, default=4, help="services per vehicle per year")
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per scenario")
+    parser.add_argument("--token-requests", type=int, default=50, help="measured requests for /token (bcrypt bound)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per scenario")
+    parser.add_argument("--page-size", type=int, default=100, help="limit used for list endpoints")
+    parser.add_argument("--no-stats-cache", action="store_true", help="disable the /stats response cache")
+    parser.add_argument("--fast-lists", action="store_true",
+                        help="serve lists through the orjson fast path (FAST_LIST_RESPONSES=1)")
+    parser.add_argument("--msgpack", action="store_true", help="add list scenarios requesting MessagePack")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for data and requests")
+    parser.add_argument("--output", help="result file (default: bench-<target>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"),
+                        help="print the differences between two result files and exit")
+    return parser.parse_args(argv)
+
+
+# Seeding
+
+def chunked(rows, size: int = SEED_CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate_trips(args, rng: random.Random, start: datetime):
+    """
+    Yields trips for every driver on its own vehicle, at most one per day.
+    """
+    days = int(args.years * 365)
+    probability = min(args.trips_per_week / 7, 1.0)
+    for driver_id in range(1, args.drivers + 1):
+        vehicle_id = (driver_id - 1) % args.vehicles + 1
+        # Drivers sharing a vehicle get different hours of the day
+        hour = 6 + ((driver_id - 1) // args.vehicles) % 16
+        for day in range(days):
+            if rng.random() >= probability:
+                continue
+            start_time = start + timedelta(days=day, hours=hour)
+            yield {
+                "driver_id": driver_id,
+                "vehicle_id": vehicle_id,
+                "start_location": f"Depot {rng.randint(1, 20)}",
+                "end_location": f"Site {rng.randint(1, 200)}",
+                "start_time": start_time,
+                "end_time": start_time + timedelta(minutes=rng.randint(20, 55)),
+            }
+
+
+def generate_fuel_expenses(args, rng: random.Random, start: date):
+    months = int(args.years * 12)
+    for vehicle_id in range(1, args.vehicles + 1):
+        odometer = rng.uniform(10000, 150000)
+        for month in range(months):
+            for fill in range(args.fuel_per_month):
+                expense_date = start + timedelta(days=month * 30 + fill * 30 // max(args.fuel_per_month, 1))
+                odometer += rng.uniform(300, 700)
+                quantity = rng.uniform(35, 60)
+                yield {
+                    "vehicle_id": vehicle_id,
+                    "expense_type": "fuel",
+                    "fuel_type": "diesel",
+                    "quantity": quantity,
+                    "cost": quantity * rng.uniform(1.5, 2.0),
+                    "odometer_reading": odometer,
+                    "expense_date": expense_date,
+                }
+            yield {
+                "vehicle_id": vehicle_id,
+                "expense_type": "toll",
+                "fuel_type": None,
+                "quantity": None,
+                "cost": rng.uniform(5, 40),
+                "odometer_reading": None,
+                "expense_date": start + timedelta(days=month * 30 + 15),
+            }
+
+
+def generate_maintenance(args, rng: random.Random, start: date):
+    services = int(args.years * args.maintenance_per_year)
+    interval = int(365 / max(args.maintenance_per_year, 1))
+    for vehicle_id in range(1, args.vehicles + 1):
+        for service in range(services):
+            maintenance_date = start + timedelta(days=service * interval + rng.randint(0, 10))
+            yield {
+                "vehicle_id": vehicle_id,
+                "description": rng.choice(["Oil change", "Tyres", "Brakes", "Inspection"]),
+                "cost": rng.uniform(80, 1500),
+                "maintenance_date": maintenance_date,
+                "next_maintenance_date": maintenance_date + timedelta(days=interval),
+            }
+
+
+def seed_database(main, args) -> dict:
+    """
+    Fills an empty database with a synthetic fleet and the benchmark user.
+
+    Rows are inserted with Core executemany and stamped with a change
+    revision like the API's own bulk inserts; the materialized aggregates
+    (rollups, fuel ledgers, due items) are rebuilt once at the end with the
+    helper the rebuild-stats job uses.
+
+    Returns:
+        dict: The number of rows per table.
+    """
+    from sqlalchemy import insert
+
+    rng = random.Random(args.seed)
+    history_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=int(args.years * 365))
+    counts = {}
+    db = main.SessionLocal()
+    try:
+        tables = [
+            (main.Vehicle, ({"name": f"Vehicle {i}", "make": rng.choice(["Toyota", "Ford", "Isuzu"]),
+                             "model": "Van", "year_of_car": rng.randint(2012, 2024),
+                             "license_expiry_date": date.today() + timedelta(days=rng.randint(-30, 720))}
+                            for i in range(1, args.vehicles + 1))),
+            (main.Driver, ({"name": f"Driver {i}", "vehicle_id": (i - 1) % args.vehicles + 1,
+                            "number_of_experience": rng.randint(0, 30)}
+                           for i in range(1, args.drivers + 1))),
+            (main.Trip, generate_trips(args, rng, history_start)),
+            (main.FuelExpense, generate_fuel_expenses(args, rng, history_start.date())),
+            (main.Maintenance, generate_maintenance(args, rng, history_start.date())),
+        ]
+        for model, rows in tables:
+            counts[model.__tablename__] = 0
+            for chunk in chunked(rows):
+                main.stamp_rows(db, chunk)
+                db.execute(insert(model.__table__), chunk)
+                counts[model.__tablename__] += len(chunk)
+            db.commit()
+        db.add(main.User(email=BENCH_EMAIL, hashed_password=main.get_password_hash(BENCH_PASSWORD)))
+        db.commit()
+        main.rebuild_aggregates(db)
+    finally:
+        db.close()
+    return counts
+
+
+def prepare_database(args) -> str:
+    """
+    Points DATABASE_URL at the benchmark database and seeds it.
+
+    Must run before main is imported anywhere in this process.
+
+    Returns:
+        str: The database URL.
+    """
+    path = args.database or os.path.join(tempfile.mkdtemp(prefix="fleet-bench-"), "bench.db")
+    if not args.reuse:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    url = f"sqlite:///{os.path.abspath(path)}"
+    os.environ["DATABASE_URL"] = url
+    os.environ.setdefault("STATS_CACHE_BACKEND", "memory")
+    if args.no_stats_cache:
+        os.environ["STATS_CACHE_TTL_SECONDS"] = "0"
+    os.environ["FAST_LIST_RESPONSES"] = "1" if args.fast_lists else "0"
+    return url
+
+
+# Scenarios
+
+def scenario_requests(args, rng: random.Random):
+    """
+    Builds the scenarios as name -> factory of (method, path, kwargs).
+    """
+    history_days = int(args.years * 365)
+    future_start = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=30)
+
+    def token():
+        return "POST", "/token", {"data": {"username": BENCH_EMAIL, "password": BENCH_PASSWORD}}
+
+    def list_endpoint(path, accept=None):
+        def request():
+            kwargs = {"params": {"limit": args.page_size}}
+            if accept:
+                kwargs["headers"] = {"Accept": accept}
+            return "GET", path, kwargs
+        return request
+
+    def create_trip():
+        # Half the probes land in the seeded history and mostly conflict,
+        # the other half book free slots in the future
+        driver_id = rng.randint(1, args.drivers)
+        vehicle_id = (driver_id - 1) % args.vehicles + 1
+        if rng.random() < 0.5:
+            start_time = datetime.now() - timedelta(days=rng.randint(1, max(history_days, 1)))
+            start_time = start_time.replace(hour=6 + ((driver_id - 1) // args.vehicles) % 16, minute=10)
+        else:
+            start_time = future_start + timedelta(days=rng.randint(0, 3650), hours=rng.randint(0, 23))
+        return "POST", "/trips", {"json": {
+            "driver_id": driver_id,
+            "vehicle_id": vehicle_id,
+            "start_location": "Depot 1",
+            "end_location": "Site 1",
+            "start_time": start_time.isoformat(),
+            "end_time": (start_time + timedelta(minutes=30)).isoformat(),
+        }}
+
+    def dashboard():
+        return "GET", "/stats/dashboard", {}
+
+    scenarios = {"token": token}
+    for path in LIST_ENDPOINTS:
+        scenarios["list" + path.replace("/", "_").replace("-", "_")] = list_endpoint(path)
+    if args.msgpack:
+        for path in LIST_ENDPOINTS:
+            scenarios["list" + path.replace("/", "_").replace("-", "_") + "_msgpack"] = list_endpoint(path, "application/msgpack")
+    scenarios["users_me"] = lambda: ("GET", "/users/me", {})
+    scenarios["create_trip"] = create_trip
+    scenarios["stats_dashboard"] = dashboard
+    return scenarios
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    position = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[position]
+
+
+def summarize(latencies, statuses, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    status_counts = {}
+    for status in statuses:
+        status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+    return {
+        "requests": len(latencies),
+        "errors": sum(1 for status in statuses if status >= 500 or status == 0),
+        "status_counts": status_counts,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ordered, 0.50) * 1000, 3),
+            "p95": round(percentile(ordered, 0.95) * 1000, 3),
+            "p99": round(percentile(ordered, 0.99) * 1000, 3),
+            "mean": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        },
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, make_request, count: int, concurrency: int, headers: dict) -> dict:
+    """
+    Sends count requests with at most concurrency in flight.
+    """
+    latencies, statuses = [], []
+    remaining = iter(range(count))
+
+    async def worker():
+        for _ in remaining:
+            method, path, kwargs = make_request()
+            request_headers = {**headers, **kwargs.pop("headers", {})}
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, headers=request_headers, **kwargs)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            statuses.append(status)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, count)))))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+async def run_scenarios(client: httpx.AsyncClient, args) -> dict:
+    rng = random.Random(args.seed)
+    response = await client.post("/token", data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    results = {}
+    for name, make_request in scenario_requests(args, rng).items():
+        count = args.token_requests if name == "token" else args.requests
+        if args.warmup:
+            await run_scenario(client, make_request, min(args.warmup, count), args.concurrency, headers)
+        results[name] = await run_scenario(client, make_request, count, args.concurrency, headers)
+        latency = results[name]["latency_ms"]
+        print(f"{name:24} {results[name]['throughput_rps']:>9.1f} req/s  "
+              f"p50 {latency['p50']:>8.2f} ms  p95 {latency['p95']:>8.2f} ms  p99 {latency['p99']:>8.2f} ms")
+    return results
+
+
+# Targets
+
+def process_peak_rss_mb(pid: int):
+    """
+    Returns the peak RSS (VmHWM) of a process and its descendants in MiB.
+
+    Reads /proc, so it is only available on Linux.
+    """
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        total_kb += int(line.split()[1])
+            with open(f"/proc/{current}/task/{current}/children") as children:
+                pending.extend(int(child) for child in children.read().split())
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+        except OSError:
+            return None
+    return round(total_kb / 1024, 1)
+
+
+def own_peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def benchmark_inprocess(args) -> dict:
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        scenarios = await run_scenarios(client, args)
+    return {"scenarios": scenarios, "peak_rss_mb": own_peak_rss_mb()}
+
+
+async def wait_for_server(base_url: str, server: subprocess.Popen):
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+async def benchmark_uvicorn(args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=os.environ.copy()
+    )
+    try:
+        await wait_for_server(base_url, server)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            scenarios = await run_scenarios(client, args)
+        peak_rss_mb = process_peak_rss_mb(server.pid)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    return {"scenarios": scenarios, "peak_rss_mb": peak_rss_mb}
+
+
+# Results
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare_results(baseline_path: str, candidate_path: str):
+    """
+    Prints throughput and latency changes per scenario between two runs.
+    """
+    with open(baseline_path) as baseline_file, open(candidate_path) as candidate_file:
+        baseline, candidate = json.load(baseline_file), json.load(candidate_file)
+
+    def change(old, new):
+        return f"{(new - old) / old * 100:+7.1f}%" if old else "    n/a"
+
+    print(f"{'scenario':24} {'req/s':>18} {'p50 ms':>18} {'p95 ms':>18} {'p99 ms':>18}")
+    for name, new in candidate["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            print(f"{name:24} (new)")
+            continue
+        cells = [f"{new['throughput_rps']:>9.1f} {change(old['throughput_rps'], new['throughput_rps'])}"]
+        for key in ("p50", "p95", "p99"):
+            cells.append(f"{new['latency_ms'][key]:>9.2f} {change(old['latency_ms'][key], new['latency_ms'][key])}")
+        print(f"{name:24} " + " ".join(cells))
+    print(f"{'peak RSS MiB':24} {baseline.get('peak_rss_mb')} -> {candidate.get('peak_rss_mb')}")
+
+
+def main_cli(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        compare_results(*args.compare)
+        return
+
+    database_url = prepare_database(args)
+    import main
+    main.prepare_database()
+
+    seeded = None
+    if not args.reuse:
+        started = time.perf_counter()
+        seeded = seed_database(main, args)
+        print(f"Seeded {seeded} in {time.perf_counter() - started:.1f}s into {database_url}")
+
+    runner = benchmark_inprocess if args.target == "inprocess" else benchmark_uvicorn
+    result = asyncio.run(runner(args))
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "target": args.target,
+        "workers": args.workers if args.target == "uvicorn" else 1,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database_url": database_url,
+        "stats_cache": not args.no_stats_cache,
+        "fast_lists": args.fast_lists,
+        "scale": {
+            "vehicles": args.vehicles,
+            "drivers": args.drivers,
+            "years": args.years,
+            "trips_per_week": args.trips_per_week,
+            "fuel_per_month": args.fuel_per_month,
+            "maintenance_per_year": args.maintenance_per_year,
+            "rows": seeded,
+        },
+        **result,
+    }
+    output = args.output or f"bench-{args.target}-{commit}.json"
+    with open(output, "w") as result_file:
+        json.dump(report, result_file, indent=2, sort_keys=True)
+    print(f"Peak RSS {report['peak_rss_mb']} MiB; results written to {output}")
+
+
+if __name__ == "__main__":
+    main_cli()
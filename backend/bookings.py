@@ -0,0 +1,155 @@
+"""
+Queries that read the trips booked around a time window. Every one bounds
+start_time below by longest_booking(), so the range scanned on the
+scheduling indexes follows the window rather than the whole trip history.
+"""
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from models import Trip
+from scheduling import IntervalIndex, as_naive
+
+
+def longest_booking(db: Session) -> timedelta:
+    """
+    Returns the duration of the longest trip, read from ix_trips_duration_seconds.
+
+    A trip overlapping a window must start less than this before the
+    window does, which bounds the start_time range that overlap checks and
+    availability scans read no matter how much history the table holds.
+    """
+    return booking_lookback(db.execute(longest_booking_statement()).scalar())
+
+
+def longest_booking_statement():
+    """
+    Selects the duration_seconds of the longest trip.
+    """
+    return select(func.max(Trip.duration_seconds))
+
+
+def booking_lookback(seconds) -> timedelta:
+    """
+    Turns the longest_booking_statement() result into the lookback bound.
+    """
+    # duration_seconds is rounded down; pad so the bound is never short
+    return timedelta(seconds=(seconds or 0) + 1)
+
+
+def find_overlapping_trip(db: Session, column, resource_id: int, start_time: datetime, end_time: datetime,
+                          lookback: timedelta):
+    """
+    Finds a trip booking a single driver or vehicle within a time window.
+
+    The equality on the resource column plus the start_time range, bounded
+    below by the longest booking, lets the database answer this with one
+    bounded range probe on the matching scheduling index.
+
+    Args:
+        db (Session): The database session.
+        column: Trip.driver_id or Trip.vehicle_id.
+        resource_id (int): The driver or vehicle id.
+        start_time (datetime): The window start.
+        end_time (datetime): The window end.
+        lookback (timedelta): The longest_booking() of the trips table.
+
+    Returns:
+        int or None: The id of an overlapping trip, or None.
+    """
+    return db.execute(overlapping_trip_statement(column, resource_id, start_time, end_time, lookback)).scalar()
+
+
+def overlapping_trip_statement(column, resource_id: int, start_time: datetime, end_time: datetime,
+                               lookback: timedelta):
+    """
+    Selects the id of a trip booking a driver or vehicle within a time
+    window; see find_overlapping_trip.
+    """
+    return select(Trip.id).where(
+        column == resource_id,
+        Trip.start_time > start_time - lookback,
+        Trip.start_time < end_time,
+        Trip.end_time > start_time
+    ).limit(1)
+
+
+# Drivers or vehicles per query when loading the bookings of a batch
+BULK_LOOKUP_CHUNK = 500
+
+
+def load_booked_intervals(db: Session, trips: List):
+    """
+    Loads the existing bookings that could collide with a batch of trips.
+
+    Runs one query per chunk of drivers and per chunk of vehicles, restricted
+    to the overall time span of the batch and, like find_overlapping_trip,
+    bounded below by the longest booking.
+
+    Args:
+        db (Session): The database session.
+        trips (List): The requested trips, TripCreate or alike.
+
+    Returns:
+        dict: (kind, resource_id) -> list of (start_time, end_time, trip_id).
+    """
+    booked = {}
+    if not trips:
+        return booked
+    window_start = min(as_naive(trip.start_time) for trip in trips)
+    window_end = max(as_naive(trip.end_time) for trip in trips)
+    lookback = longest_booking(db)
+    for kind, column in (("driver", Trip.driver_id), ("vehicle", Trip.vehicle_id)):
+        resource_ids = sorted({getattr(trip, kind + "_id") for trip in trips})
+        for offset in range(0, len(resource_ids), BULK_LOOKUP_CHUNK):
+            rows = db.query(column, Trip.start_time, Trip.end_time, Trip.id).filter(
+                column.in_(resource_ids[offset:offset + BULK_LOOKUP_CHUNK]),
+                Trip.start_time > window_start - lookback,
+                Trip.start_time < window_end,
+                Trip.end_time > window_start
+            ).all()
+            for resource_id, start_time, end_time, trip_id in rows:
+                booked.setdefault((kind, resource_id), []).append((start_time, end_time, trip_id))
+    return booked
+
+
+
+def load_window_bookings(db: Session, windows: List):
+    """
+    Loads the trips that overlap any of the windows into one interval index.
+
+    Windows are merged into disjoint spans first and each span is read with
+    one range scan on ix_trips_start_time, starting longest_booking() before
+    the span.
+
+    Args:
+        db (Session): The database session.
+        windows (List): The windows to search, AvailabilityWindow or alike.
+
+    Returns:
+        tuple: (IntervalIndex of the trips, dict trip_id -> (driver_id, vehicle_id)).
+    """
+    index = IntervalIndex()
+    resources = {}
+    if not windows:
+        return index, resources
+    lookback = longest_booking(db)
+    spans = []
+    for window in sorted(windows, key=lambda window: as_naive(window.start_time)):
+        start, end = as_naive(window.start_time), as_naive(window.end_time)
+        if spans and start - lookback <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+    for span_start, span_end in spans:
+        rows = db.query(Trip.start_time, Trip.end_time, Trip.id, Trip.driver_id, Trip.vehicle_id).filter(
+            Trip.start_time >= span_start - lookback,
+            Trip.start_time < span_end,
+            Trip.end_time > span_start
+        ).order_by(Trip.start_time).all()
+        for start_time, end_time, trip_id, driver_id, vehicle_id in rows:
+            index.add(start_time, end_time, trip_id)
+            resources[trip_id] = (driver_id, vehicle_id)
+    return index, resources
@@ -0,0 +1,304 @@
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+from urllib.parse import urlencode
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+
+
+class LRUCacheBackend:
+    """
+    In-process LRU cache with per-entry expiry and tag invalidation.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._generations = {}
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for tag in entry[2]:
+                keys = self._tags.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tags[tag]
+
+    def get(self, key: str):
+        """
+        Returns the cached value for key, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def generation(self, tags) -> int:
+        """
+        Returns the sum of the invalidation counters of tags.
+
+        Counters only grow, so an unchanged sum means none of the tags was
+        invalidated in between.
+        """
+        with self._lock:
+            return sum(self._generations.get(tag, 0) for tag in tags)
+
+    def set(self, key: str, value, ttl: float, tags, generation=None) -> bool:
+        """
+        Stores value under key for ttl seconds, tagged with tags.
+
+        With generation given, nothing is stored if the tags have been
+        invalidated since generation() returned it.
+
+        Returns:
+            bool: True if the value was stored.
+        """
+        with self._lock:
+            if generation is not None and sum(self._generations.get(tag, 0) for tag in tags) != generation:
+                return False
+            self._drop(key)
+            self._entries[key] = (value, time.monotonic() + ttl, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def invalidate(self, tags):
+        """
+        Removes every entry carrying any of the given tags and advances
+        their invalidation counters.
+        """
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+
+class SQLiteCacheBackend:
+    """
+    Cache backend stored in a SQLite file shared by every worker process.
+
+    Stands in for an external shared cache such as Redis: entries written
+    or invalidated by one process are seen by all others using the same file.
+    Values must be JSON serializable. The invalidation counters of the tags
+    live in the same file, so a value computed in one process while another
+    invalidates its tags is not stored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.evictions = 0
+        self._connect()
+
+    def _connect(self):
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key))")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_generations (tag TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_entries WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def generation(self, tags) -> int:
+        tags = list(tags)
+        placeholders = ",".join("?" * len(tags))
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COALESCE(SUM(generation), 0) FROM cache_generations WHERE tag IN ({placeholders})", tags
+            ).fetchone()[0]
+
+    def set(self, key: str, value, ttl: float, tags, generation=None) -> bool:
+        tags = list(tags)
+        placeholders = ",".join("?" * len(tags))
+        payload = json.dumps(value)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if generation is None:
+                    stored = self._conn.execute(
+                        "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, payload, time.time() + ttl),
+                    ).rowcount
+                else:
+                    # Stored only if no other process invalidated the tags meanwhile
+                    stored = self._conn.execute(
+                        "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) SELECT ?, ?, ? "
+                        f"WHERE (SELECT COALESCE(SUM(generation), 0) FROM cache_generations WHERE tag IN ({placeholders})) = ?",
+                        (key, payload, time.time() + ttl, *tags, generation),
+                    ).rowcount
+                if stored:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in tags]
+                    )
+                self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return bool(stored)
+
+    def invalidate(self, tags):
+        tags = list(tags)
+        placeholders = ",".join("?" * len(tags))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO cache_generations (tag, generation) VALUES (?, 1) "
+                    "ON CONFLICT (tag) DO UPDATE SET generation = generation + 1",
+                    [(tag,) for tag in tags],
+                )
+                self._conn.execute(
+                    f"DELETE FROM cache_entries WHERE key IN (SELECT key FROM cache_tags WHERE tag IN ({placeholders}))", tags
+                )
+                self._conn.execute(f"DELETE FROM cache_tags WHERE tag IN ({placeholders})", tags)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._conn.execute("DELETE FROM cache_tags")
+
+    def after_fork(self):
+        """
+        Opens a fresh connection in a forked child; SQLite connections must
+        not be shared across processes.
+        """
+        self._connect()
+
+
+class ResponseCache:
+    """
+    TTL response cache keyed by endpoint and parameters.
+
+    Values are stored in their JSON-compatible form so any backend can hold
+    them. Write paths call invalidate() with the entity tags they touched.
+    """
+
+    def __init__(self, backend, ttl: float = 60):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(endpoint: str, **params) -> str:
+        """
+        Builds the cache key for an endpoint and its parameters.
+        """
+        query = urlencode(sorted((name, value) for name, value in params.items() if value is not None))
+        return f"{endpoint}?{query}" if query else endpoint
+
+    def get_or_set(self, key: str, tags, compute):
+        """
+        Returns the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key (str): The cache key.
+            tags (iterable): Entity tags that invalidate this entry.
+            compute (callable): Produces the value on a miss.
+
+        Returns:
+            The JSON-compatible cached value.
+        """
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        generation = self.backend.generation(tags)
+        value = jsonable_encoder(compute())
+        # Skip storing a value computed while a write, in this process or
+        # another one sharing the backend, was invalidating its tags
+        self.backend.set(key, value, self.ttl, tags, generation)
+        return value
+
+    async def get_or_set_async(self, key: str, tags, compute):
+        """
+        get_or_set for handlers running on the event loop.
+
+        The backend calls, which may wait on the shared store, run in the
+        threadpool and compute is awaited.
+
+        Args:
+            key (str): The cache key.
+            tags (iterable): Entity tags that invalidate this entry.
+            compute (callable): Returns an awaitable producing the value on a miss.
+
+        Returns:
+            The JSON-compatible cached value.
+        """
+        value = await run_in_threadpool(self.backend.get, key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        generation = await run_in_threadpool(self.backend.generation, tags)
+        value = jsonable_encoder(await compute())
+        await run_in_threadpool(self.backend.set, key, value, self.ttl, tags, generation)
+        return value
+
+    def invalidate(self, *tags):
+        """
+        Drops every entry tagged with any of tags.
+        """
+        self.backend.invalidate(tags)
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters and occupancy for sizing the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.backend),
+            "evictions": self.backend.evictions,
+            "ttl_seconds": self.ttl,
+        }
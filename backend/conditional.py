@@ -0,0 +1,49 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Response
+
+# Response header carrying the change revision a list is current as of;
+# pass it back as ?since= to fetch only what changed afterwards
+REVISION_HEADER = "X-Revision"
+
+
+def make_etag(*parts) -> str:
+    """
+    Builds a strong ETag from the values a representation is derived from.
+
+    Args:
+        *parts: The revisions and request parameters that determine the body.
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks an If-None-Match header against the current ETag.
+
+    If-None-Match uses the weak comparison, so a W/ prefix is ignored.
+
+    Args:
+        if_none_match (Optional[str]): The header value, a list of tags or "*".
+        etag (str): The ETag of the current representation.
+
+    Returns:
+        bool: True if the client's copy is still current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str, headers: Optional[dict] = None) -> Response:
+    """
+    Returns an empty 304 Not Modified response carrying the ETag.
+    """
+    return Response(status_code=304, headers={"ETag": etag, **(headers or {})})
@@ -0,0 +1,131 @@
+import csv
+from typing import List
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+
+# Rows validated and inserted per transaction
+IMPORT_CHUNK_SIZE = 5000
+# Row errors listed in a report; further errors are only counted
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportHeaderError(ValueError):
+    """
+    Raised when a CSV file lacks columns required by the target schema.
+    """
+
+
+def required_columns(schema) -> List[str]:
+    """
+    Returns the fields of a Pydantic model that have no default.
+    """
+    return [name for name, field in schema.model_fields.items() if field.is_required()]
+
+
+def iter_csv_chunks(reader: csv.DictReader, chunk_size: int = IMPORT_CHUNK_SIZE):
+    """
+    Reads CSV records in chunks without loading the whole file.
+
+    Empty cells are dropped so that optional fields fall back to their
+    defaults and missing required fields are reported as such.
+
+    Args:
+        reader (csv.DictReader): The reader over the CSV file.
+        chunk_size (int): The number of records per chunk.
+
+    Yields:
+        tuple: (line_numbers, records) for each chunk, where line_numbers[i]
+            is the line of the file on which records[i] ends.
+    """
+    line_numbers, records = [], []
+    for row in reader:
+        records.append({key: value for key, value in row.items() if key is not None and value not in ("", None)})
+        line_numbers.append(reader.line_num)
+        if len(records) >= chunk_size:
+            yield line_numbers, records
+            line_numbers, records = [], []
+    if records:
+        yield line_numbers, records
+
+
+def validate_chunk(adapter: TypeAdapter, records: list):
+    """
+    Validates a chunk of records as one batch.
+
+    Args:
+        adapter (TypeAdapter): A TypeAdapter for a list of the target schema.
+        records (list): The raw CSV records.
+
+    Returns:
+        tuple: (valid_positions, rows, errors) where rows are the validated
+            records as plain dicts and errors maps a record's position in the
+            chunk to its list of (field, message) problems.
+    """
+    errors = {}
+    try:
+        return list(range(len(records))), adapter.dump_python(adapter.validate_python(records)), errors
+    except ValidationError as exc:
+        for error in exc.errors(include_url=False):
+            position, *field = error["loc"]
+            errors.setdefault(position, []).append((".".join(str(part) for part in field) or None, error["msg"]))
+    valid_positions = [position for position in range(len(records)) if position not in errors]
+    rows = adapter.dump_python(adapter.validate_python([records[position] for position in valid_positions]))
+    return valid_positions, rows, errors
+
+
+def import_csv(db, lines, schema, store_rows, chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """
+    Streams CSV records into the database in validated, chunked transactions.
+
+    Each chunk is validated as a batch against schema; valid rows are handed
+    to store_rows, which inserts them (typically as a single executemany) and
+    updates any derived data, and the chunk is committed. Invalid rows are
+    skipped and reported with their line number. A chunk that fails in the
+    database is rolled back and reported as a whole.
+
+    Args:
+        db (Session): The database session.
+        lines: An iterable of text lines whose first line is the CSV header.
+        schema: The Pydantic model each record must satisfy.
+        store_rows: Callable (db, rows) inserting a list of validated dicts.
+        chunk_size (int): The number of records per transaction.
+
+    Returns:
+        dict: The import report with imported, rejected and errors.
+
+    Raises:
+        ImportHeaderError: If the header lacks a required column.
+    """
+    adapter = TypeAdapter(List[schema])
+    imported = rejected = 0
+    report_errors = []
+
+    def add_error(line: int, field, detail: str):
+        if len(report_errors) < MAX_REPORTED_ERRORS:
+            report_errors.append({"line": line, "field": field, "detail": detail})
+
+    reader = csv.DictReader(lines)
+    missing = [name for name in required_columns(schema) if name not in (reader.fieldnames or ())]
+    if missing:
+        raise ImportHeaderError(f"Missing required columns: {', '.join(missing)}")
+
+    for line_numbers, records in iter_csv_chunks(reader, chunk_size):
+        valid_positions, rows, errors = validate_chunk(adapter, records)
+        for position, problems in sorted(errors.items()):
+            for field, message in problems:
+                add_error(line_numbers[position], field, message)
+        rejected += len(errors)
+        if not rows:
+            continue
+        try:
+            store_rows(db, rows)
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            rejected += len(rows)
+            first_line, last_line = line_numbers[valid_positions[0]], line_numbers[valid_positions[-1]]
+            add_error(first_line, None, f"Rows on lines {first_line}-{last_line} were not imported: {getattr(exc, 'orig', None) or exc}")
+            continue
+        imported += len(rows)
+    return {"imported": imported, "rejected": rejected, "errors": report_errors}
@@ -0,0 +1,100 @@
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """
+    Reads a boolean flag from the environment.
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def is_sqlite(url: str) -> bool:
+    """
+    Returns True if url points at a SQLite database.
+    """
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def engine_options(url: str) -> dict:
+    """
+    Builds create_engine keyword arguments from the environment.
+
+    Pool sizing applies to server databases and file-backed SQLite, both of
+    which use a QueuePool; in-memory SQLite keeps SQLAlchemy's defaults.
+
+    Environment:
+        DB_POOL_SIZE: Connections kept open in the pool (default 5).
+        DB_MAX_OVERFLOW: Extra connections allowed under load (default 10).
+        DB_POOL_TIMEOUT: Seconds to wait for a free connection (default 30).
+        DB_POOL_PRE_PING: Test connections before use (default on for server databases).
+        DB_POOL_RECYCLE: Seconds after which connections are replaced (default 1800, -1 disables).
+
+    Args:
+        url (str): The database URL.
+
+    Returns:
+        dict: Keyword arguments for create_engine/create_async_engine.
+    """
+    sqlite = is_sqlite(url)
+    if sqlite and make_url(url).database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_pre_ping": env_bool("DB_POOL_PRE_PING", not sqlite),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "-1" if sqlite else "1800")),
+    }
+
+
+def sqlite_pragmas() -> dict:
+    """
+    Returns the PRAGMAs applied to every new SQLite connection.
+
+    WAL lets readers run alongside a writer, synchronous=NORMAL is durable
+    enough in WAL mode while avoiding an fsync per commit, and busy_timeout
+    makes writers wait for the lock instead of failing with "database is
+    locked".
+
+    Environment:
+        SQLITE_JOURNAL_MODE (default WAL), SQLITE_SYNCHRONOUS (default NORMAL),
+        SQLITE_BUSY_TIMEOUT_MS (default 5000), SQLITE_MMAP_SIZE in bytes
+        (default 256 MiB), SQLITE_CACHE_SIZE in pages, or KiB when negative
+        (default -65536, i.e. 64 MiB).
+    """
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+    }
+
+
+def install_sqlite_pragmas(engine):
+    """
+    Applies sqlite_pragmas() on every new connection of a SQLite engine.
+
+    Does nothing for other backends. For async engines pass engine.sync_engine.
+
+    Args:
+        engine (Engine): The engine to configure.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from fastapi.responses import StreamingResponse
+
+# Rows fetched from the database cursor per round-trip
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _ndjson_chunk(columns, rows):
+    return "".join(
+        json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in rows
+    )
+
+
+def _csv_chunk(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, (date, datetime)) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+def iter_export(session_factory, statement, columns, export_format: str):
+    """
+    Streams the rows of a select statement as NDJSON or CSV text chunks.
+
+    The statement runs on its own session with yield_per so only one batch
+    of rows is held in memory at a time; one chunk is yielded per batch.
+
+    Args:
+        session_factory: Callable returning a new Session.
+        statement: The select statement to export.
+        columns (list): The output column names, in statement order.
+        export_format (str): "ndjson" or "csv".
+
+    Yields:
+        str: Encoded chunks of the export.
+    """
+    db = session_factory()
+    try:
+        if export_format == "csv":
+            yield _csv_chunk([columns])
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            if export_format == "csv":
+                yield _csv_chunk(rows)
+            else:
+                yield _ndjson_chunk(columns, rows)
+    finally:
+        db.close()
+
+
+def export_response(session_factory, statement, columns, export_format: str, filename: str):
+    """
+    Wraps iter_export in a StreamingResponse sent as a file download.
+
+    Args:
+        session_factory: Callable returning a new Session.
+        statement: The select statement to export.
+        columns (list): The output column names, in statement order.
+        export_format (str): "ndjson" or "csv".
+        filename (str): The download name without extension.
+
+    Returns:
+        StreamingResponse: The streaming export.
+    """
+    return StreamingResponse(
+        iter_export(session_factory, statement, columns, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
+
+
+def write_export(session_factory, statement, columns, export_format: str, path: str) -> str:
+    """
+    Writes iter_export to a file, for exports run as background jobs.
+
+    Args:
+        session_factory: Callable returning a new Session.
+        statement: The select statement to export.
+        columns (list): The output column names, in statement order.
+        export_format (str): "ndjson" or "csv".
+        path (str): The file to write.
+
+    Returns:
+        str: The media type of the export.
+    """
+    with open(path, "w", encoding="utf-8", newline="") as output:
+        for chunk in iter_export(session_factory, statement, columns, export_format):
+            output.write(chunk)
+    return EXPORT_FORMATS[export_format]
@@ -0,0 +1,147 @@
+import numpy as np
+
+# Robust z-score above which a refuel's km/l is reported as an outlier
+OUTLIER_Z_SCORE = 3.5
+# Fewer segments than this give no meaningful per-vehicle spread
+MIN_SEGMENTS_FOR_SPREAD = 4
+
+
+def _group_median(values, groups, group_count):
+    """
+    Computes the median of values within each group in one sort.
+
+    Args:
+        values (ndarray): The values.
+        groups (ndarray): The group index of each value.
+        group_count (int): The number of groups.
+
+    Returns:
+        tuple: (medians, counts) arrays of length group_count; groups without
+            values get a NaN median.
+    """
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    counts = np.bincount(groups, minlength=group_count)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    medians = np.full(group_count, np.nan)
+    present = counts > 0
+    low = starts[present] + (counts[present] - 1) // 2
+    high = starts[present] + counts[present] // 2
+    medians[present] = (sorted_values[low] + sorted_values[high]) / 2
+    return medians, counts
+
+
+def analyze_fuel_expenses(ids, vehicle_ids, expense_types, costs, quantities, odometers, expense_dates):
+    """
+    Computes fuel and cost analytics for every vehicle in one vectorized pass.
+
+    The inputs are parallel columns of the fuel_expenses rows, ordered by
+    vehicle_id, expense_date and id. Fill-ups are fuel records with both a
+    quantity and an odometer reading; each fill-up after a vehicle's first
+    one closes a segment whose distance is the odometer delta.
+
+    Refuels are flagged as outliers when the odometer did not advance or when
+    the segment's km/l is more than OUTLIER_Z_SCORE robust z-scores (median
+    and MAD) away from the vehicle's typical km/l.
+
+    Returns:
+        list: One dict per vehicle with totals, fuel_efficiency (km/l),
+            cost_per_km, monthly_spend and outlier_refuels.
+    """
+    if len(ids) == 0:
+        return []
+    ids = np.asarray(ids, dtype=np.int64)
+    vehicle_ids = np.asarray(vehicle_ids, dtype=np.int64)
+    costs = np.asarray(costs, dtype=np.float64)
+    quantities = np.array([np.nan if value is None else value for value in quantities], dtype=np.float64)
+    odometers = np.array([np.nan if value is None else value for value in odometers], dtype=np.float64)
+    is_fuel = np.asarray(expense_types, dtype=object) == "fuel"
+    months = np.asarray(expense_dates, dtype="datetime64[D]").astype("datetime64[M]")
+
+    vehicles, groups = np.unique(vehicle_ids, return_inverse=True)
+    vehicle_count = len(vehicles)
+
+    fuel_costs = np.bincount(groups, weights=np.where(is_fuel, costs, 0.0), minlength=vehicle_count)
+    other_costs = np.bincount(groups, weights=np.where(is_fuel, 0.0, costs), minlength=vehicle_count)
+
+    # Fill-ups and the segments between consecutive fill-ups of a vehicle
+    fills = is_fuel & ~np.isnan(quantities) & ~np.isnan(odometers)
+    fill_groups = groups[fills]
+    fill_quantities = quantities[fills]
+    fill_odometers = odometers[fills]
+    fill_ids = ids[fills]
+    fill_dates = np.asarray(expense_dates, dtype="datetime64[D]")[fills]
+    fill_counts = np.bincount(fill_groups, minlength=vehicle_count)
+
+    is_first = np.ones(len(fill_groups), dtype=bool)
+    is_first[1:] = fill_groups[1:] != fill_groups[:-1]
+    is_last = np.ones(len(fill_groups), dtype=bool)
+    is_last[:-1] = fill_groups[1:] != fill_groups[:-1]
+
+    distances = np.zeros(vehicle_count)
+    litres = np.bincount(fill_groups, weights=fill_quantities, minlength=vehicle_count)
+    distances[fill_groups[is_last]] = fill_odometers[is_last] - fill_odometers[is_first]
+    litres[fill_groups[is_first]] -= fill_quantities[is_first]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        efficiency = np.where((fill_counts >= 2) & (litres > 0), distances / litres, np.nan)
+        cost_per_km = np.where(distances > 0, (fuel_costs + other_costs) / distances, np.nan)
+
+    segment_deltas = np.diff(fill_odometers, prepend=np.nan)
+    segments = ~is_first
+    segment_groups = fill_groups[segments]
+    segment_deltas = segment_deltas[segments]
+    segment_quantities = fill_quantities[segments]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        segment_kml = np.where(segment_quantities > 0, segment_deltas / segment_quantities, np.nan)
+
+    # Robust z-score of each segment's km/l within its vehicle
+    valid = ~np.isnan(segment_kml) & (segment_deltas > 0)
+    scores = np.zeros(len(segment_kml))
+    if valid.any():
+        medians, counts = _group_median(segment_kml[valid], segment_groups[valid], vehicle_count)
+        deviations = np.abs(segment_kml - medians[segment_groups])
+        mads, _ = _group_median(deviations[valid], segment_groups[valid], vehicle_count)
+        spread = mads[segment_groups]
+        enough = (counts[segment_groups] >= MIN_SEGMENTS_FOR_SPREAD) & (spread > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(valid & enough, 0.6745 * (segment_kml - medians[segment_groups]) / spread, 0.0)
+    outliers = (segment_deltas <= 0) | (np.abs(scores) > OUTLIER_Z_SCORE)
+
+    # Monthly spend per vehicle
+    month_keys, month_inverse = np.unique(
+        np.rec.fromarrays([groups, months.astype(np.int64)]), return_inverse=True
+    )
+    month_totals = np.bincount(month_inverse.ravel(), weights=costs, minlength=len(month_keys))
+
+    results = [
+        {
+            "vehicle_id": int(vehicle_id),
+            "total_fuel_costs": float(fuel_costs[index]),
+            "total_other_expenses": float(other_costs[index]),
+            "fill_count": int(fill_counts[index]),
+            "total_distance": float(distances[index]),
+            "total_litres": float(litres[index]) if fill_counts[index] else 0.0,
+            "fuel_efficiency": None if np.isnan(efficiency[index]) else float(efficiency[index]),
+            "cost_per_km": None if np.isnan(cost_per_km[index]) else float(cost_per_km[index]),
+            "monthly_spend": [],
+            "outlier_refuels": [],
+        }
+        for index, vehicle_id in enumerate(vehicles)
+    ]
+    for (group, month), total in zip(month_keys.tolist(), month_totals.tolist()):
+        results[group]["monthly_spend"].append(
+            {"month": str(np.datetime64(month, "M")), "cost": total}
+        )
+    segment_ids = fill_ids[segments]
+    segment_dates = fill_dates[segments]
+    for position in np.flatnonzero(outliers).tolist():
+        results[segment_groups[position]]["outlier_refuels"].append({
+            "expense_id": int(segment_ids[position]),
+            "expense_date": segment_dates[position].item(),
+            "quantity": float(segment_quantities[position]),
+            "distance": float(segment_deltas[position]),
+            "km_per_litre": None if np.isnan(segment_kml[position]) else float(segment_kml[position]),
+            "score": float(scores[position]),
+        })
+    return results
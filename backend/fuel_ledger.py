@@ -0,0 +1,246 @@
+"""
+Per-vehicle fuel efficiency ledger, kept current incrementally by the fuel
+expense write paths so the vehicle fuel stats read a single row.
+"""
+from types import SimpleNamespace
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import FuelExpense, VehicleFuelLedger
+
+
+def is_fuel_fill(expense) -> bool:
+    """
+    Returns True if a fuel/expense record counts towards fuel efficiency.
+    """
+    return expense.expense_type == 'fuel' and expense.quantity is not None and expense.odometer_reading is not None
+
+
+def fuel_entry(expense):
+    """
+    Snapshots the ledger-relevant fields of a fuel/expense record.
+    """
+    return SimpleNamespace(
+        id=expense.id,
+        vehicle_id=expense.vehicle_id,
+        expense_type=expense.expense_type,
+        cost=expense.cost,
+        quantity=expense.quantity,
+        odometer_reading=expense.odometer_reading,
+        expense_date=expense.expense_date
+    )
+
+
+def new_fuel_ledger(vehicle_id: int) -> VehicleFuelLedger:
+    """
+    Returns an empty ledger for a vehicle.
+    """
+    return VehicleFuelLedger(
+        vehicle_id=vehicle_id, total_fuel_cost=0.0, total_other_cost=0.0, fill_count=0,
+        quantity_sum=0.0, total_distance=0.0, total_litres=0.0
+    )
+
+
+def fuel_ledger_statement(vehicle_id: int):
+    """
+    Selects the ledger of a vehicle for update.
+    """
+    return select(VehicleFuelLedger).where(VehicleFuelLedger.vehicle_id == vehicle_id).with_for_update()
+
+
+def get_fuel_ledger(db: Session, vehicle_id: int) -> VehicleFuelLedger:
+    """
+    Loads the ledger of a vehicle for update, creating an empty one if needed.
+    """
+    ledger = db.execute(fuel_ledger_statement(vehicle_id)).scalars().first()
+    if ledger is None:
+        ledger = new_fuel_ledger(vehicle_id)
+        db.add(ledger)
+        db.flush()
+    return ledger
+
+
+def set_first_fill(ledger: VehicleFuelLedger, fill):
+    ledger.first_fill_id = fill.id if fill is not None else None
+    ledger.first_fill_date = fill.expense_date if fill is not None else None
+    ledger.first_odometer = fill.odometer_reading if fill is not None else None
+    ledger.first_quantity = fill.quantity if fill is not None else None
+
+
+def set_last_fill(ledger: VehicleFuelLedger, fill):
+    ledger.last_fill_id = fill.id if fill is not None else None
+    ledger.last_fill_date = fill.expense_date if fill is not None else None
+    ledger.last_odometer = fill.odometer_reading if fill is not None else None
+
+
+def accumulate_fuel_entry(ledger: VehicleFuelLedger, entry, sign: int):
+    """
+    Adds (sign=1) or removes (sign=-1) a record's costs and fill-up counters.
+
+    An added fill-up that sorts before the first or after the last one
+    becomes the new endpoint; fill-ups in between leave them unchanged.
+    """
+    if entry.expense_type == 'fuel':
+        ledger.total_fuel_cost += sign * entry.cost
+    else:
+        ledger.total_other_cost += sign * entry.cost
+    if not is_fuel_fill(entry):
+        return
+    ledger.fill_count += sign
+    ledger.quantity_sum += sign * entry.quantity
+    if sign > 0:
+        extend_fuel_endpoints(ledger, entry)
+
+
+def extend_fuel_endpoints(ledger: VehicleFuelLedger, fill):
+    """
+    Makes an added fill-up the first or last one if it sorts beyond them.
+    """
+    key = (fill.expense_date, fill.id)
+    if ledger.first_fill_id is None or key < (ledger.first_fill_date, ledger.first_fill_id):
+        set_first_fill(ledger, fill)
+    if ledger.last_fill_id is None or key > (ledger.last_fill_date, ledger.last_fill_id):
+        set_last_fill(ledger, fill)
+
+
+def refresh_fuel_totals(ledger: VehicleFuelLedger):
+    """
+    Derives cumulative distance and litres from the tracked endpoints.
+    """
+    if ledger.fill_count > 0 and ledger.first_fill_id is not None:
+        ledger.total_distance = ledger.last_odometer - ledger.first_odometer
+        ledger.total_litres = ledger.quantity_sum - ledger.first_quantity
+    else:
+        ledger.total_distance = 0.0
+        ledger.total_litres = 0.0
+
+
+def fuel_endpoint_statements(ledger: VehicleFuelLedger, excluded_id: int) -> dict:
+    """
+    Selects the new first and last fill-up after an endpoint was removed.
+
+    Args:
+        ledger (VehicleFuelLedger): The ledger to repair.
+        excluded_id (int): The record leaving the ledger, still present in the table.
+
+    Returns:
+        dict: The setter of each endpoint that needs repair -> the statement
+        selecting its new fill-up.
+    """
+    fills = select(FuelExpense).where(
+        FuelExpense.vehicle_id == ledger.vehicle_id,
+        FuelExpense.expense_type == 'fuel',
+        FuelExpense.quantity.isnot(None),
+        FuelExpense.odometer_reading.isnot(None),
+        FuelExpense.id != excluded_id
+    ).limit(1)
+    statements = {}
+    if ledger.first_fill_id == excluded_id:
+        statements[set_first_fill] = fills.order_by(FuelExpense.expense_date, FuelExpense.id)
+    if ledger.last_fill_id == excluded_id:
+        statements[set_last_fill] = fills.order_by(FuelExpense.expense_date.desc(), FuelExpense.id.desc())
+    return statements
+
+
+def rewalk_fuel_endpoints(db: Session, ledger: VehicleFuelLedger, excluded_id: int):
+    """
+    Finds the new first and last fill-up after an endpoint was removed.
+
+    Args:
+        db (Session): The database session.
+        ledger (VehicleFuelLedger): The ledger to repair.
+        excluded_id (int): The record leaving the ledger, still present in the table.
+    """
+    for set_fill, statement in fuel_endpoint_statements(ledger, excluded_id).items():
+        set_fill(ledger, db.execute(statement).scalars().first())
+
+
+def apply_fuel_entry(db: Session, entry, sign: int):
+    """
+    Adds (sign=1) or removes (sign=-1) one record from its vehicle's ledger.
+
+    Costs and counters change in O(1). Removing the first or last fill-up
+    looks up its neighbour with one query instead of rescanning the history.
+
+    Args:
+        db (Session): The database session.
+        entry: A fuel_entry() snapshot of the record.
+        sign (int): 1 when the record is added, -1 when it is removed.
+    """
+    ledger = get_fuel_ledger(db, entry.vehicle_id)
+    accumulate_fuel_entry(ledger, entry, sign)
+    if sign < 0 and is_fuel_fill(entry) and entry.id in (ledger.first_fill_id, ledger.last_fill_id):
+        rewalk_fuel_endpoints(db, ledger, entry.id)
+    refresh_fuel_totals(ledger)
+
+
+def add_fuel_entries(db: Session, entries):
+    """
+    Adds a batch of new records to their vehicles' ledgers.
+
+    Loads the affected ledgers with one query and adds each vehicle's
+    records as one set of sums, so the ledger row is touched once per
+    vehicle rather than once per record.
+
+    Args:
+        db (Session): The database session.
+        entries: fuel_entry()-like objects of records already inserted.
+    """
+    entries_by_vehicle = {}
+    for entry in entries:
+        entries_by_vehicle.setdefault(entry.vehicle_id, []).append(entry)
+    ledgers = {
+        ledger.vehicle_id: ledger
+        for ledger in db.query(VehicleFuelLedger).filter(
+            VehicleFuelLedger.vehicle_id.in_(list(entries_by_vehicle))
+        ).with_for_update()
+    }
+    for vehicle_id, vehicle_entries in entries_by_vehicle.items():
+        ledger = ledgers.get(vehicle_id)
+        if ledger is None:
+            ledger = new_fuel_ledger(vehicle_id)
+            db.add(ledger)
+        fuel_cost = sum(entry.cost for entry in vehicle_entries if entry.expense_type == 'fuel')
+        fills = [entry for entry in vehicle_entries if is_fuel_fill(entry)]
+        ledger.total_fuel_cost += fuel_cost
+        ledger.total_other_cost += sum(entry.cost for entry in vehicle_entries) - fuel_cost
+        ledger.fill_count += len(fills)
+        ledger.quantity_sum += sum(entry.quantity for entry in fills)
+        if fills:
+            fill_key = lambda fill: (fill.expense_date, fill.id)
+            extend_fuel_endpoints(ledger, min(fills, key=fill_key))
+            extend_fuel_endpoints(ledger, max(fills, key=fill_key))
+        refresh_fuel_totals(ledger)
+
+
+def rebuild_fuel_ledgers(db: Session):
+    """
+    Recomputes every vehicle's fuel ledger in one ordered pass over fuel_expenses.
+
+    Args:
+        db (Session): The database session.
+    """
+    db.query(VehicleFuelLedger).delete(synchronize_session=False)
+    ledgers = {}
+    expenses = db.query(
+        FuelExpense.id, FuelExpense.vehicle_id, FuelExpense.expense_type, FuelExpense.cost,
+        FuelExpense.quantity, FuelExpense.odometer_reading, FuelExpense.expense_date
+    ).order_by(FuelExpense.vehicle_id, FuelExpense.expense_date, FuelExpense.id).yield_per(1000)
+    for expense in expenses:
+        ledger = ledgers.get(expense.vehicle_id)
+        if ledger is None:
+            ledger = ledgers[expense.vehicle_id] = new_fuel_ledger(expense.vehicle_id)
+        accumulate_fuel_entry(ledger, expense, 1)
+    for ledger in ledgers.values():
+        refresh_fuel_totals(ledger)
+    db.add_all(ledgers.values())
+    db.commit()
+
+
+def ensure_fuel_ledgers(db: Session):
+    """
+    Builds the fuel ledgers once for databases created before they existed.
+    """
+    if db.query(VehicleFuelLedger.vehicle_id).first() is None and db.query(FuelExpense.id).first() is not None:
+        rebuild_fuel_ledgers(db)
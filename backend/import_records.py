@@ -0,0 +1,47 @@
+import sys
+
+from sqlalchemy.orm import Session
+from csv_import import ImportHeaderError
+from main import IMPORT_TARGETS, SessionLocal, prepare_database, run_import
+
+
+def import_records(entity: str, path: str):
+    """
+    Bulk imports records of one entity from a CSV file.
+
+    The file is streamed in chunks; each chunk is validated and inserted in
+    its own transaction, and rows that fail validation are listed with their
+    line number.
+
+    Args:
+        entity (str): One of vehicles, drivers, maintenance or fuel-expenses.
+        path (str): The path of the CSV file, with a header row.
+
+    Returns:
+        None: Prints a summary and the row errors.
+    """
+    prepare_database()
+    db: Session = SessionLocal()
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as lines:
+            report = run_import(entity, lines, db)
+        print(f"Imported {report.imported} {entity} rows, rejected {report.rejected}.")
+        for error in report.errors:
+            field = f" ({error.field})" if error.field else ""
+            print(f"  line {error.line}{field}: {error.detail}")
+    except (ImportHeaderError, OSError, UnicodeDecodeError) as e:
+        db.rollback()
+        print(f"Error importing {entity}: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    """
+    Entry point for the script.
+    Usage: python import_records.py <entity> <file.csv>
+    """
+    if len(sys.argv) != 3 or sys.argv[1] not in IMPORT_TARGETS:
+        print(f"Usage: python import_records.py {{{','.join(IMPORT_TARGETS)}}} <file.csv>")
+        sys.exit(1)
+    import_records(sys.argv[1], sys.argv[2])
@@ -0,0 +1,280 @@
+import logging
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from threading import Lock
+
+from sqlalchemy import event
+
+logger = logging.getLogger("fleet_manager.slow_queries")
+
+# Histogram bucket upper bounds
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+# Route label for requests that matched no route, to bound label cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    """
+    Database work attributed to the request being served.
+    """
+    __slots__ = ("statements", "db_time", "rows", "slow_queries")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.slow_queries = 0
+
+
+# Stats of the current request; sync handlers run in a threadpool that
+# copies the context, so their queries are attributed to the same object
+current_request_stats = ContextVar("current_request_stats", default=None)
+
+
+class QueryMonitor:
+    """
+    Cursor-execute hooks that attribute SQL statements to the current
+    request and log slow statements with their query plan.
+
+    Statements at or above slow_query_ms are logged to the
+    "fleet_manager.slow_queries" logger together with EXPLAIN (EXPLAIN QUERY
+    PLAN on SQLite) output and kept in a short in-memory history.
+    """
+
+    def __init__(self, slow_query_ms: float, history_size: int = 100):
+        self.slow_query_seconds = slow_query_ms / 1000 if slow_query_ms > 0 else None
+        self.slow_queries = deque(maxlen=history_size)
+        self.slow_query_count = 0
+
+    def install(self, engine):
+        """
+        Registers the hooks on an engine; for async engines pass engine.sync_engine.
+        """
+        explain_prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context._query_started = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - context._query_started
+            stats = current_request_stats.get()
+            if stats is not None:
+                stats.statements += 1
+                stats.db_time += elapsed
+                if cursor.description is None:
+                    stats.rows += max(cursor.rowcount, 0)
+            if self.slow_query_seconds is not None and elapsed >= self.slow_query_seconds:
+                if stats is not None:
+                    stats.slow_queries += 1
+                first_parameters = parameters[0] if executemany and parameters else parameters
+                self.record_slow_query(conn, explain_prefix, statement, first_parameters, elapsed)
+
+    def install_row_counter(self, session_class):
+        """
+        Counts the rows returned by SELECTs run through ORM sessions.
+
+        SQLite reports no rowcount for SELECTs, so rows returned can only be
+        counted from the buffered result. Streamed results (yield_per,
+        stream_results) are passed through uncounted. Register this once per
+        session class; AsyncSession runs on the sync Session class.
+        """
+        @event.listens_for(session_class, "do_orm_execute")
+        def count_rows(orm_execute_state):
+            stats = current_request_stats.get()
+            if stats is None or not orm_execute_state.is_select:
+                return None
+            options = orm_execute_state.execution_options
+            if options.get("yield_per") or options.get("stream_results"):
+                return None
+            result = orm_execute_state.invoke_statement()
+            started = time.perf_counter()
+            frozen = result.freeze()
+            stats.db_time += time.perf_counter() - started
+            stats.rows += len(frozen.data)
+            return frozen()
+
+    def record_slow_query(self, conn, explain_prefix: str, statement: str, parameters, elapsed: float):
+        try:
+            explain_cursor = conn.connection.cursor()
+            try:
+                explain_cursor.execute(explain_prefix + statement, parameters)
+                plan = [" ".join(str(column) for column in row) for row in explain_cursor.fetchall()]
+            finally:
+                explain_cursor.close()
+        except Exception as exc:
+            plan = [f"EXPLAIN failed: {exc}"]
+        self.slow_query_count += 1
+        self.slow_queries.append({
+            "duration_ms": round(elapsed * 1000, 3),
+            "statement": statement,
+            "parameters": repr(parameters),
+            "plan": plan,
+            "logged_at": time.time(),
+        })
+        logger.warning(
+            "Slow query (%.1f ms): %s\nParameters: %r\nPlan:\n  %s",
+            elapsed * 1000, statement, parameters, "\n  ".join(plan)
+        )
+
+
+class Histogram:
+    """
+    Cumulative Prometheus-style histogram keyed by label values.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (bucket_counts, total, count) in sorted(self._series.items()):
+            label_text = format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}'
+            yield f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}'
+            yield f"{self.name}_sum{{{label_text}}} {total}"
+            yield f"{self.name}_count{{{label_text}}} {count}"
+
+
+class Counter:
+    """
+    Prometheus-style counter keyed by label values.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._series = {}
+
+    def inc(self, labels: tuple, amount: float = 1):
+        self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._series.items()):
+            yield f"{self.name}{{{format_labels(self.label_names, labels)}}} {value}"
+
+
+def format_labels(names, values) -> str:
+    return ",".join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    )
+
+
+class RequestMetrics:
+    """
+    Per-route request metrics rendered in the Prometheus text format.
+
+    Metrics are kept per process; with several workers each one reports its
+    own series.
+    """
+
+    def __init__(self, query_monitor: QueryMonitor = None):
+        self.query_monitor = query_monitor
+        self._lock = Lock()
+        route_labels = ("method", "route")
+        self.requests = Counter("fleet_http_requests_total", "HTTP requests served.", ("method", "route", "status"))
+        self.duration = Histogram(
+            "fleet_http_request_duration_seconds", "Wall time from request to response start.",
+            route_labels, DURATION_BUCKETS
+        )
+        self.db_time = Histogram(
+            "fleet_db_time_seconds", "Time spent executing and fetching SQL per request.",
+            route_labels, DURATION_BUCKETS
+        )
+        self.statements = Histogram(
+            "fleet_db_statements_per_request", "SQL statements executed per request.",
+            route_labels, STATEMENT_BUCKETS
+        )
+        self.rows = Counter("fleet_db_rows_total", "Rows returned or affected by SQL statements.", route_labels)
+
+    def observe(self, method: str, route: str, status: int, duration: float, stats: RequestStats):
+        labels = (method, route)
+        with self._lock:
+            self.requests.inc((method, route, status))
+            self.duration.observe(labels, duration)
+            self.db_time.observe(labels, stats.db_time)
+            self.statements.observe(labels, stats.statements)
+            self.rows.inc(labels, stats.rows)
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.duration, self.db_time, self.statements, self.rows):
+                lines.extend(metric.render())
+        if self.query_monitor is not None:
+            lines.append("# HELP fleet_db_slow_queries_total SQL statements slower than the slow query threshold.")
+            lines.append("# TYPE fleet_db_slow_queries_total counter")
+            lines.append(f"fleet_db_slow_queries_total {self.query_monitor.slow_query_count}")
+        return "\n".join(lines) + "\n"
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware that times each HTTP request, attributes its SQL work
+    through current_request_stats and records it in a RequestMetrics.
+
+    When server_timing is set, the response carries a Server-Timing header
+    with the app and db durations and the statement and row counts as of
+    the moment the response headers are sent.
+    """
+
+    def __init__(self, app, metrics: RequestMetrics, server_timing: bool = True):
+        self.app = app
+        self.metrics = metrics
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+        observed = {"status": 500, "duration": None}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                duration = time.perf_counter() - started
+                observed["status"] = message["status"]
+                observed["duration"] = duration
+                if self.server_timing:
+                    header = (
+                        f"app;dur={duration * 1000:.3f}, "
+                        f"db;dur={stats.db_time * 1000:.3f};desc=\"{stats.statements} queries, {stats.rows} rows\""
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_stats.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            duration = observed["duration"] if observed["duration"] is not None else time.perf_counter() - started
+            self.metrics.observe(scope["method"], route_path, observed["status"], duration, stats)
@@ -0,0 +1,146 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from threading import Lock
+
+logger = logging.getLogger("fleet_manager.invalidation_bus")
+
+
+class InvalidationBus:
+    """
+    Broadcasts invalidation events between worker processes through a
+    SQLite file they all share.
+
+    Stands in for a message broker such as Redis pub/sub: publish() appends
+    an event row, and a polling thread in every process hands the rows
+    published by other processes to the handlers subscribed to their
+    channel. Events older than the retention period are pruned.
+
+    Args:
+        path (str): The SQLite file shared by the workers.
+        poll_interval (float): Seconds between polls; the staleness bound.
+        retention (float): Seconds events are kept for slow pollers.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.2, retention: float = 300):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.origin = uuid.uuid4().hex
+        self.published = 0
+        self.received = 0
+        self._handlers = {}
+        self._lock = Lock()
+        self._conn = None
+        self._last_id = None
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS bus_events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, channel TEXT NOT NULL, "
+                "payload TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_bus_events_created_at ON bus_events (created_at)")
+        return self._conn
+
+    def after_fork(self):
+        """
+        Forgets state inherited from a parent process; the child gets its
+        own origin, connection and polling thread.
+        """
+        self.origin = uuid.uuid4().hex
+        self._lock = Lock()
+        self._conn = None
+        self._last_id = None
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def subscribe(self, channel: str, handler):
+        """
+        Registers handler(payload) for events other processes publish on channel.
+        """
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def publish(self, channel: str, payload):
+        """
+        Appends an event for the other processes; payload must be JSON serializable.
+        """
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO bus_events (origin, channel, payload, created_at) VALUES (?, ?, ?, ?)",
+                (self.origin, channel, json.dumps(payload), time.time())
+            )
+        self.published += 1
+
+    def start(self):
+        """
+        Starts the polling thread; events published before this are not replayed.
+        """
+        if self._thread is not None:
+            return
+        with self._lock:
+            self._last_id = self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM bus_events").fetchone()[0]
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout=self.poll_interval * 5)
+        self._thread = None
+
+    def _run(self):
+        next_prune = time.monotonic()
+        while not self._stopping.wait(self.poll_interval):
+            try:
+                self.poll()
+                if time.monotonic() >= next_prune:
+                    with self._lock:
+                        self._connection().execute("DELETE FROM bus_events WHERE created_at < ?", (time.time() - self.retention,))
+                    next_prune = time.monotonic() + self.retention / 10
+            except sqlite3.Error:
+                logger.exception("Polling the invalidation bus failed")
+
+    def poll(self) -> int:
+        """
+        Dispatches the events published by other processes since the last poll.
+
+        Returns:
+            int: The number of events handled.
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT id, origin, channel, payload FROM bus_events WHERE id > ? ORDER BY id", (self._last_id or 0,)
+            ).fetchall()
+        handled = 0
+        for event_id, origin, channel, payload in rows:
+            self._last_id = event_id
+            if origin == self.origin:
+                continue
+            for handler in self._handlers.get(channel, ()):
+                try:
+                    handler(json.loads(payload))
+                except Exception:
+                    logger.exception("Invalidation handler for %s failed", channel)
+            handled += 1
+        self.received += handled
+        return handled
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "published": self.published,
+            "received": self.received,
+            "running": self._thread is not None,
+        }
@@ -0,0 +1,42 @@
+import argparse
+import signal
+import threading
+
+from main import job_queue, prepare_database
+
+
+def run_job_worker(workers: int):
+    """
+    Runs background jobs from the queue until SIGTERM or SIGINT.
+
+    Start the API with JOB_WORKERS=0 to leave all jobs to one or more of
+    these, e.g. on a separate host sharing JOB_QUEUE_PATH and
+    JOB_RESULTS_DIR. With INVALIDATION_BUS=sqlite the API workers also
+    drop their cached stats when a rebuild finishes here.
+
+    Args:
+        workers (int): The number of jobs run at once.
+
+    Returns:
+        None: Prints when it starts and stops.
+    """
+    prepare_database()
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda received, frame: stopping.set())
+    signal.signal(signal.SIGINT, lambda received, frame: stopping.set())
+    job_queue.workers = workers
+    job_queue.start()
+    print(f"Running jobs from {job_queue.path} with {workers} workers.")
+    stopping.wait()
+    job_queue.stop()
+    print("Job worker stopped; running jobs were queued again.")
+
+
+if __name__ == "__main__":
+    """
+    Entry point for the script.
+    Runs a dedicated background job worker when run directly.
+    """
+    parser = argparse.ArgumentParser(description="Run background jobs of the Fleet Manager API.")
+    parser.add_argument("--workers", type=int, default=2)
+    run_job_worker(parser.parse_args().workers)
@@ -0,0 +1,431 @@
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from threading import Lock
+from typing import Optional
+
+logger = logging.getLogger("fleet_manager.jobs")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+# Download file extensions of the result media types
+RESULT_EXTENSIONS = {
+    "application/json": "json",
+    "application/x-ndjson": "ndjson",
+    "text/csv": "csv",
+}
+
+# Seconds a terminated job process gets to exit before it is killed
+TERMINATE_TIMEOUT = 5
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value) if value is not None else None
+
+
+def _run_job(path: str, job_id: str, handler, schema, params: dict, result_path: str):
+    """
+    Entry point of a job process: runs the handler and records the outcome.
+
+    The handler writes its result to a temporary file that is moved into
+    place only once it succeeded, so a cancelled or failed job never leaves
+    a partial result behind.
+    """
+    # Inherited server signal handlers would swallow the SIGTERM of a cancel
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    connection = _connect(path)
+    partial_path = result_path + ".partial"
+    try:
+        media_type = handler(schema.model_validate(params) if schema is not None else params, partial_path)
+        os.replace(partial_path, result_path)
+        connection.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, media_type = ?, result_path = ? WHERE id = ? AND status = ?",
+            (JOB_SUCCEEDED, time.time(), media_type, result_path, job_id, JOB_RUNNING)
+        )
+    except Exception as error:
+        logger.exception("Job %s failed", job_id)
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        connection.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ? AND status = ?",
+            (JOB_FAILED, time.time(), f"{type(error).__name__}: {error}", job_id, JOB_RUNNING)
+        )
+    finally:
+        connection.close()
+
+
+class JobQueue:
+    """
+    SQLite-backed queue of background jobs run by a pool of worker processes.
+
+    submit() only inserts a row, so API handlers return at once. A dispatcher
+    thread claims queued jobs with one atomic UPDATE, so several API workers
+    or a separate job_worker.py can share the queue, and runs each job in its
+    own process so the API's event loop and threadpool stay free. Cancelling
+    a running job terminates its process. Results are files in results_dir,
+    deleted with their job after the retention period.
+
+    A claimed job records the host and pid of its process and holds a lease
+    that its dispatcher renews while the process runs. Dispatchers may be on
+    other hosts, so a running job is only treated as lost, and failed, once
+    its lease has expired.
+
+    Args:
+        path (str): The SQLite file holding the queue.
+        results_dir (str): The directory job results are written to.
+        workers (int): The maximum number of job processes this dispatcher runs.
+        poll_interval (float): Seconds between dispatcher passes.
+        retention (float): Seconds finished jobs and their results are kept.
+        lease (float): Seconds a running job stays claimed without its
+            dispatcher renewing the lease.
+    """
+
+    def __init__(self, path: str, results_dir: str, workers: int = 2, poll_interval: float = 0.5,
+                 retention: float = 86400, lease: float = 60):
+        self.path = path
+        self.results_dir = results_dir
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.lease = lease
+        self.hostname = socket.gethostname()
+        # Called with the change tags of each job this dispatcher saw succeed
+        self.on_complete = None
+        self._kinds = {}
+        self._lock = Lock()
+        self._conn = None
+        self._running = {}
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = _connect(self.path)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL, worker_pid INTEGER, "
+                "cancel_requested INTEGER NOT NULL DEFAULT 0, media_type TEXT, result_path TEXT, error TEXT, "
+                "worker_host TEXT, lease_expires_at REAL)"
+            )
+            # Queues created before leases existed
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column in ("worker_host TEXT", "lease_expires_at REAL"):
+                if column.split()[0] not in columns:
+                    try:
+                        self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+                    except sqlite3.OperationalError as error:
+                        # Another process added it first
+                        if "duplicate column" not in str(error):
+                            raise
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_created_at ON jobs (status, created_at)")
+        return self._conn
+
+    def _execute(self, statement: str, parameters=()):
+        with self._lock:
+            return self._connection().execute(statement, parameters).fetchall()
+
+    def after_fork(self):
+        """
+        Forgets the connection, thread and job processes of a parent process.
+        """
+        self._lock = Lock()
+        self._conn = None
+        self._running = {}
+        self._thread = None
+        self._stopping = threading.Event()
+
+    @property
+    def kinds(self) -> list:
+        return sorted(self._kinds)
+
+    def register(self, kind: str, handler, schema=None, tags=()):
+        """
+        Registers a job kind.
+
+        Args:
+            kind (str): The name clients submit.
+            handler: handler(params, path) -> media type. Runs in a job process,
+                writes the result to path and returns its media type.
+            schema: Optional Pydantic model the params are validated with.
+            tags (tuple): Change tags passed to on_complete when a job succeeds.
+        """
+        self._kinds[kind] = (handler, schema, tuple(tags))
+
+    def validate(self, kind: str, params: dict) -> dict:
+        """
+        Returns the params of a job in the JSON form they are stored in.
+
+        Raises:
+            KeyError: If the kind is not registered.
+            pydantic.ValidationError: If the params do not match its schema.
+        """
+        schema = self._kinds[kind][1]
+        return schema.model_validate(params).model_dump(mode="json") if schema is not None else params
+
+    def submit(self, kind: str, params: dict) -> dict:
+        """
+        Queues a job.
+
+        Args:
+            kind (str): A registered job kind.
+            params (dict): The job parameters.
+
+        Returns:
+            dict: The queued job.
+
+        Raises:
+            KeyError: If the kind is not registered.
+            pydantic.ValidationError: If the params do not match its schema.
+        """
+        params = self.validate(kind, params)
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, kind, params, status, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(params), JOB_QUEUED, time.time())
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """
+        Returns a job, or None if it does not exist or was pruned.
+        """
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return self._job(rows[0]) if rows else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> list:
+        """
+        Returns the most recently submitted jobs, optionally of one status.
+        """
+        if status is None:
+            rows = self._execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        else:
+            rows = self._execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+            )
+        return [self._job(row) for row in rows]
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """
+        Cancels a job.
+
+        A queued job is cancelled at once; a running job is flagged and its
+        process is terminated by the dispatcher running it within one poll.
+        Finished jobs are left as they are.
+
+        Returns:
+            dict or None: The job after the request, None if it does not exist.
+        """
+        self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (JOB_CANCELLED, time.time(), job_id, JOB_QUEUED)
+        )
+        self._execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, JOB_RUNNING)
+        )
+        return self.get(job_id)
+
+    def stats(self) -> dict:
+        counts = dict(self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+        return {
+            "path": self.path,
+            "workers": self.workers,
+            "running_here": len(self._running),
+            "dispatching": self._thread is not None,
+            **{state: counts.get(state, 0) for state in (JOB_QUEUED, JOB_RUNNING) + FINISHED_STATES},
+        }
+
+    @staticmethod
+    def _job(row) -> dict:
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "params": json.loads(row["params"]),
+            "status": row["status"],
+            "created_at": _timestamp(row["created_at"]),
+            "started_at": _timestamp(row["started_at"]),
+            "finished_at": _timestamp(row["finished_at"]),
+            "cancel_requested": bool(row["cancel_requested"]),
+            "media_type": row["media_type"],
+            "result_path": row["result_path"],
+            "error": row["error"],
+        }
+
+    def start(self):
+        """
+        Starts the dispatcher thread of this process.
+        """
+        if self._thread is not None or self.workers <= 0:
+            return
+        os.makedirs(self.results_dir, exist_ok=True)
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="job-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the dispatcher; jobs it was running are terminated and queued
+        again for the next dispatcher.
+        """
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout=self.poll_interval * 5)
+        self._thread = None
+        for job_id, process in list(self._running.items()):
+            self._terminate(process)
+            self._execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, worker_pid = NULL, worker_host = NULL, "
+                "lease_expires_at = NULL WHERE id = ? AND status = ?",
+                (JOB_QUEUED, job_id, JOB_RUNNING)
+            )
+        self._running.clear()
+
+    def _run(self):
+        next_housekeeping = next_renewal = time.monotonic()
+        while True:
+            try:
+                if time.monotonic() >= next_housekeeping:
+                    self._recover_orphans()
+                    self._prune()
+                    next_housekeeping = time.monotonic() + min(60, self.lease)
+                if time.monotonic() >= next_renewal:
+                    self._renew_leases()
+                    next_renewal = time.monotonic() + self.lease / 3
+                self._reap()
+                self._cancel_requested()
+                while len(self._running) < self.workers and self._claim():
+                    pass
+            except sqlite3.Error:
+                logger.exception("Dispatching jobs failed")
+            if self._stopping.wait(self.poll_interval):
+                return
+
+    def _claim(self) -> bool:
+        # One statement, so two dispatchers can never claim the same job
+        now = time.time()
+        rows = self._execute(
+            "UPDATE jobs SET status = ?, started_at = ?, worker_host = ?, lease_expires_at = ? WHERE id = "
+            "(SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1) AND status = ? "
+            "RETURNING id, kind, params",
+            (JOB_RUNNING, now, self.hostname, now + self.lease, JOB_QUEUED, JOB_QUEUED)
+        )
+        if not rows:
+            return False
+        job_id, kind, params = rows[0]["id"], rows[0]["kind"], json.loads(rows[0]["params"])
+        if kind not in self._kinds:
+            self._finish(job_id, JOB_FAILED, f"Unknown job kind {kind}")
+            return True
+        handler, schema, _ = self._kinds[kind]
+        process = multiprocessing.Process(
+            target=_run_job, name=f"job-{kind}",
+            args=(self.path, job_id, handler, schema, params, os.path.join(self.results_dir, job_id)),
+            daemon=True
+        )
+        process.start()
+        self._running[job_id] = process
+        self._execute("UPDATE jobs SET worker_pid = ? WHERE id = ?", (process.pid, job_id))
+        return True
+
+    def _finish(self, job_id: str, status: str, error: Optional[str] = None):
+        self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ? AND status = ?",
+            (status, time.time(), error, job_id, JOB_RUNNING)
+        )
+
+    def _reap(self):
+        for job_id, process in list(self._running.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self._running[job_id]
+            # A process that died without recording its outcome failed
+            self._finish(job_id, JOB_FAILED, f"Job process exited with code {process.exitcode}")
+            job = self.get(job_id)
+            if job is not None and job["status"] == JOB_SUCCEEDED and self.on_complete is not None:
+                tags = self._kinds[job["kind"]][2]
+                if tags:
+                    self.on_complete(tags)
+
+    def _cancel_requested(self):
+        if not self._running:
+            return
+        placeholders = ", ".join("?" for _ in self._running)
+        rows = self._execute(
+            f"SELECT id FROM jobs WHERE cancel_requested = 1 AND status = ? AND id IN ({placeholders})",
+            (JOB_RUNNING, *self._running)
+        )
+        for row in rows:
+            process = self._running.pop(row["id"])
+            self._terminate(process)
+            self._finish(row["id"], JOB_CANCELLED)
+            partial_path = os.path.join(self.results_dir, row["id"]) + ".partial"
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+    @staticmethod
+    def _terminate(process):
+        process.terminate()
+        process.join(TERMINATE_TIMEOUT)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def _renew_leases(self):
+        """
+        Extends the leases of the jobs this dispatcher is running.
+        """
+        if not self._running:
+            return
+        placeholders = ", ".join("?" for _ in self._running)
+        self._execute(
+            f"UPDATE jobs SET lease_expires_at = ? WHERE status = ? AND id IN ({placeholders})",
+            (time.time() + self.lease, JOB_RUNNING, *self._running)
+        )
+
+    def _recover_orphans(self):
+        """
+        Fails running jobs whose lease expired, e.g. after their dispatcher
+        crashed or its host went away. Jobs claimed before leases existed
+        count as leased from their start.
+        """
+        # One statement, so a lease renewed meanwhile is never failed
+        placeholders = ", ".join("?" for _ in self._running)
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, error = ? "
+            "WHERE status = ? AND COALESCE(lease_expires_at, started_at + ?) < ? "
+            f"AND id NOT IN ({placeholders})",
+            (JOB_FAILED, now, "Job process was lost", JOB_RUNNING, self.lease, now, *self._running)
+        )
+
+    def _prune(self):
+        rows = self._execute(
+            "DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ? RETURNING result_path",
+            (*FINISHED_STATES, time.time() - self.retention)
+        )
+        for row in rows:
+            if row["result_path"] and os.path.exists(row["result_path"]):
+                os.remove(row["result_path"])
@@ -0,0 +1,184 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+
+def diff_documents(old, new) -> dict:
+    """
+    Returns the parts of a JSON document that changed.
+
+    Nested objects are compared key by key; lists and scalars are replaced
+    as a whole. Keys removed from an object are sent as None.
+
+    Args:
+        old (dict or None): The document the client has.
+        new (dict): The current document.
+
+    Returns:
+        dict: The changed keys with their new values, empty if nothing changed.
+    """
+    if not isinstance(old, dict):
+        return dict(new)
+    delta = {}
+    for key in old.keys() | new.keys():
+        old_value, new_value = old.get(key), new.get(key)
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            nested = diff_documents(old_value, new_value)
+            if nested:
+                delta[key] = nested
+        elif old_value != new_value:
+            delta[key] = new_value
+    return delta
+
+
+def merge_delta(pending: dict, delta: dict):
+    """
+    Folds a newer delta into one that has not been sent yet.
+    """
+    for key, value in delta.items():
+        if isinstance(value, dict) and isinstance(pending.get(key), dict):
+            merge_delta(pending[key], value)
+        else:
+            pending[key] = value
+
+
+def sse_event(event: str, data, event_id: Optional[int] = None) -> str:
+    """
+    Formats one Server-Sent Events message with a JSON payload.
+    """
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class Subscription:
+    """
+    One connected client: the delta it has not received yet and an event
+    that wakes its sender. Idle clients cost this object and a parked task.
+    """
+    __slots__ = ("pending", "sequence", "ready")
+
+    def __init__(self, sequence: int):
+        self.pending = {}
+        self.sequence = sequence
+        self.ready = asyncio.Event()
+
+    def push(self, sequence: int, delta: dict):
+        merge_delta(self.pending, delta)
+        self.sequence = sequence
+        self.ready.set()
+
+    async def next(self, timeout: float):
+        """
+        Waits for the next delta.
+
+        Returns:
+            tuple or None: (sequence, delta), or None if timeout passed first.
+        """
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.ready.clear()
+        delta, self.pending = self.pending, {}
+        return self.sequence, delta
+
+
+class StatsBroker:
+    """
+    In-process pub/sub that pushes debounced dashboard deltas to subscribers.
+
+    Write paths call publish() from any thread once their transaction has
+    committed. The first event starts a debounce window; when it closes the
+    document is recomputed once, diffed against the last one sent, and the
+    delta is queued on every subscription. A subscriber that falls behind
+    gets the deltas merged into one, so no subscriber holds a backlog.
+
+    Args:
+        compute: Callable returning the current JSON-compatible document; it
+            runs in the threadpool.
+        debounce (float): Seconds to coalesce events before recomputing.
+    """
+
+    def __init__(self, compute, debounce: float = 1.0):
+        self.compute = compute
+        self.debounce = debounce
+        self.published = 0
+        self.recomputed = 0
+        self._subscribers = set()
+        self._loop = None
+        self._lock = None
+        self._flush_scheduled = False
+        self._snapshot = None
+        self._sequence = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, *tags):
+        """
+        Signals that data behind the document changed; safe from any thread.
+        """
+        self.published += 1
+        loop = self._loop
+        if loop is None or not self._subscribers or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._schedule_flush)
+
+    def _schedule_flush(self):
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_later(self.debounce, lambda: asyncio.ensure_future(self._flush()))
+
+    async def _flush(self):
+        async with self._lock:
+            self._flush_scheduled = False
+            if not self._subscribers:
+                return
+            document = await run_in_threadpool(self.compute)
+            self.recomputed += 1
+            delta = diff_documents(self._snapshot, document)
+            self._snapshot = document
+            if not delta:
+                return
+            self._sequence += 1
+            for subscription in self._subscribers:
+                subscription.push(self._sequence, delta)
+
+    async def subscribe(self):
+        """
+        Registers a subscriber.
+
+        Returns:
+            tuple: (subscription, sequence, snapshot) where snapshot is the
+                full current document to send first.
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._snapshot is None:
+                self._snapshot = await run_in_threadpool(self.compute)
+                self.recomputed += 1
+            subscription = Subscription(self._sequence)
+            self._subscribers.add(subscription)
+            return subscription, self._sequence, self._snapshot
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        Removes a subscriber; the snapshot is dropped with the last one,
+        since nothing keeps it current while nobody listens.
+        """
+        self._subscribers.discard(subscription)
+        if not self._subscribers:
+            self._snapshot = None
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "recomputed": self.recomputed,
+            "sequence": self._sequence,
+        }
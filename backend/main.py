@@ -1,118 +1,64 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, File, Header, HTTPException, Query, Response, UploadFile, WebSocket, WebSocketDisconnect, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Float, Date, func, extract
-from sqlalchemy.ext.declarative import declarative_base
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy import create_engine, func
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import text
+from sqlalchemy import text, insert, select
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from typing import Optional
-from pydantic import BaseModel
+from typing import Literal, Optional
+from pydantic import BaseModel, ValidationError
+import io
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from collections import Counter
+from types import SimpleNamespace
+
+from bookings import find_overlapping_trip, load_booked_intervals, load_window_bookings, longest_booking
+from cache import LRUCacheBackend, ResponseCache, SQLiteCacheBackend
+from conditional import REVISION_HEADER, etag_matches, make_etag, not_modified
+from csv_import import ImportHeaderError, import_csv
+from database import engine_options, install_sqlite_pragmas
+from export import export_response, write_export
+from fleet_analytics import analyze_fuel_expenses
+from fuel_ledger import add_fuel_entries, apply_fuel_entry, ensure_fuel_ledgers, fuel_entry, rebuild_fuel_ledgers
+from instrumentation import QueryMonitor, RequestMetrics, RequestMetricsMiddleware
+from invalidation_bus import InvalidationBus
+from jobs import JOB_SUCCEEDED, RESULT_EXTENSIONS, JobQueue
+from live_updates import StatsBroker, sse_event
+from migrations import run_migrations
+from models import (
+    Base, Driver, FuelExpense, Maintenance, RevokedToken, Tombstone, Trip,
+    User, Vehicle, VehicleFuelLedger,
+)
+from pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, expansion_names, list_response
+from serialization import fast_response, wants_msgpack
+from password_hashing import PasswordHasher, PasswordHashingBusy
+from rollups import (
+    ROLLUP_DRIVERS, ROLLUP_MAINTENANCE_COST, ROLLUP_TOTAL_PERIOD, ROLLUP_TRIPS, ROLLUP_VEHICLES, bump_rollup,
+    ensure_rollups, month_key, rebuild_rollups, rollup_months, rollup_value,
+)
+from revisions import current_revision, ensure_revision_counter, entity_revision, stamp_rows
+from scheduling import ScheduleIndex, as_naive, sweep_conflicts
+from token_cache import TokenCache, token_digest
+from upcoming import due_items, ensure_due_items, rebuild_due_items, refresh_due_items
 
 # Database configuration
-DATABASE_URL = "sqlite:///./fleet_manager.db"
-
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base = declarative_base()
-
-# SQLAlchemy Models
-
-class User(Base):
-    """
-    SQLAlchemy model for User.
-
-    Represents a user in the database with email and hashed password.
-    """
-    __tablename__ = "users"
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True)
-    hashed_password = Column(String)
-
-from sqlalchemy import Date
-
-class Vehicle(Base):
-    """
-    SQLAlchemy model for Vehicle.
-
-    Represents a vehicle with details like name, model, make, etc.
-    """
-    __tablename__ = "vehicles"
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True)
-    model = Column(String, nullable=True)
-    make = Column(String, nullable=True)
-    color = Column(String, nullable=True)
-    registration_number = Column(String, nullable=True)
-    license_expiry_date = Column(Date, nullable=True)
-    year_of_car = Column(Integer, nullable=True)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./fleet_manager.db")
 
-class Driver(Base):
-    """
-    SQLAlchemy model for Driver.
-
-    Represents a driver with personal and vehicle assignment details.
-    """
-    __tablename__ = "drivers"
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True)
-    vehicle_id = Column(Integer, nullable=True)
-    number_of_experience = Column(Integer, nullable=True)
-    license_number = Column(String, nullable=True)
-    contact_info = Column(String, nullable=True)
-
-class Trip(Base):
-    """
-    SQLAlchemy model for Trip.
-
-    Represents a trip with driver, vehicle, locations, and times.
-    """
-    __tablename__ = "trips"
-    id = Column(Integer, primary_key=True, index=True)
-    driver_id = Column(Integer, nullable=False)
-    vehicle_id = Column(Integer, nullable=False)
-    start_location = Column(String, nullable=False)
-    end_location = Column(String, nullable=False)
-    start_time = Column(DateTime, nullable=False)
-    end_time = Column(DateTime, nullable=False)
-
-class Maintenance(Base):
-    """
-    SQLAlchemy model for Maintenance records.
-
-    Represents maintenance activities with costs and dates.
-    """
-    __tablename__ = "maintenance"
-    id = Column(Integer, primary_key=True, index=True)
-    vehicle_id = Column(Integer, nullable=False)
-    description = Column(String, nullable=False)
-    cost = Column(Float, nullable=False)
-    maintenance_date = Column(Date, nullable=False)
-    next_maintenance_date = Column(Date, nullable=True)
-    
-class FuelExpense(Base):
-    """
-    SQLAlchemy model for Fuel and Expense records.
-
-    Represents fuel consumption and other expenses per vehicle.
-    """
-    __tablename__ = "fuel_expenses"
-    id = Column(Integer, primary_key=True, index=True)
-    vehicle_id = Column(Integer, nullable=False)
-    driver_id = Column(Integer, nullable=True)
-    expense_type = Column(String, nullable=False)  
-    fuel_type = Column(String, nullable=True)  
-    quantity = Column(Float, nullable=True)  
-    cost = Column(Float, nullable=False)  
-    odometer_reading = Column(Float, nullable=True) 
-    location = Column(String, nullable=True)  
-    expense_date = Column(Date, nullable=False)
-    notes = Column(String, nullable=True)
+# "sync" serves routes from def handlers on SessionLocal; "async" swaps the
+# CRUD, list and stats routes for async def handlers on an AsyncSession
+DB_MODE = os.getenv("DB_MODE", "sync")
 
-Base.metadata.create_all(bind=engine)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+install_sqlite_pragmas(engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Pydantic models
 
@@ -125,6 +71,13 @@ class UserCreate(BaseModel):
     email: str
     password: str
 
+class UserPrincipal(BaseModel):
+    """
+    Pydantic model for the authenticated user attached to a request.
+    """
+    id: int
+    email: str
+
 from typing import Optional
 from datetime import date
 
@@ -156,6 +109,26 @@ class VehicleUpdate(BaseModel):
     license_expiry_date: Optional[date] = None
     year_of_car: Optional[int] = None
 
+class VehicleSchema(BaseModel):
+    """
+    Pydantic model for vehicle response.
+
+    Used when a vehicle is embedded in another record.
+    """
+    id: int
+    name: Optional[str] = None
+    model: Optional[str] = None
+    make: Optional[str] = None
+    color: Optional[str] = None
+    registration_number: Optional[str] = None
+    license_expiry_date: Optional[date] = None
+    year_of_car: Optional[int] = None
+    revision: int = 0
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 class DriverCreate(BaseModel):
     """
     Pydantic model for creating a new driver.
@@ -180,6 +153,24 @@ class DriverUpdate(BaseModel):
     license_number: Optional[str] = None
     contact_info: Optional[str] = None
 
+class DriverSchema(BaseModel):
+    """
+    Pydantic model for driver response.
+
+    Used when a driver is embedded in another record.
+    """
+    id: int
+    name: Optional[str] = None
+    vehicle_id: Optional[int] = None
+    number_of_experience: Optional[int] = None
+    license_number: Optional[str] = None
+    contact_info: Optional[str] = None
+    revision: int = 0
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 class TripCreate(BaseModel):
     """
     Pydantic model for creating a new trip.
@@ -208,10 +199,55 @@ class TripSchema(BaseModel):
     end_location: str
     start_time: datetime
     end_time: datetime
+    revision: int = 0
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+class TripBulkRowResult(BaseModel):
+    """
+    Pydantic model for the outcome of one row of a bulk trip booking.
+    """
+    index: int
+    accepted: bool
+    trip_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class TripBulkReport(BaseModel):
+    """
+    Pydantic model for the per-row report of a bulk trip booking.
+    """
+    accepted: int
+    rejected: int
+    results: List[TripBulkRowResult]
+
+class AvailabilityWindow(BaseModel):
+    """
+    Pydantic model for a time window to check availability in.
+    """
+    start_time: datetime
+    end_time: datetime
+
+class AvailabilityQuery(BaseModel):
+    """
+    Pydantic model for a bulk availability search.
+
+    Leaving vehicle_ids or driver_ids out checks every vehicle or driver.
+    """
+    windows: List[AvailabilityWindow]
+    vehicle_ids: Optional[List[int]] = None
+    driver_ids: Optional[List[int]] = None
+
+class AvailabilityResult(BaseModel):
+    """
+    Pydantic model for the vehicles and drivers free during a window.
+    """
+    start_time: datetime
+    end_time: datetime
+    free_vehicle_ids: List[int]
+    free_driver_ids: List[int]
+
 class DashboardStats(BaseModel):
     """
     Pydantic model for dashboard statistics.
@@ -260,10 +296,25 @@ class MaintenanceSchema(BaseModel):
     cost: float
     maintenance_date: date
     next_maintenance_date: Optional[date] = None
+    revision: int = 0
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+class DueItemSchema(BaseModel):
+    """
+    Pydantic model for an upcoming maintenance or licence expiry.
+
+    days_until_due is negative once the item is overdue.
+    """
+    kind: Literal["maintenance", "license"]
+    vehicle_id: int
+    vehicle_name: Optional[str] = None
+    source_id: int
+    due_date: date
+    days_until_due: int
+
 class FuelExpenseCreate(BaseModel):
     vehicle_id: int
     driver_id: Optional[int] = None
@@ -300,6 +351,8 @@ class FuelExpenseSchema(BaseModel):
     location: Optional[str] = None
     expense_date: date
     notes: Optional[str] = None
+    revision: int = 0
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -310,16 +363,167 @@ class FuelExpenseStats(BaseModel):
     fuel_efficiency: Optional[float] = None  # km/l 
     average_cost_per_km: Optional[float] = None
 
+class MonthlySpend(BaseModel):
+    month: str
+    cost: float
+
+class RefuelOutlier(BaseModel):
+    expense_id: int
+    expense_date: date
+    quantity: float
+    distance: float  # km since the previous fill-up
+    km_per_litre: Optional[float] = None
+    score: float  # robust z-score of km_per_litre within the vehicle
+
+class VehicleFuelAnalytics(BaseModel):
+    vehicle_id: int
+    total_fuel_costs: float
+    total_other_expenses: float
+    fill_count: int
+    total_distance: float
+    total_litres: float
+    fuel_efficiency: Optional[float] = None  # km/l
+    cost_per_km: Optional[float] = None
+    monthly_spend: List[MonthlySpend]
+    outlier_refuels: List[RefuelOutlier]
+
+class FleetFuelAnalytics(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    vehicles: List[VehicleFuelAnalytics]
+
+class ImportRowError(BaseModel):
+    """
+    Pydantic model for a CSV row that could not be imported.
+    """
+    line: int  # line of the CSV file, the header being line 1
+    field: Optional[str] = None
+    detail: str
+
+class ImportReport(BaseModel):
+    """
+    Pydantic model for the outcome of a CSV import.
+
+    errors lists at most the first 1000 problems; rejected counts them all.
+    """
+    entity: str
+    imported: int
+    rejected: int
+    errors: List[ImportRowError]
+
+class JobCreate(BaseModel):
+    """
+    Pydantic model for submitting a background job.
+    """
+    kind: str
+    params: dict = {}
+
+class JobSchema(BaseModel):
+    """
+    Pydantic model for a background job.
+
+    result_url is set once the job succeeded.
+    """
+    id: str
+    kind: str
+    params: dict
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    cancel_requested: bool = False
+    error: Optional[str] = None
+    result_url: Optional[str] = None
+
+class ExportJobParams(BaseModel):
+    """
+    Pydantic model for the parameters of an export job.
+    """
+    format: Literal["ndjson", "csv"] = "ndjson"
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    vehicle_id: Optional[int] = None
+
+class FleetAnalyticsJobParams(BaseModel):
+    """
+    Pydantic model for the parameters of a fleet fuel analytics job.
+    """
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
         
 # Security
 SECRET_KEY = "your_secret_key_here_change_this"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing: bcrypt cost factor and the dedicated worker pool that
+# runs it, so login storms do not starve the threadpool used by CRUD routes
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "64"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+password_hasher = PasswordHasher(pwd_context, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-app = FastAPI(title="Fleet Manager API")
+# Verified token -> principal, so authenticated requests skip JWT decoding
+# and the user lookup until the token expires or is revoked
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+
+def prepare_database() -> list:
+    """
+    Brings the database up to date: creates missing tables, applies pending
+    migrations and builds the derived tables older databases lack.
+
+    Runs on startup and from the CLI scripts before they touch the
+    database; every step is a cheap no-op once the database is current.
+
+    Returns:
+        list: The migration versions applied by this call.
+    """
+    # create_all skips tables that already exist; bring older databases up to
+    # the current schema (columns and indexes included) in place. Both run
+    # under the schema lock, so workers starting at once upgrade it only once.
+    applied = run_migrations(engine, Base.metadata)
+    db = SessionLocal()
+    try:
+        ensure_revision_counter(db)
+        ensure_rollups(db)
+        ensure_fuel_ledgers(db)
+        ensure_due_items(db)
+    finally:
+        db.close()
+    return applied
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Prepares the database, then starts per-process background work in each
+    worker, after any fork.
+    """
+    prepare_database()
+    if invalidation_bus is not None:
+        invalidation_bus.start()
+    job_queue.start()
+    yield
+    job_queue.stop()
+    if invalidation_bus is not None:
+        invalidation_bus.stop()
+
+app = FastAPI(title="Fleet Manager API", lifespan=lifespan)
+
+@app.exception_handler(PasswordHashingBusy)
+def password_hashing_busy_handler(request, exc):
+    """
+    Turns a full password hashing queue into 429 Too Many Requests.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many login attempts in progress, please retry"},
+        headers={"Retry-After": "1"},
+    )
 
 # CORS
 app.add_middleware(
@@ -328,8 +532,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", REVISION_HEADER],
 )
 
+# Request instrumentation: per-request SQL accounting, Server-Timing headers,
+# Prometheus metrics and the slow query log (SLOW_QUERY_MS=0 disables it)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "250"))
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING", "1") == "1"
+
+query_monitor = QueryMonitor(SLOW_QUERY_MS)
+query_monitor.install(engine)
+query_monitor.install_row_counter(Session)
+request_metrics = RequestMetrics(query_monitor)
+app.add_middleware(RequestMetricsMiddleware, metrics=request_metrics, server_timing=SERVER_TIMING_ENABLED)
+
 def verify_password(plain_password, hashed_password):
     """
     Verifies a plain password against a hashed password.
@@ -368,10 +584,13 @@ def get_user(db: Session, email: str):
     """
     return db.query(User).filter(User.email == email).first()
 
-def authenticate_user(db: Session, email: str, password: str):
+async def authenticate_user(db: Session, email: str, password: str):
     """
     Authenticates a user by email and password.
 
+    Verification runs on the password hashing pool. If the stored hash uses
+    an outdated scheme or cost factor it is replaced with a fresh one.
+
     Args:
         db (Session): The database session.
         email (str): The email.
@@ -379,12 +598,19 @@ def authenticate_user(db: Session, email: str, password: str):
 
     Returns:
         User or False: The user object if authenticated, False otherwise.
+
+    Raises:
+        PasswordHashingBusy: If the hashing pool queue is full.
     """
-    user = get_user(db, email)
+    user = await run_in_threadpool(get_user, db, email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not verified:
         return False
+    if new_hash:
+        user.hashed_password = new_hash
+        await run_in_threadpool(db.commit)
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -417,9 +643,230 @@ def get_db():
     finally:
         db.close()
 
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def get_current_user(token: str = Depends(oauth2_scheme)):
+    """
+    Dependency resolving the bearer token to the authenticated user.
+
+    Verified tokens are served from token_cache; only the first request with
+    a token decodes the JWT, checks the revoked_tokens table and loads the
+    user from the database.
+
+    Args:
+        token (str): The bearer token.
+
+    Returns:
+        UserPrincipal: The authenticated user.
+
+    Raises:
+        HTTPException: If the token is invalid, expired, revoked or the user no longer exists.
+    """
+    principal = token_cache.get(token)
+    if principal is not None:
+        return principal
+    if token_cache.is_revoked(token):
+        raise credentials_exception
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    email = payload.get("sub")
+    expires_at = payload.get("exp")
+    if email is None or expires_at is None:
+        raise credentials_exception
+    digest = token_digest(token)
+    db = SessionLocal()
+    try:
+        revoked = db.get(RevokedToken, digest) is not None
+        user = None if revoked else get_user(db, email)
+    finally:
+        db.close()
+    if revoked:
+        token_cache.revoke(digest, expires_at)
+        raise credentials_exception
+    if user is None:
+        raise credentials_exception
+    principal = UserPrincipal(id=user.id, email=user.email)
+    token_cache.put(token, principal, expires_at)
+    return principal
+
+def rebuild_aggregates(db: Session) -> List[str]:
+    """
+    Recomputes every materialized aggregate from the fact tables: the
+    dashboard rollups, the fuel ledgers and the due items queue.
+
+    Shared by rebuild_stats.py and the rebuild-stats job.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        list: The names of the rebuilt aggregates.
+    """
+    rebuild_rollups(db)
+    rebuild_fuel_ledgers(db)
+    rebuild_due_items(db)
+    return ["rollups", "fuel_ledgers", "due_items"]
+
+# Opt-in list serialization that selects plain row tuples and encodes them
+# with orjson, skipping response_model validation; same wire format
+FAST_LIST_RESPONSES = os.getenv("FAST_LIST_RESPONSES", "0") == "1"
+
+def delta_statements(model, schema, since: int):
+    """
+    Selects the rows changed and the tombstones recorded after a revision,
+    both ordered by revision.
+
+    Returns:
+        tuple: (changed rows statement, tombstones statement).
+    """
+    columns = [getattr(model, name) for name in schema.model_fields]
+    return (
+        select(*columns).where(model.revision > since).order_by(model.revision, model.id),
+        select(Tombstone.entity_id, Tombstone.revision).where(
+            Tombstone.entity == model.__tablename__, Tombstone.revision > since
+        ).order_by(Tombstone.revision, Tombstone.id)
+    )
+
+def delta_response(
+    rows, tombstones, schema, revision: int, headers: dict, fast: bool = False, accept: Optional[str] = None
+) -> Response:
+    """
+    Builds a ?since= delta: the rows changed and the ids deleted after a revision.
+
+    Args:
+        rows: The changed rows read with delta_statements().
+        tombstones: The tombstones read with delta_statements().
+        schema: The Pydantic response model of a row.
+        revision (int): The revision the delta brings the client up to.
+        headers (dict): Headers to send with the delta.
+        fast (bool): Encode directly instead of validating each row.
+        accept (Optional[str]): The Accept request header, for the fast path.
+
+    Returns:
+        Response: {"revision", "changed", "deleted"}, ordered by revision.
+    """
+    changed_at = {row.id: row.revision for row in rows}
+    # A tombstone followed by a newer row with the same id (SQLite may reuse
+    # ids) is superseded by that row
+    deleted = [
+        {"id": entity_id, "revision": deleted_revision}
+        for entity_id, deleted_revision in tombstones
+        if changed_at.get(entity_id, -1) < deleted_revision
+    ]
+    if fast:
+        changed = [row._asdict() for row in rows]
+        return fast_response({"revision": revision, "changed": changed, "deleted": deleted}, accept, headers)
+    changed = [schema.model_validate(row._asdict()).model_dump() for row in rows]
+    return JSONResponse(jsonable_encoder({"revision": revision, "changed": changed, "deleted": deleted}), headers=headers)
+
+def revisioned_list(
+    db: Session, model, response: Response, if_none_match: Optional[str], since: Optional[int],
+    limit: Optional[int], cursor: Optional[str], fields: Optional[str],
+    expand: Optional[str] = None, schema=None, expansions: Optional[dict] = None, accept: Optional[str] = None
+):
+    """
+    Serves a list endpoint as a conditional GET, or as a delta with ?since=.
+
+    The ETag is derived from the revisions of the listed model (and of any
+    expanded ones) and the query parameters, so an unchanged list is
+    answered with 304 Not Modified after one indexed lookup per model. The
+    X-Revision header tells the client which revision to pass as since=
+    on its next poll.
+
+    MessagePack requests and, with FAST_LIST_RESPONSES=1, JSON requests take
+    the fast path of list_response.
+
+    Args:
+        db (Session): The database session.
+        model: The tracked SQLAlchemy model to list.
+        response (Response): The outgoing response.
+        if_none_match (Optional[str]): The If-None-Match request header.
+        since (Optional[int]): Return only changes after this revision.
+        limit, cursor, fields, expand, schema, expansions: As for list_response.
+        accept (Optional[str]): The Accept request header.
+
+    Returns:
+        list or Response: The rows, a delta, or 304 Not Modified.
+
+    Raises:
+        HTTPException: If since is combined with pagination, fields or expand.
+    """
+    related = list_related_models(since, limit, cursor, fields, expand, expansions)
+    revision = entity_revision(db, model)
+    related_revisions = [entity_revision(db, related_model) for related_model in related]
+    etag, headers, fast = list_etag(model, revision, related_revisions, since, limit, cursor, fields, expand, accept)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, headers)
+    if since is not None:
+        changed_statement, tombstones_statement = delta_statements(model, schema, since)
+        rows, tombstones = db.execute(changed_statement).all(), db.execute(tombstones_statement).all()
+        return delta_response(rows, tombstones, schema, revision, headers, fast, accept)
+
+    result = list_response(db, model, response, limit, cursor, fields, expand, schema, expansions, fast, accept)
+    (result if isinstance(result, Response) else response).headers.update(headers)
+    return result
+
+def list_related_models(
+    since: Optional[int], limit: Optional[int], cursor: Optional[str], fields: Optional[str],
+    expand: Optional[str], expansions: Optional[dict]
+) -> list:
+    """
+    Checks the parameters of a revisioned list and returns the models its
+    expand= embeds.
+
+    Raises:
+        HTTPException: If since is combined with pagination, fields or expand.
+    """
+    if since is not None and (limit is not None or cursor is not None or fields or expand):
+        raise HTTPException(status_code=400, detail="since cannot be combined with limit, cursor, fields or expand")
+    expansions = expansions or {}
+    return [expansions[name][0].property.mapper.class_ for name in expansion_names(expand, expansions)]
+
+def list_etag(
+    model, revision: int, related_revisions: List[int], since: Optional[int], limit: Optional[int],
+    cursor: Optional[str], fields: Optional[str], expand: Optional[str], accept: Optional[str]
+):
+    """
+    Derives the ETag of a revisioned list from the revisions and the query.
+
+    Returns:
+        tuple: (etag, headers to send with the list, whether to take the fast path).
+    """
+    msgpack_requested = wants_msgpack(accept)
+    etag = make_etag(
+        model.__tablename__, revision, *related_revisions, since, limit, cursor, fields, expand, msgpack_requested
+    )
+    return etag, {"ETag": etag, REVISION_HEADER: str(revision)}, FAST_LIST_RESPONSES or msgpack_requested
+
+def conditional_stats(db: Session, response: Response, if_none_match: Optional[str], endpoint: str, compute):
+    """
+    Serves a stats endpoint as a conditional GET.
+
+    Stats only change through tracked writes, so the ETag combines the
+    latest revision with the current date, the same granularity as the
+    stats cache keys.
+    """
+    etag = stats_etag(endpoint, current_revision(db))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return compute()
+
+def stats_etag(endpoint: str, revision: int) -> str:
+    """
+    Returns the ETag of a stats endpoint as of a revision.
+    """
+    return make_etag(endpoint, date.today().isoformat(), revision)
+
 # User registration endpoint
 @app.post("/register")
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: Session = Depends(get_db)):
     """
     Registers a new user.
 
@@ -432,20 +879,20 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 
     Raises:
         HTTPException: If the email is already registered.
+        PasswordHashingBusy: If the hashing pool queue is full (answered with 429).
     """
-    db_user = get_user(db, user.email)
+    db_user = await run_in_threadpool(get_user, db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     new_user = User(email=user.email, hashed_password=hashed_password)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await run_in_threadpool(db.commit)
     return {"message": "User created successfully"}
 
 # Login endpoint
 @app.post("/token")
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """
     Logs in a user and returns an access token.
 
@@ -458,8 +905,9 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
 
     Raises:
         HTTPException: If authentication fails.
+        PasswordHashingBusy: If the hashing pool queue is full (answered with 429).
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -472,6 +920,43 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
+@app.post("/logout")
+def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Revokes the caller's access token.
+
+    The revocation is stored until the token expires, so it also holds in
+    workers that start later, and expired revocations are pruned.
+
+    Args:
+        token (str): The bearer token.
+        current_user (UserPrincipal): The authenticated user.
+        db (Session): The database session.
+
+    Returns:
+        dict: A message confirming the logout.
+    """
+    digest = token_digest(token)
+    expires_at = jwt.get_unverified_claims(token)["exp"]
+    db.query(RevokedToken).filter(RevokedToken.expires_at <= time.time()).delete(synchronize_session=False)
+    db.merge(RevokedToken(digest=digest, expires_at=expires_at))
+    db.commit()
+    token_cache.revoke(digest, expires_at)
+    if invalidation_bus is not None:
+        invalidation_bus.publish("token-revoked", {"digest": digest, "expires_at": expires_at})
+    return {"message": "Logged out"}
+
+@app.get("/users/me", response_model=UserPrincipal)
+def read_current_user(current_user: UserPrincipal = Depends(get_current_user)):
+    """
+    Returns the authenticated user.
+    """
+    return current_user
+
 @app.get("/")
 def read_root():
     """
@@ -483,15 +968,33 @@ def read_root():
     return {"message": "Welcome to Fleet Manager API"}
 
 @app.get("/vehicles")
-def get_vehicles(db: Session = Depends(get_db)):
-    vehicles = db.query(Vehicle).all()
-    return vehicles
+def get_vehicles(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Get vehicles, or with since=<revision> only those changed or deleted
+    after that revision. Answers 304 when If-None-Match matches the ETag.
+    """
+    return revisioned_list(
+        db, Vehicle, response, if_none_match, since, limit, cursor, fields, schema=VehicleSchema, accept=accept
+    )
 
 @app.post("/vehicles")
 def create_vehicle(vehicle: VehicleCreate, db: Session = Depends(get_db)):
-    db_vehicle = Vehicle(name=vehicle.name)
+    db_vehicle = Vehicle(**vehicle.model_dump())
     db.add(db_vehicle)
+    bump_rollup(db, ROLLUP_VEHICLES, ROLLUP_TOTAL_PERIOD, 1)
+    db.flush()
+    refresh_due_items(db, [db_vehicle.id])
     db.commit()
+    notify_change(TAG_VEHICLES)
     db.refresh(db_vehicle)
     return db_vehicle
 
@@ -500,8 +1003,11 @@ def update_vehicle(vehicle_id: int, vehicle: VehicleUpdate, db: Session = Depend
     db_vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
     if not db_vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
-    db_vehicle.name = vehicle.name
+    for field, value in vehicle.model_dump().items():
+        setattr(db_vehicle, field, value)
+    refresh_due_items(db, [vehicle_id])
     db.commit()
+    notify_change(TAG_VEHICLES)
     db.refresh(db_vehicle)
     return db_vehicle
 
@@ -511,19 +1017,38 @@ def delete_vehicle(vehicle_id: int, db: Session = Depends(get_db)):
     if not db_vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     db.delete(db_vehicle)
+    bump_rollup(db, ROLLUP_VEHICLES, ROLLUP_TOTAL_PERIOD, -1)
+    refresh_due_items(db, [vehicle_id])
     db.commit()
+    notify_change(TAG_VEHICLES)
     return {"detail": "Vehicle deleted"}
 
 @app.get("/drivers")
-def get_drivers(db: Session = Depends(get_db)):
-    drivers = db.query(Driver).all()
-    return drivers
+def get_drivers(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Get drivers, or with since=<revision> only those changed or deleted
+    after that revision. Answers 304 when If-None-Match matches the ETag.
+    """
+    return revisioned_list(
+        db, Driver, response, if_none_match, since, limit, cursor, fields, schema=DriverSchema, accept=accept
+    )
 
 @app.post("/drivers")
 def create_driver(driver: DriverCreate, db: Session = Depends(get_db)):
     db_driver = Driver(name=driver.name, vehicle_id=driver.vehicle_id)
     db.add(db_driver)
+    bump_rollup(db, ROLLUP_DRIVERS, ROLLUP_TOTAL_PERIOD, 1)
     db.commit()
+    notify_change(TAG_DRIVERS)
     db.refresh(db_driver)
     return db_driver
 
@@ -535,6 +1060,7 @@ def update_driver(driver_id: int, driver: DriverUpdate, db: Session = Depends(ge
     db_driver.name = driver.name
     db_driver.vehicle_id = driver.vehicle_id
     db.commit()
+    notify_change(TAG_DRIVERS)
     db.refresh(db_driver)
     return db_driver
 
@@ -544,23 +1070,140 @@ def delete_driver(driver_id: int, db: Session = Depends(get_db)):
     if not db_driver:
         raise HTTPException(status_code=404, detail="Driver not found")
     db.delete(db_driver)
+    bump_rollup(db, ROLLUP_DRIVERS, ROLLUP_TOTAL_PERIOD, -1)
     db.commit()
+    notify_change(TAG_DRIVERS)
     return {"detail": "Driver deleted"}
 
+# Relationships the list endpoints can embed with expand=, as
+# name -> (relationship, schema of the embedded row)
+TRIP_EXPANSIONS = {"driver": (Trip.driver, DriverSchema), "vehicle": (Trip.vehicle, VehicleSchema)}
+MAINTENANCE_EXPANSIONS = {"vehicle": (Maintenance.vehicle, VehicleSchema)}
+FUEL_EXPENSE_EXPANSIONS = {"vehicle": (FuelExpense.vehicle, VehicleSchema), "driver": (FuelExpense.driver, DriverSchema)}
+
 @app.get("/trips", response_model=List[TripSchema])
-def get_trips(db: Session = Depends(get_db)):
-    trips = db.query(Trip).all()
-    return trips
+def get_trips(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Get trips, optionally paginated with limit/cursor, projected to the
+    columns listed in fields, and with expand=driver,vehicle embedding the
+    driver and vehicle of each trip. since=<revision> returns only the trips
+    changed or deleted after that revision; If-None-Match is answered with
+    304 while the list is unchanged.
+    """
+    return revisioned_list(
+        db, Trip, response, if_none_match, since, limit, cursor, fields, expand, TripSchema, TRIP_EXPANSIONS, accept
+    )
+
+# Columns written by the exports: the public fields of each record, without
+# internal bookkeeping such as year_month, duration_seconds or revisions
+TRIP_EXPORT_COLUMNS = ["id", *TripCreate.model_fields]
+FUEL_EXPENSE_EXPORT_COLUMNS = ["id", *FuelExpenseCreate.model_fields]
+
+@app.get("/trips/export")
+def export_trips(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    vehicle_id: Optional[int] = None
+):
+    """
+    Stream trips as NDJSON or CSV, optionally filtered by start date range
+    (inclusive) and vehicle.
+    """
+    statement = trip_export_statement(date_from, date_to, vehicle_id)
+    return export_response(SessionLocal, statement, TRIP_EXPORT_COLUMNS, export_format, "trips")
+
+def trip_export_statement(date_from: Optional[date], date_to: Optional[date], vehicle_id: Optional[int]):
+    """
+    Builds the select statement of a trips export.
+    """
+    statement = select(*(getattr(Trip, column) for column in TRIP_EXPORT_COLUMNS)).order_by(Trip.id)
+    if date_from is not None:
+        statement = statement.where(Trip.start_time >= datetime.combine(date_from, datetime.min.time()))
+    if date_to is not None:
+        statement = statement.where(Trip.start_time < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    if vehicle_id is not None:
+        statement = statement.where(Trip.vehicle_id == vehicle_id)
+    return statement
+
+def load_trip_intervals(kind: str, resource_id: int):
+    """
+    Loads every booked interval of a driver or vehicle for the schedule index.
+
+    Args:
+        kind (str): "driver" or "vehicle".
+        resource_id (int): The driver or vehicle id.
+
+    Returns:
+        list: (start_time, end_time, trip_id) rows.
+    """
+    column = Trip.driver_id if kind == "driver" else Trip.vehicle_id
+    db = SessionLocal()
+    try:
+        return db.query(Trip.start_time, Trip.end_time, Trip.id).filter(column == resource_id).all()
+    finally:
+        db.close()
+
+# Optional in-process interval index for double-booking checks. Only valid
+# while this process is the sole writer of the trips table.
+TRIP_INTERVAL_INDEX_ENABLED = os.getenv("TRIP_INTERVAL_INDEX", "0") == "1"
+trip_schedule = ScheduleIndex(load_trip_intervals) if TRIP_INTERVAL_INDEX_ENABLED else None
+
+def find_trip_conflict(db: Session, trip: TripCreate):
+    """
+    Checks whether the driver or vehicle of a trip is already booked.
+
+    Uses the in-process schedule index when enabled, otherwise runs one
+    index range probe for the driver and one for the vehicle.
+
+    Args:
+        db (Session): The database session.
+        trip (TripCreate): The requested trip.
+
+    Returns:
+        int or None: The id of a conflicting trip, or None.
+    """
+    if trip_schedule is not None:
+        return trip_schedule.find_conflict(trip.driver_id, trip.vehicle_id, trip.start_time, trip.end_time)
+    lookback = longest_booking(db)
+    conflict = find_overlapping_trip(db, Trip.driver_id, trip.driver_id, trip.start_time, trip.end_time, lookback)
+    if conflict is None:
+        conflict = find_overlapping_trip(db, Trip.vehicle_id, trip.vehicle_id, trip.start_time, trip.end_time, lookback)
+    return conflict
 
 @app.post("/trips")
 def create_trip(trip: TripCreate, db: Session = Depends(get_db)):
+    if trip_schedule is not None:
+        with trip_schedule.lock:
+            return book_trip(trip, db)
+    return book_trip(trip, db)
+
+def book_trip(trip: TripCreate, db: Session):
+    """
+    Checks for double-booking and inserts the trip.
+
+    Args:
+        trip (TripCreate): The requested trip.
+        db (Session): The database session.
+
+    Returns:
+        Trip: The created trip.
+
+    Raises:
+        HTTPException: If the driver or vehicle is already booked.
+    """
     # Check for double-booking
-    existing_trip = db.query(Trip).filter(
-        ((Trip.driver_id == trip.driver_id) | (Trip.vehicle_id == trip.vehicle_id)),
-        Trip.start_time < trip.end_time,
-        Trip.end_time > trip.start_time
-    ).first()
-    if existing_trip:
+    if find_trip_conflict(db, trip) is not None:
         raise HTTPException(status_code=400, detail="Driver or vehicle is already booked for this time period")
 
     db_trip = Trip(
@@ -572,110 +1215,452 @@ def create_trip(trip: TripCreate, db: Session = Depends(get_db)):
         end_time=trip.end_time
     )
     db.add(db_trip)
+    bump_rollup(db, ROLLUP_TRIPS, ROLLUP_TOTAL_PERIOD, 1)
+    bump_rollup(db, ROLLUP_TRIPS, month_key(trip.start_time), 1)
     db.commit()
+    notify_change(TAG_TRIPS)
     db.refresh(db_trip)
+    if trip_schedule is not None:
+        trip_schedule.add(db_trip.driver_id, db_trip.vehicle_id, db_trip.start_time, db_trip.end_time, db_trip.id)
     return db_trip
 
+# Bulk booking limits
+MAX_BULK_TRIPS = 5000
+
+@app.post("/trips/bulk", response_model=TripBulkReport)
+def create_trips_bulk(trips: List[TripCreate], db: Session = Depends(get_db)):
+    """
+    Books a batch of trips in a single transaction.
+
+    Each row is checked against existing bookings and against the other rows
+    of the batch; accepted rows are inserted together and rejected rows are
+    reported with the reason.
+    """
+    if len(trips) > MAX_BULK_TRIPS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_TRIPS} trips can be booked at once")
+    if trip_schedule is not None:
+        with trip_schedule.lock:
+            return book_trips_bulk(trips, db)
+    return book_trips_bulk(trips, db)
+
+def book_trips_bulk(trips: List[TripCreate], db: Session):
+    """
+    Checks a batch of trips for double-booking and inserts the accepted rows.
+
+    Args:
+        trips (List[TripCreate]): The requested trips.
+        db (Session): The database session.
+
+    Returns:
+        TripBulkReport: The per-row accept/reject report.
+    """
+    results = [TripBulkRowResult(index=index, accepted=False) for index in range(len(trips))]
+    candidates = []
+    for index, trip in enumerate(trips):
+        if as_naive(trip.end_time) <= as_naive(trip.start_time):
+            results[index].detail = "End time must be after start time"
+        else:
+            candidates.append(index)
+
+    # Conflicts with trips already in the database
+    if trip_schedule is not None:
+        booked_index = trip_schedule
+    else:
+        booked = load_booked_intervals(db, [trips[index] for index in candidates])
+        booked_index = ScheduleIndex(lambda kind, resource_id: booked.get((kind, resource_id), ()))
+    free = []
+    for index in candidates:
+        trip = trips[index]
+        conflict = booked_index.find_conflict(trip.driver_id, trip.vehicle_id, trip.start_time, trip.end_time)
+        if conflict is not None:
+            results[index].detail = f"Driver or vehicle is already booked by trip {conflict}"
+        else:
+            free.append(index)
+
+    # Conflicts between rows of the batch itself
+    collisions = sweep_conflicts(
+        (index, (("driver", trips[index].driver_id), ("vehicle", trips[index].vehicle_id)),
+         trips[index].start_time, trips[index].end_time)
+        for index in free
+    )
+    accepted = [index for index in free if index not in collisions]
+    for index, other in collisions.items():
+        results[index].detail = f"Driver or vehicle is already booked by row {other} of this batch"
+
+    if accepted:
+        rows = [trips[index].model_dump() for index in accepted]
+        stamp_rows(db, rows)
+        trip_ids = db.execute(
+            insert(Trip).returning(Trip.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        bump_rollup(db, ROLLUP_TRIPS, ROLLUP_TOTAL_PERIOD, len(accepted))
+        for month, trip_count in Counter(month_key(trips[index].start_time) for index in accepted).items():
+            bump_rollup(db, ROLLUP_TRIPS, month, trip_count)
+        db.commit()
+        notify_change(TAG_TRIPS)
+        for index, trip_id in zip(accepted, trip_ids):
+            results[index].accepted = True
+            results[index].trip_id = trip_id
+            if trip_schedule is not None:
+                trip = trips[index]
+                trip_schedule.add(trip.driver_id, trip.vehicle_id, trip.start_time, trip.end_time, trip_id)
+
+    return TripBulkReport(
+        accepted=len(accepted),
+        rejected=len(trips) - len(accepted),
+        results=results
+    )
+
+# Availability search limits
+MAX_AVAILABILITY_WINDOWS = 1000
+
+def find_availability(db: Session, query: AvailabilityQuery) -> List[AvailabilityResult]:
+    """
+    Finds the vehicles and drivers with no trip overlapping each window.
+
+    Uses the in-process trip_schedule when it is enabled. Otherwise the
+    trips around the windows are loaded once and every window is answered
+    by a bisect over them, so the cost follows the trips near the windows
+    rather than the size of the fleet or its history.
+
+    Args:
+        db (Session): The database session.
+        query (AvailabilityQuery): The windows and optional resource filters.
+
+    Returns:
+        List[AvailabilityResult]: One result per window, in request order.
+
+    Raises:
+        HTTPException: If there are too many windows or a window ends
+            before it starts.
+    """
+    if len(query.windows) > MAX_AVAILABILITY_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_AVAILABILITY_WINDOWS} windows can be searched at once")
+    for window in query.windows:
+        if as_naive(window.end_time) <= as_naive(window.start_time):
+            raise HTTPException(status_code=400, detail="End time must be after start time")
+
+    vehicle_query = db.query(Vehicle.id).order_by(Vehicle.id)
+    if query.vehicle_ids is not None:
+        vehicle_query = vehicle_query.filter(Vehicle.id.in_(query.vehicle_ids))
+    driver_query = db.query(Driver.id).order_by(Driver.id)
+    if query.driver_ids is not None:
+        driver_query = driver_query.filter(Driver.id.in_(query.driver_ids))
+    vehicle_ids = [vehicle_id for (vehicle_id,) in vehicle_query]
+    driver_ids = [driver_id for (driver_id,) in driver_query]
+
+    if trip_schedule is None:
+        bookings, trip_resources = load_window_bookings(db, query.windows)
+
+    results = []
+    for window in query.windows:
+        if trip_schedule is not None:
+            free_vehicles = [
+                vehicle_id for vehicle_id in vehicle_ids
+                if trip_schedule.is_free("vehicle", vehicle_id, window.start_time, window.end_time)
+            ]
+            free_drivers = [
+                driver_id for driver_id in driver_ids
+                if trip_schedule.is_free("driver", driver_id, window.start_time, window.end_time)
+            ]
+        else:
+            busy_drivers, busy_vehicles = set(), set()
+            for _, _, trip_id in bookings.overlapping(window.start_time, window.end_time):
+                driver_id, vehicle_id = trip_resources[trip_id]
+                busy_drivers.add(driver_id)
+                busy_vehicles.add(vehicle_id)
+            free_vehicles = [vehicle_id for vehicle_id in vehicle_ids if vehicle_id not in busy_vehicles]
+            free_drivers = [driver_id for driver_id in driver_ids if driver_id not in busy_drivers]
+        results.append(AvailabilityResult(
+            start_time=window.start_time,
+            end_time=window.end_time,
+            free_vehicle_ids=free_vehicles,
+            free_driver_ids=free_drivers
+        ))
+    return results
+
+@app.get("/availability", response_model=AvailabilityResult)
+def get_availability(start_time: datetime, end_time: datetime, db: Session = Depends(get_db)):
+    """
+    List the vehicles and drivers with no trip between start_time and end_time.
+    """
+    return find_availability(db, AvailabilityQuery(windows=[AvailabilityWindow(start_time=start_time, end_time=end_time)]))[0]
+
+@app.post("/availability", response_model=List[AvailabilityResult])
+def search_availability(query: AvailabilityQuery, db: Session = Depends(get_db)):
+    """
+    List the free vehicles and drivers for many windows in one request.
+    """
+    return find_availability(db, query)
+
+# Stats response cache
+STATS_CACHE_BACKEND = os.getenv("STATS_CACHE_BACKEND", "memory")
+STATS_CACHE_TTL_SECONDS = float(os.getenv("STATS_CACHE_TTL_SECONDS", "60"))
+STATS_CACHE_MAX_ENTRIES = int(os.getenv("STATS_CACHE_MAX_ENTRIES", "256"))
+STATS_CACHE_PATH = os.getenv("STATS_CACHE_PATH", "./fleet_manager_cache.db")
+
+# Entity tags used to invalidate cached responses
+TAG_VEHICLES = "vehicles"
+TAG_DRIVERS = "drivers"
+TAG_TRIPS = "trips"
+TAG_MAINTENANCE = "maintenance"
+TAG_FUEL_EXPENSES = "fuel_expenses"
+
+if STATS_CACHE_BACKEND == "sqlite":
+    stats_cache = ResponseCache(SQLiteCacheBackend(STATS_CACHE_PATH), ttl=STATS_CACHE_TTL_SECONDS)
+else:
+    stats_cache = ResponseCache(LRUCacheBackend(STATS_CACHE_MAX_ENTRIES), ttl=STATS_CACHE_TTL_SECONDS)
+
+# Live dashboard push: write paths publish their tags after committing and
+# subscribers get the dashboard deltas at most once per debounce window
+LIVE_STATS_DEBOUNCE_SECONDS = float(os.getenv("LIVE_STATS_DEBOUNCE_SECONDS", "1.0"))
+LIVE_STATS_KEEPALIVE_SECONDS = float(os.getenv("LIVE_STATS_KEEPALIVE_SECONDS", "15"))
+
+def live_dashboard() -> dict:
+    """
+    Computes the dashboard document pushed to live subscribers, sharing the
+    /stats/dashboard cache entry with polling clients.
+    """
+    db = SessionLocal()
+    try:
+        return stats_cache.get_or_set(
+            stats_cache_key("stats/dashboard"),
+            (TAG_VEHICLES, TAG_DRIVERS, TAG_TRIPS, TAG_MAINTENANCE),
+            lambda: build_dashboard(db)
+        )
+    finally:
+        db.close()
+
+dashboard_broker = StatsBroker(live_dashboard, LIVE_STATS_DEBOUNCE_SECONDS)
+
+def notify_change(*tags):
+    """
+    Called by write paths after commit: drops the cached stats tagged with
+    tags and tells live dashboard subscribers that data changed.
+    """
+    stats_cache.invalidate(*tags)
+    dashboard_broker.publish(*tags)
+    if invalidation_bus is not None:
+        invalidation_bus.publish("stats", list(tags))
+
+# Cross-worker invalidation: with several worker processes, INVALIDATION_BUS=sqlite
+# relays stats invalidations and token revocations to the other workers
+# through a shared SQLite file, so their in-process caches stay coherent
+INVALIDATION_BUS = os.getenv("INVALIDATION_BUS", "none")
+INVALIDATION_BUS_PATH = os.getenv("INVALIDATION_BUS_PATH", "./fleet_manager_bus.db")
+INVALIDATION_BUS_POLL_SECONDS = float(os.getenv("INVALIDATION_BUS_POLL_SECONDS", "0.2"))
+
+def apply_remote_change(tags: List[str]):
+    """
+    Applies a change committed by another worker to this worker's state.
+    """
+    stats_cache.invalidate(*tags)
+    dashboard_broker.publish(*tags)
+    if trip_schedule is not None and TAG_TRIPS in tags:
+        trip_schedule.clear()
+
+def apply_remote_revocation(payload: dict):
+    """
+    Applies a token revocation published by another worker.
+    """
+    token_cache.revoke(payload["digest"], payload["expires_at"])
+
+if INVALIDATION_BUS == "sqlite":
+    invalidation_bus = InvalidationBus(INVALIDATION_BUS_PATH, INVALIDATION_BUS_POLL_SECONDS)
+    invalidation_bus.subscribe("stats", apply_remote_change)
+    invalidation_bus.subscribe("token-revoked", apply_remote_revocation)
+else:
+    invalidation_bus = None
+
+def reset_after_fork():
+    """
+    Drops connections and threads inherited from a parent that imported
+    the app before forking workers (serve.py --preload).
+    """
+    engine.dispose(close=False)
+    if hasattr(stats_cache.backend, "after_fork"):
+        stats_cache.backend.after_fork()
+    if invalidation_bus is not None:
+        invalidation_bus.after_fork()
+    job_queue.after_fork()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_after_fork)
+
+def stats_cache_key(endpoint: str, **params) -> str:
+    """
+    Builds a stats cache key; the current date is part of every key because
+    the 12 month window and "this month" move with it.
+    """
+    return ResponseCache.key(endpoint, day=date.today().isoformat(), **params)
+
 # Dashboard endpoints
+def stats_window_start() -> datetime:
+    """
+    Returns the start of the 12 month window used by the dashboard.
+    """
+    return datetime.now() - timedelta(days=365)
+
+def next_month_start(value: datetime) -> datetime:
+    """
+    Returns midnight on the first day of the month after value.
+    """
+    return (value.replace(day=1, hour=0, minute=0, second=0, microsecond=0) + timedelta(days=32)).replace(day=1)
+
 @app.get("/stats/summary", response_model=DashboardStats)
-def get_dashboard_summary(db: Session = Depends(get_db)):
+def get_dashboard_summary(
+    response: Response, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)
+):
     """
     Get dashboard summary statistics including counts and monthly data.
     """
-    # Total Counts
-    total_vehicles = db.query(func.count(Vehicle.id)).scalar() or 0
-    total_drivers = db.query(func.count(Driver.id)).scalar() or 0
-    total_trips = db.query(func.count(Trip.id)).scalar() or 0
+    return conditional_stats(db, response, if_none_match, "stats/summary", lambda: stats_cache.get_or_set(
+        stats_cache_key("stats/summary"),
+        (TAG_VEHICLES, TAG_DRIVERS, TAG_TRIPS, TAG_MAINTENANCE),
+        lambda: build_dashboard_stats(db, monthly_maintenance_costs(db))
+    ))
 
-    # Trips this month (current month)
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    trips_this_month = db.query(func.count(Trip.id)).filter(
-        extract('month', Trip.start_time) == current_month,
-        extract('year', Trip.start_time) == current_year
-    ).scalar() or 0
+def build_dashboard_stats(db: Session, maintenance_costs_by_month: List[MaintenanceCostData]):
+    """
+    Builds the summary statistics from the rollups.
 
+    Args:
+        db (Session): The database session.
+        maintenance_costs_by_month (List[MaintenanceCostData]): The monthly
+            maintenance costs of the last 12 months.
+
+    Returns:
+        DashboardStats: The summary statistics.
+    """
+    counts = {field: int(rollup_value(db, metric, period)) for field, (metric, period) in dashboard_rollups().items()}
+    return dashboard_stats(counts, maintenance_costs_by_month)
+
+def dashboard_rollups() -> dict:
+    """
+    Returns the rollups behind the summary counts, as
+    DashboardStats field -> (metric, period).
+    """
+    return {
+        "total_vehicles": (ROLLUP_VEHICLES, ROLLUP_TOTAL_PERIOD),
+        "total_drivers": (ROLLUP_DRIVERS, ROLLUP_TOTAL_PERIOD),
+        "total_trips": (ROLLUP_TRIPS, ROLLUP_TOTAL_PERIOD),
+        # Trips this month (current month)
+        "trips_this_month": (ROLLUP_TRIPS, month_key(datetime.now())),
+    }
+
+def dashboard_stats(counts: dict, maintenance_costs_by_month: List[MaintenanceCostData]) -> DashboardStats:
+    """
+    Assembles the summary statistics from the dashboard_rollups() counts.
+    """
     # Total maintenance costs (from last 12 months)
-    one_year_ago = datetime.now() - timedelta(days=365)
-    maintenance_costs = db.query(func.coalesce(func.sum(Maintenance.cost), 0)).filter(
-        Maintenance.maintenance_date >= one_year_ago
-    ).scalar() or 0.0
-
-    return DashboardStats(
-        total_vehicles=total_vehicles,
-        total_drivers=total_drivers,
-        total_trips=total_trips,
-        trips_this_month=trips_this_month,
-        maintenance_costs=maintenance_costs
-    )
+    maintenance_costs = sum(item.cost for item in maintenance_costs_by_month)
+    return DashboardStats(**counts, maintenance_costs=maintenance_costs)
 @app.get("/stats/monthly-trips", response_model=List[MonthlyTripData])
-def get_monthly_trips(db: Session = Depends(get_db)):
+def get_monthly_trips(
+    response: Response, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)
+):
     """
     Get monthly trip counts for the last 12 months.
     """
+    return conditional_stats(db, response, if_none_match, "stats/monthly-trips", lambda: stats_cache.get_or_set(
+        stats_cache_key("stats/monthly-trips"), (TAG_TRIPS,), lambda: monthly_trip_counts(db)
+    ))
+
+def monthly_trip_counts(db: Session):
+    """
+    Computes monthly trip counts for the last 12 months.
+    """
     # Calculate date 12 months ago
-    twelve_months_ago = datetime.now() - timedelta(days=365)
-    
-    # Query for monthly trip counts
-    monthly_trips = db.query(
-        func.strftime('%Y-%m', Trip.start_time).label('month'),
-        func.count(Trip.id).label('trip_count')
-    ).filter(
-        Trip.start_time >= twelve_months_ago
-    ).group_by(
-        func.strftime('%Y-%m', Trip.start_time)
-    ).order_by(
-        func.strftime('%Y-%m', Trip.start_time)
-    ).all()
-    
-    # Format the response
+    twelve_months_ago = stats_window_start()
+    first_month_count = db.execute(first_month_trips_statement(twelve_months_ago)).scalar()
+    months = rollup_months(db, ROLLUP_TRIPS, month_key(twelve_months_ago))
+    return monthly_trip_data(twelve_months_ago, first_month_count, months)
+
+def first_month_trips_statement(window_start: datetime):
+    """
+    Counts the trips of the first month of the window, which is only partly
+    inside it and so cannot come from the rollups.
+    """
+    return select(func.count(Trip.id)).where(
+        Trip.start_time >= window_start,
+        Trip.start_time < next_month_start(window_start)
+    )
+
+def monthly_trip_data(window_start: datetime, first_month_count: Optional[int], months) -> List[MonthlyTripData]:
+    """
+    Assembles the monthly trip counts from the first month's direct count
+    and the whole months' rollups.
+    """
     result = []
-    for month_data in monthly_trips:
-        result.append(MonthlyTripData(
-            month=month_data.month,
-            trip_count=month_data.trip_count
-        ))
-    
+    if first_month_count:
+        result.append(MonthlyTripData(month=month_key(window_start), trip_count=first_month_count))
+    for month, trip_count in months:
+        result.append(MonthlyTripData(month=month, trip_count=int(trip_count)))
     return result
 
 @app.get("/stats/maintenance-costs", response_model=List[MaintenanceCostData])
-def get_maintenance_costs(db: Session = Depends(get_db)):
+def get_maintenance_costs(
+    response: Response, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)
+):
     """
     Get monthly maintenance costs for the last 12 months.
     """
+    return conditional_stats(db, response, if_none_match, "stats/maintenance-costs", lambda: stats_cache.get_or_set(
+        stats_cache_key("stats/maintenance-costs"), (TAG_MAINTENANCE,), lambda: monthly_maintenance_costs(db)
+    ))
+
+def monthly_maintenance_costs(db: Session):
+    """
+    Computes monthly maintenance costs for the last 12 months.
+    """
     # Calculate date 12 months ago
-    twelve_months_ago = datetime.now() - timedelta(days=365)
-    
-    # Query for monthly maintenance costs
-    monthly_costs = db.query(
-        func.strftime('%Y-%m', Maintenance.maintenance_date).label('month'),
-        func.coalesce(func.sum(Maintenance.cost), 0).label('total_cost')
-    ).filter(
-        Maintenance.maintenance_date >= twelve_months_ago
-    ).group_by(
-        func.strftime('%Y-%m', Maintenance.maintenance_date)
-    ).order_by(
-        func.strftime('%Y-%m', Maintenance.maintenance_date)
-    ).all()
-    
-    # Format the response
+    twelve_months_ago = stats_window_start()
+    first_month_cost = db.execute(first_month_costs_statement(twelve_months_ago)).scalar()
+    months = rollup_months(db, ROLLUP_MAINTENANCE_COST, month_key(twelve_months_ago))
+    return monthly_cost_data(twelve_months_ago, first_month_cost, months)
+
+def first_month_costs_statement(window_start: datetime):
+    """
+    Sums the maintenance costs of the first month of the window, which is
+    only partly inside it and so cannot come from the rollups.
+    """
+    return select(func.sum(Maintenance.cost)).where(
+        Maintenance.maintenance_date >= window_start.date(),
+        Maintenance.maintenance_date < next_month_start(window_start).date()
+    )
+
+def monthly_cost_data(window_start: datetime, first_month_cost: Optional[float], months) -> List[MaintenanceCostData]:
+    """
+    Assembles the monthly maintenance costs from the first month's direct
+    sum and the whole months' rollups.
+    """
     result = []
-    for cost_data in monthly_costs:
-        result.append(MaintenanceCostData(
-            month=cost_data.month,
-            cost=cost_data.total_cost or 0.0
-        ))
-    
+    if first_month_cost is not None:
+        result.append(MaintenanceCostData(month=month_key(window_start), cost=first_month_cost))
+    for month, cost in months:
+        result.append(MaintenanceCostData(month=month, cost=cost))
     return result
 
 @app.get("/stats/dashboard", response_model=DashboardSummary)
-def get_complete_dashboard(db: Session = Depends(get_db)):
+def get_complete_dashboard(
+    response: Response, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)
+):
     """
     Get complete dashboard data including all statistics and charts data.
     """
-    stats = get_dashboard_summary(db)
-    monthly_trips = get_monthly_trips(db)
-    maintenance_costs = get_maintenance_costs(db)
+    return conditional_stats(db, response, if_none_match, "stats/dashboard", lambda: stats_cache.get_or_set(
+        stats_cache_key("stats/dashboard"),
+        (TAG_VEHICLES, TAG_DRIVERS, TAG_TRIPS, TAG_MAINTENANCE),
+        lambda: build_dashboard(db)
+    ))
+
+def build_dashboard(db: Session):
+    """
+    Computes the complete dashboard summary.
+    """
+    maintenance_costs = monthly_maintenance_costs(db)
+    stats = build_dashboard_stats(db, maintenance_costs)
+    monthly_trips = monthly_trip_counts(db)
     
     return DashboardSummary(
         stats=stats,
@@ -683,13 +1668,109 @@ def get_complete_dashboard(db: Session = Depends(get_db)):
         maintenance_costs=maintenance_costs
     )
 
-# Maintenance endpoints (for managing maintenance records)
-@app.get("/maintenance", response_model=List[MaintenanceSchema])
-def get_maintenance_records(db: Session = Depends(get_db)):
+@app.get("/stats/dashboard/stream")
+async def stream_dashboard():
+    """
+    Push the dashboard as Server-Sent Events: a "snapshot" event with the
+    full document, then "delta" events with only the changed parts,
+    coalesced per debounce window. Comment lines keep idle connections open.
+    """
+    subscription, sequence, snapshot = await dashboard_broker.subscribe()
+
+    async def events():
+        try:
+            yield sse_event("snapshot", snapshot, sequence)
+            while True:
+                update = await subscription.next(LIVE_STATS_KEEPALIVE_SECONDS)
+                if update is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield sse_event("delta", update[1], update[0])
+        finally:
+            dashboard_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/stats/dashboard/ws")
+async def dashboard_websocket(websocket: WebSocket):
     """
-    Get all maintenance records.
+    Push the dashboard over a WebSocket as {"type": "snapshot" | "delta",
+    "sequence": n, "data": {...}} messages, like the SSE stream.
     """
-    return db.query(Maintenance).all()
+    await websocket.accept()
+    subscription, sequence, snapshot = await dashboard_broker.subscribe()
+    try:
+        await websocket.send_json({"type": "snapshot", "sequence": sequence, "data": snapshot})
+        while True:
+            update = await subscription.next(LIVE_STATS_KEEPALIVE_SECONDS)
+            if update is None:
+                # Sending is what reveals a client that went away
+                await websocket.send_json({"type": "keepalive"})
+            else:
+                await websocket.send_json({"type": "delta", "sequence": update[0], "data": update[1]})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        dashboard_broker.unsubscribe(subscription)
+
+@app.get("/stats/live")
+def get_live_stats():
+    """
+    Get live dashboard subscriber and publish counters.
+    """
+    return dashboard_broker.stats()
+
+@app.get("/stats/cache")
+def get_stats_cache():
+    """
+    Get hit/miss counters and occupancy of the stats response cache, and
+    the cross-worker invalidation counters when the bus is enabled.
+    """
+    return {
+        **stats_cache.stats(),
+        "invalidation_bus": invalidation_bus.stats() if invalidation_bus is not None else None,
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Get per-route request, latency and SQL metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/slow-queries")
+def get_slow_queries():
+    """
+    Get the most recent slow SQL statements with their query plans.
+    """
+    return list(query_monitor.slow_queries)
+
+# Maintenance endpoints (for managing maintenance records)
+@app.get("/maintenance", response_model=List[MaintenanceSchema])
+def get_maintenance_records(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Get maintenance records, optionally paginated with limit/cursor and
+    projected to the columns listed in fields. expand=vehicle embeds the
+    vehicle of each record; since=<revision> returns only the changes after
+    that revision.
+    """
+    return revisioned_list(
+        db, Maintenance, response, if_none_match, since, limit, cursor, fields, expand,
+        MaintenanceSchema, MAINTENANCE_EXPANSIONS, accept
+    )
 
 @app.post("/maintenance", response_model=MaintenanceSchema)
 def create_maintenance_record(maintenance: MaintenanceCreate, db: Session = Depends(get_db)):
@@ -704,7 +1785,10 @@ def create_maintenance_record(maintenance: MaintenanceCreate, db: Session = Depe
         next_maintenance_date=maintenance.next_maintenance_date
     )
     db.add(db_maintenance)
+    bump_rollup(db, ROLLUP_MAINTENANCE_COST, month_key(maintenance.maintenance_date), maintenance.cost)
+    refresh_due_items(db, [maintenance.vehicle_id])
     db.commit()
+    notify_change(TAG_MAINTENANCE)
     db.refresh(db_maintenance)
     return db_maintenance
 
@@ -715,13 +1799,77 @@ def get_maintenance_by_vehicle(vehicle_id: int, db: Session = Depends(get_db)):
     """
     return db.query(Maintenance).filter(Maintenance.vehicle_id == vehicle_id).all()
 
+@app.get("/upcoming", response_model=List[DueItemSchema])
+def get_upcoming(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    within_days: Optional[int] = Query(None, ge=0),
+    kind: Optional[Literal["maintenance", "license"]] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    List upcoming maintenance and licence expiries, soonest first.
+
+    Returns the next `limit` items, everything due within `within_days`
+    days, or both limits combined; overdue items come first. Without either
+    the next 50 items are returned.
+    """
+    if limit is None and within_days is None:
+        limit = 50
+    endpoint = f"upcoming?limit={limit}&within_days={within_days}&kind={kind}"
+    return conditional_stats(db, response, if_none_match, endpoint, lambda: due_items(db, limit, within_days, kind))
+
 # Fuel/Expense endpoints (for managing fuel and expense records)
 @app.get("/fuel-expenses", response_model=List[FuelExpenseSchema])
-def get_fuel_expenses(db: Session = Depends(get_db)):
+def get_fuel_expenses(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Get fuel and expense records, optionally paginated with limit/cursor and
+    projected to the columns listed in fields. expand=driver,vehicle embeds
+    the driver and vehicle of each record; since=<revision> returns only the
+    changes after that revision.
+    """
+    return revisioned_list(
+        db, FuelExpense, response, if_none_match, since, limit, cursor, fields, expand,
+        FuelExpenseSchema, FUEL_EXPENSE_EXPANSIONS, accept
+    )
+
+@app.get("/fuel-expenses/export")
+def export_fuel_expenses(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    vehicle_id: Optional[int] = None
+):
     """
-    Get all fuel and expense records.
+    Stream fuel and expense records as NDJSON or CSV, optionally filtered by
+    expense date range (inclusive) and vehicle.
     """
-    return db.query(FuelExpense).all()
+    statement = fuel_expense_export_statement(date_from, date_to, vehicle_id)
+    return export_response(SessionLocal, statement, FUEL_EXPENSE_EXPORT_COLUMNS, export_format, "fuel_expenses")
+
+def fuel_expense_export_statement(date_from: Optional[date], date_to: Optional[date], vehicle_id: Optional[int]):
+    """
+    Builds the select statement of a fuel and expense export.
+    """
+    statement = select(*(getattr(FuelExpense, column) for column in FUEL_EXPENSE_EXPORT_COLUMNS)).order_by(FuelExpense.id)
+    if date_from is not None:
+        statement = statement.where(FuelExpense.expense_date >= date_from)
+    if date_to is not None:
+        statement = statement.where(FuelExpense.expense_date <= date_to)
+    if vehicle_id is not None:
+        statement = statement.where(FuelExpense.vehicle_id == vehicle_id)
+    return statement
 
 @app.post("/fuel-expenses", response_model=FuelExpenseSchema)
 def create_fuel_expense(expense: FuelExpenseCreate, db: Session = Depends(get_db)):
@@ -741,7 +1889,10 @@ def create_fuel_expense(expense: FuelExpenseCreate, db: Session = Depends(get_db
         notes=expense.notes
     )
     db.add(db_expense)
+    db.flush()
+    apply_fuel_entry(db, fuel_entry(db_expense), 1)
     db.commit()
+    notify_change(TAG_FUEL_EXPENSES)
     db.refresh(db_expense)
     return db_expense
 
@@ -753,6 +1904,7 @@ def update_fuel_expense(expense_id: int, expense: FuelExpenseUpdate, db: Session
     db_expense = db.query(FuelExpense).filter(FuelExpense.id == expense_id).first()
     if not db_expense:
         raise HTTPException(status_code=404, detail="Expense record not found")
+    apply_fuel_entry(db, fuel_entry(db_expense), -1)
 
     db_expense.vehicle_id = expense.vehicle_id
     db_expense.driver_id = expense.driver_id
@@ -764,8 +1916,10 @@ def update_fuel_expense(expense_id: int, expense: FuelExpenseUpdate, db: Session
     db_expense.location = expense.location
     db_expense.expense_date = expense.expense_date
     db_expense.notes = expense.notes
+    apply_fuel_entry(db, fuel_entry(db_expense), 1)
 
     db.commit()
+    notify_change(TAG_FUEL_EXPENSES)
     db.refresh(db_expense)
     return db_expense
 
@@ -777,8 +1931,10 @@ def delete_fuel_expense(expense_id: int, db: Session = Depends(get_db)):
     db_expense = db.query(FuelExpense).filter(FuelExpense.id == expense_id).first()
     if not db_expense:
         raise HTTPException(status_code=404, detail="Expense record not found")
+    apply_fuel_entry(db, fuel_entry(db_expense), -1)
     db.delete(db_expense)
     db.commit()
+    notify_change(TAG_FUEL_EXPENSES)
     return {"detail": "Expense record deleted"}
 
 @app.get("/fuel-expenses/vehicle/{vehicle_id}", response_model=List[FuelExpenseSchema])
@@ -788,53 +1944,309 @@ def get_fuel_expenses_by_vehicle(vehicle_id: int, db: Session = Depends(get_db))
     """
     return db.query(FuelExpense).filter(FuelExpense.vehicle_id == vehicle_id).all()
 
+@app.get("/fuel-expenses/stats/fleet", response_model=FleetFuelAnalytics)
+def get_fleet_fuel_analytics(
+    response: Response,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Get fuel efficiency, cost per km, monthly spend and outlier refuels for
+    every vehicle, optionally limited to an inclusive expense date range.
+
+    The fuel_expenses rows are fetched once as columns and analysed with
+    vectorized NumPy operations; If-None-Match skips that while no fuel
+    record has changed.
+    """
+    etag = make_etag("fuel-expenses/stats/fleet", entity_revision(db, FuelExpense), date_from, date_to)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return fleet_fuel_analytics(db, date_from, date_to)
+
+def fleet_fuel_analytics(db: Session, date_from: Optional[date], date_to: Optional[date]) -> FleetFuelAnalytics:
+    """
+    Computes the fleet fuel analytics of an inclusive expense date range.
+
+    Args:
+        db (Session): The database session.
+        date_from (Optional[date]): The first expense date, unbounded if None.
+        date_to (Optional[date]): The last expense date, unbounded if None.
+
+    Returns:
+        FleetFuelAnalytics: The per-vehicle analytics.
+    """
+    rows = db.execute(fleet_fuel_statement(date_from, date_to)).all()
+    return fleet_fuel_report(rows, date_from, date_to)
+
+def fleet_fuel_statement(date_from: Optional[date], date_to: Optional[date]):
+    """
+    Selects the fuel_expenses columns the fleet analytics need, per vehicle
+    in date order.
+    """
+    statement = select(
+        FuelExpense.id, FuelExpense.vehicle_id, FuelExpense.expense_type, FuelExpense.cost,
+        FuelExpense.quantity, FuelExpense.odometer_reading, FuelExpense.expense_date
+    )
+    if date_from is not None:
+        statement = statement.where(FuelExpense.expense_date >= date_from)
+    if date_to is not None:
+        statement = statement.where(FuelExpense.expense_date <= date_to)
+    return statement.order_by(FuelExpense.vehicle_id, FuelExpense.expense_date, FuelExpense.id)
+
+def fleet_fuel_report(rows, date_from: Optional[date], date_to: Optional[date]) -> FleetFuelAnalytics:
+    """
+    Analyses the fleet_fuel_statement() rows with vectorized NumPy operations.
+    """
+    columns = list(zip(*rows)) if rows else [()] * 7
+    return FleetFuelAnalytics(
+        date_from=date_from,
+        date_to=date_to,
+        vehicles=analyze_fuel_expenses(*columns)
+    )
+
 @app.get("/fuel-expenses/stats/vehicle/{vehicle_id}", response_model=FuelExpenseStats)
 def get_fuel_expense_stats_by_vehicle(vehicle_id: int, db: Session = Depends(get_db)):
     """
     Get fuel and expense statistics for a specific vehicle.
     """
-    # Get total fuel costs
-    total_fuel_costs = db.query(func.coalesce(func.sum(FuelExpense.cost), 0)).filter(
-        FuelExpense.vehicle_id == vehicle_id,
-        FuelExpense.expense_type == 'fuel'
-    ).scalar() or 0.0
-
-    # Get total other expenses
-    total_other_expenses = db.query(func.coalesce(func.sum(FuelExpense.cost), 0)).filter(
-        FuelExpense.vehicle_id == vehicle_id,
-        FuelExpense.expense_type != 'fuel'
-    ).scalar() or 0.0
-
-    # Calculate fuel efficiency (km/l) - requires odometer readings and fuel quantities
-    fuel_records = db.query(FuelExpense).filter(
-        FuelExpense.vehicle_id == vehicle_id,
-        FuelExpense.expense_type == 'fuel',
-        FuelExpense.quantity.isnot(None),
-        FuelExpense.odometer_reading.isnot(None)
-    ).order_by(FuelExpense.expense_date).all()
+    return fuel_expense_stats(db.query(VehicleFuelLedger).filter(VehicleFuelLedger.vehicle_id == vehicle_id).first())
 
+def fuel_expense_stats(ledger: Optional[VehicleFuelLedger]) -> FuelExpenseStats:
+    """
+    Derives the fuel and expense statistics of a vehicle from its ledger.
+    """
+    if ledger is None:
+        return FuelExpenseStats(total_fuel_costs=0.0, total_other_expenses=0.0)
+
+    # Calculate fuel efficiency (km/l) - requires at least two fill-ups
     fuel_efficiency = None
-    if len(fuel_records) >= 2:
-        # Calculate total distance and total fuel
-        total_distance = 0
-        total_fuel = 0
-        prev_odometer = None
-
-        for record in fuel_records:
-            if prev_odometer is not None:
-                distance = record.odometer_reading - prev_odometer
-                total_distance += distance
-                total_fuel += record.quantity
-            prev_odometer = record.odometer_reading
-
-        if total_fuel > 0:
-            fuel_efficiency = total_distance / total_fuel
+    if ledger.fill_count >= 2 and ledger.total_litres > 0:
+        fuel_efficiency = ledger.total_distance / ledger.total_litres
 
-    
+    # All fuel and other running costs spread over the distance driven
+    average_cost_per_km = None
+    if ledger.total_distance > 0:
+        average_cost_per_km = (ledger.total_fuel_cost + ledger.total_other_cost) / ledger.total_distance
 
     return FuelExpenseStats(
-        total_fuel_costs=total_fuel_costs,
-        total_other_expenses=total_other_expenses,
+        total_fuel_costs=ledger.total_fuel_cost,
+        total_other_expenses=ledger.total_other_cost,
         fuel_efficiency=fuel_efficiency,
-        
+        average_cost_per_km=average_cost_per_km
     )
+
+# CSV import
+def import_vehicle_rows(db: Session, rows: List[dict]):
+    stamp_rows(db, rows)
+    vehicle_ids = db.execute(insert(Vehicle.__table__).returning(Vehicle.id), rows).scalars().all()
+    bump_rollup(db, ROLLUP_VEHICLES, ROLLUP_TOTAL_PERIOD, len(rows))
+    refresh_due_items(db, vehicle_ids)
+
+def import_driver_rows(db: Session, rows: List[dict]):
+    stamp_rows(db, rows)
+    db.execute(insert(Driver.__table__), rows)
+    bump_rollup(db, ROLLUP_DRIVERS, ROLLUP_TOTAL_PERIOD, len(rows))
+
+def import_maintenance_rows(db: Session, rows: List[dict]):
+    stamp_rows(db, rows)
+    db.execute(insert(Maintenance.__table__), rows)
+    costs_by_month = Counter()
+    for row in rows:
+        costs_by_month[month_key(row["maintenance_date"])] += row["cost"]
+    for month, cost in costs_by_month.items():
+        bump_rollup(db, ROLLUP_MAINTENANCE_COST, month, cost)
+    refresh_due_items(db, [row["vehicle_id"] for row in rows])
+
+def import_fuel_expense_rows(db: Session, rows: List[dict]):
+    stamp_rows(db, rows)
+    expense_ids = db.execute(
+        insert(FuelExpense.__table__).returning(FuelExpense.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+    add_fuel_entries(db, [SimpleNamespace(id=expense_id, **row) for expense_id, row in zip(expense_ids, rows)])
+
+# entity -> (row schema, chunk writer, change tag)
+IMPORT_TARGETS = {
+    "vehicles": (VehicleCreate, import_vehicle_rows, TAG_VEHICLES),
+    "drivers": (DriverCreate, import_driver_rows, TAG_DRIVERS),
+    "maintenance": (MaintenanceCreate, import_maintenance_rows, TAG_MAINTENANCE),
+    "fuel-expenses": (FuelExpenseCreate, import_fuel_expense_rows, TAG_FUEL_EXPENSES),
+}
+
+def run_import(entity: str, lines, db: Session) -> ImportReport:
+    """
+    Imports CSV records of one entity in chunked bulk transactions.
+
+    The header must name the columns of the entity's create schema; rows are
+    validated per chunk and inserted with one executemany per chunk.
+
+    Args:
+        entity (str): A key of IMPORT_TARGETS.
+        lines: An iterable of CSV text lines, header first.
+        db (Session): The database session.
+
+    Returns:
+        ImportReport: Counts of imported and rejected rows with per-row errors.
+
+    Raises:
+        ImportHeaderError: If the header lacks a required column.
+    """
+    schema, store_rows, tag = IMPORT_TARGETS[entity]
+    try:
+        report = import_csv(db, lines, schema, store_rows)
+    finally:
+        notify_change(tag)
+    return ImportReport(entity=entity, **report)
+
+@app.post("/import/{entity}", response_model=ImportReport)
+def import_records(
+    entity: Literal["vehicles", "drivers", "maintenance", "fuel-expenses"],
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import vehicles, drivers, maintenance or fuel/expense records from
+    an uploaded CSV file, reporting the rows that failed validation.
+    """
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return run_import(entity, lines, db)
+    except ImportHeaderError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV file must be UTF-8 encoded")
+
+# Background jobs: heavy reports and rebuilds run in worker processes fed
+# from a SQLite queue shared by every API worker; JOB_WORKERS=0 leaves them
+# to a separate `python job_worker.py`
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "./fleet_manager_jobs.db")
+JOB_RESULTS_DIR = os.getenv("JOB_RESULTS_DIR", "./job_results")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "86400"))
+# Seconds a running job survives without a heartbeat from its dispatcher
+# before any dispatcher, on any host, fails it as lost
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+def run_fleet_analytics_job(params: FleetAnalyticsJobParams, path: str) -> str:
+    db = SessionLocal()
+    try:
+        report = fleet_fuel_analytics(db, params.date_from, params.date_to)
+    finally:
+        db.close()
+    with open(path, "w", encoding="utf-8") as output:
+        output.write(report.model_dump_json())
+    return "application/json"
+
+def run_trips_export_job(params: ExportJobParams, path: str) -> str:
+    statement = trip_export_statement(params.date_from, params.date_to, params.vehicle_id)
+    return write_export(SessionLocal, statement, TRIP_EXPORT_COLUMNS, params.format, path)
+
+def run_fuel_expenses_export_job(params: ExportJobParams, path: str) -> str:
+    statement = fuel_expense_export_statement(params.date_from, params.date_to, params.vehicle_id)
+    return write_export(SessionLocal, statement, FUEL_EXPENSE_EXPORT_COLUMNS, params.format, path)
+
+def run_rebuild_stats_job(params: dict, path: str) -> str:
+    db = SessionLocal()
+    try:
+        rebuilt = rebuild_aggregates(db)
+    finally:
+        db.close()
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump({"rebuilt": rebuilt}, output)
+    return "application/json"
+
+job_queue = JobQueue(
+    JOB_QUEUE_PATH, JOB_RESULTS_DIR, JOB_WORKERS, retention=JOB_RETENTION_SECONDS, lease=JOB_LEASE_SECONDS
+)
+job_queue.on_complete = lambda tags: notify_change(*tags)
+job_queue.register("fleet-fuel-analytics", run_fleet_analytics_job, FleetAnalyticsJobParams)
+job_queue.register("trips-export", run_trips_export_job, ExportJobParams)
+job_queue.register("fuel-expenses-export", run_fuel_expenses_export_job, ExportJobParams)
+job_queue.register(
+    "rebuild-stats", run_rebuild_stats_job,
+    tags=(TAG_VEHICLES, TAG_DRIVERS, TAG_TRIPS, TAG_MAINTENANCE, TAG_FUEL_EXPENSES)
+)
+
+def job_schema(job: dict) -> JobSchema:
+    """
+    Converts a job of the queue to its API representation.
+    """
+    result_url = f"/jobs/{job['id']}/result" if job["status"] == JOB_SUCCEEDED else None
+    return JobSchema(**{key: value for key, value in job.items() if key in JobSchema.model_fields}, result_url=result_url)
+
+def get_job_or_404(job_id: str) -> dict:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/jobs", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
+def submit_job(job: JobCreate, response: Response):
+    """
+    Queue a background job and return at once; poll GET /jobs/{id} and
+    download GET /jobs/{id}/result once it succeeded.
+
+    Kinds: fleet-fuel-analytics, trips-export, fuel-expenses-export and
+    rebuild-stats.
+    """
+    if job.kind not in job_queue.kinds:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind, expected one of: {', '.join(job_queue.kinds)}")
+    try:
+        queued = job_queue.submit(job.kind, job.params)
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=jsonable_encoder(exc.errors(include_context=False)))
+    response.headers["Location"] = f"/jobs/{queued['id']}"
+    return job_schema(queued)
+
+@app.get("/jobs", response_model=List[JobSchema])
+def list_jobs(
+    job_status: Optional[Literal["queued", "running", "succeeded", "failed", "cancelled"]] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE)
+):
+    """
+    List the most recently submitted jobs, optionally of one status.
+    """
+    return [job_schema(job) for job in job_queue.list(job_status, limit)]
+
+@app.get("/jobs/stats")
+def get_job_stats():
+    """
+    Get job counts by status and the dispatcher state of this worker.
+    """
+    return job_queue.stats()
+
+@app.get("/jobs/{job_id}", response_model=JobSchema)
+def get_job(job_id: str):
+    """
+    Get the status of a background job.
+    """
+    return job_schema(get_job_or_404(job_id))
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """
+    Download the result of a succeeded job.
+
+    Raises:
+        HTTPException: 404 for unknown jobs, 409 while the job has not
+            succeeded.
+    """
+    job = get_job_or_404(job_id)
+    if job["status"] != JOB_SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    extension = RESULT_EXTENSIONS.get(job["media_type"], "bin")
+    return FileResponse(job["result_path"], media_type=job["media_type"], filename=f"{job['kind']}-{job_id}.{extension}")
+
+@app.delete("/jobs/{job_id}", response_model=JobSchema)
+def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job; finished jobs are returned unchanged.
+    """
+    get_job_or_404(job_id)
+    return job_schema(job_queue.cancel(job_id))
+
+if DB_MODE == "async":
+    from async_api import install_async_routes
+    install_async_routes(app)
@@ -0,0 +1,30 @@
+from main import prepare_database
+from migrations import MIGRATIONS
+
+
+def migrate():
+    """
+    Brings the database schema up to date.
+
+    The API prepares the database on startup as well; run this to upgrade
+    a deployed database ahead of a release, so workers start on a current
+    schema.
+
+    Returns:
+        None: Prints the applied versions.
+    """
+    try:
+        applied = prepare_database()
+        if applied:
+            print(f"Applied migrations {', '.join(str(version) for version in applied)}.")
+        print(f"Database schema is at version {MIGRATIONS[-1][0]}.")
+    except Exception as e:
+        print(f"Error migrating database: {e}")
+
+
+if __name__ == "__main__":
+    """
+    Entry point for the script.
+    Applies pending schema migrations when run directly.
+    """
+    migrate()
@@ -0,0 +1,172 @@
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+# Seconds a process waits for another one to finish upgrading the schema
+# before giving up (SQLite; PostgreSQL waits on the advisory lock for good)
+MIGRATION_LOCK_TIMEOUT = float(os.getenv("MIGRATION_LOCK_TIMEOUT", "300"))
+# Advisory lock key that serializes schema upgrades on PostgreSQL
+MIGRATION_LOCK_KEY = 7305840211
+
+# Adds a column unless the table already has it, for columns that databases
+# may have gained at startup before migrations were versioned
+AddColumn = namedtuple("AddColumn", ["table", "column", "definition"])
+
+# Ordered schema changes as (version, name, statements). Base.metadata.create_all
+# only creates missing tables, so every change to an existing table goes here.
+# New databases get the declared tables, columns and indexes from create_all
+# and are stamped with the latest version instead of replaying these.
+# A statement given as a dict maps dialect names to their SQL and is skipped
+# on dialects it does not list.
+MIGRATIONS = [
+    (1, "trip schedule indexes and durations", [
+        "CREATE INDEX IF NOT EXISTS ix_trips_driver_schedule ON trips (driver_id, start_time, end_time)",
+        "CREATE INDEX IF NOT EXISTS ix_trips_vehicle_schedule ON trips (vehicle_id, start_time, end_time)",
+        AddColumn("trips", "duration_seconds", "INTEGER"),
+        {
+            "sqlite": "UPDATE trips SET duration_seconds = "
+                      "CAST(ROUND((julianday(end_time) - julianday(start_time)) * 86400) AS INTEGER)",
+            "postgresql": "UPDATE trips SET duration_seconds = "
+                          "CAST(CEIL(EXTRACT(EPOCH FROM end_time - start_time)) AS INTEGER)",
+        },
+        "CREATE INDEX IF NOT EXISTS ix_trips_duration_seconds ON trips (duration_seconds)",
+    ]),
+    (2, "foreign key and date indexes", [
+        "CREATE INDEX IF NOT EXISTS ix_trips_start_time ON trips (start_time)",
+        "CREATE INDEX IF NOT EXISTS ix_drivers_vehicle_id ON drivers (vehicle_id)",
+        "CREATE INDEX IF NOT EXISTS ix_maintenance_vehicle_date ON maintenance (vehicle_id, maintenance_date)",
+        "CREATE INDEX IF NOT EXISTS ix_maintenance_date_cost ON maintenance (maintenance_date, cost)",
+        "CREATE INDEX IF NOT EXISTS ix_fuel_expenses_vehicle_date ON fuel_expenses (vehicle_id, expense_date, id)",
+        "CREATE INDEX IF NOT EXISTS ix_fuel_expenses_date ON fuel_expenses (expense_date)",
+    ]),
+    (3, "year_month columns for monthly stats", [
+        "ALTER TABLE trips ADD COLUMN year_month VARCHAR(7)",
+        "UPDATE trips SET year_month = substr(CAST(start_time AS VARCHAR), 1, 7)",
+        "CREATE INDEX IF NOT EXISTS ix_trips_year_month ON trips (year_month)",
+        "ALTER TABLE maintenance ADD COLUMN year_month VARCHAR(7)",
+        "UPDATE maintenance SET year_month = substr(CAST(maintenance_date AS VARCHAR), 1, 7)",
+        "CREATE INDEX IF NOT EXISTS ix_maintenance_year_month_cost ON maintenance (year_month, cost)",
+    ]),
+    (4, "change revisions for conditional GETs and delta sync", [
+        statement
+        for table in ("vehicles", "drivers", "trips", "maintenance", "fuel_expenses")
+        for statement in (
+            f"ALTER TABLE {table} ADD COLUMN revision INTEGER NOT NULL DEFAULT 0",
+            f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP",
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_revision ON {table} (revision)",
+        )
+    ]),
+]
+
+
+def schema_version(connection) -> int:
+    """
+    Returns the highest applied migration version, 0 for a new database.
+    """
+    return connection.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+
+
+def is_new_database(connection) -> bool:
+    """
+    Returns True if the database has none of the application tables yet.
+
+    Call before Base.metadata.create_all.
+    """
+    return not inspect(connection).has_table("trips")
+
+
+@contextmanager
+def migration_lock(engine):
+    """
+    Opens a transaction holding the database-wide schema upgrade lock.
+
+    SQLite: BEGIN IMMEDIATE takes the write lock up front, on a connection
+    with the driver's own transaction handling switched off so that DDL runs
+    inside the transaction instead of committing on its own; other processes
+    wait for the lock for up to MIGRATION_LOCK_TIMEOUT seconds.
+    PostgreSQL: a transaction-scoped advisory lock, released on commit.
+
+    Args:
+        engine (Engine): The engine of the database to lock.
+
+    Yields:
+        Connection: The locked connection; its work commits when the block
+        exits and rolls back if the block raises.
+    """
+    with engine.connect() as connection:
+        if connection.dialect.name != "sqlite":
+            with connection.begin():
+                if connection.dialect.name == "postgresql":
+                    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                yield connection
+            return
+
+        connection.execution_options(isolation_level="AUTOCOMMIT")
+        busy_timeout = connection.exec_driver_sql("PRAGMA busy_timeout").scalar()
+        connection.exec_driver_sql(f"PRAGMA busy_timeout = {int(MIGRATION_LOCK_TIMEOUT * 1000)}")
+        try:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.exec_driver_sql("ROLLBACK")
+                raise
+            connection.exec_driver_sql("COMMIT")
+        finally:
+            connection.exec_driver_sql(f"PRAGMA busy_timeout = {busy_timeout}")
+
+
+def run_migrations(engine, metadata=None) -> list:
+    """
+    Applies the pending migrations in order, in one transaction that holds
+    the schema upgrade lock.
+
+    Applied versions are recorded in the schema_migrations table. Processes
+    starting at once queue up on the lock and read the version only once they
+    hold it, so each migration runs exactly once; a failing migration rolls
+    back together with everything applied before it in this call.
+
+    Args:
+        engine (Engine): The engine of the database to migrate.
+        metadata (MetaData): When given, its missing tables are created under
+            the same lock first; a database that had none of them is then
+            stamped with the latest version without replaying the migrations.
+
+    Returns:
+        list: The versions applied by this call.
+    """
+    with migration_lock(engine) as connection:
+        new_database = metadata is not None and is_new_database(connection)
+        if metadata is not None:
+            metadata.create_all(bind=connection)
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+        current = schema_version(connection)
+
+        applied = []
+        for version, name, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            if not new_database:
+                for statement in statements:
+                    if isinstance(statement, AddColumn):
+                        columns = {column["name"] for column in inspect(connection).get_columns(statement.table)}
+                        if statement.column in columns:
+                            continue
+                        statement = f"ALTER TABLE {statement.table} ADD COLUMN {statement.column} {statement.definition}"
+                    elif isinstance(statement, dict):
+                        statement = statement.get(connection.dialect.name)
+                        if statement is None:
+                            continue
+                    connection.execute(text(statement))
+            connection.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+                {"version": version, "name": name, "applied_at": datetime.utcnow()}
+            )
+            applied.append(version)
+    return applied
@@ -0,0 +1,261 @@
+from sqlalchemy import Column, Date, DateTime, Float, Index, Integer, String
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
+
+Base = declarative_base()
+
+# SQLAlchemy Models
+
+def year_month_default(source: str):
+    """
+    Returns a column default that derives the "YYYY-MM" month of a row from
+    its date or datetime column named source.
+    """
+    def default(context):
+        return context.get_current_parameters()[source].strftime("%Y-%m")
+    return default
+
+def duration_seconds_default(context):
+    """
+    Column default storing a trip's length in whole seconds, rounded down.
+    """
+    parameters = context.get_current_parameters()
+    return int((parameters["end_time"] - parameters["start_time"]).total_seconds())
+
+class User(Base):
+    """
+    SQLAlchemy model for User.
+
+    Represents a user in the database with email and hashed password.
+    """
+    __tablename__ = "users"
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String, unique=True, index=True)
+    hashed_password = Column(String)
+
+class RevokedToken(Base):
+    """
+    SQLAlchemy model for access tokens revoked by logout.
+
+    Tokens are stored by their SHA-256 digest until they would have expired,
+    so revocations survive restarts and reach workers started later.
+    """
+    __tablename__ = "revoked_tokens"
+    digest = Column(String, primary_key=True)
+    expires_at = Column(Float, nullable=False, index=True)  # UNIX timestamp of the token's exp claim
+
+class Vehicle(Base):
+    """
+    SQLAlchemy model for Vehicle.
+
+    Represents a vehicle with details like name, model, make, etc.
+    """
+    __tablename__ = "vehicles"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True)
+    model = Column(String, nullable=True)
+    make = Column(String, nullable=True)
+    color = Column(String, nullable=True)
+    registration_number = Column(String, nullable=True)
+    license_expiry_date = Column(Date, nullable=True)
+    year_of_car = Column(Integer, nullable=True)
+    # Change tracking for conditional GETs and ?since= delta sync
+    revision = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    updated_at = Column(DateTime, nullable=True)
+
+class Driver(Base):
+    """
+    SQLAlchemy model for Driver.
+
+    Represents a driver with personal and vehicle assignment details.
+    """
+    __tablename__ = "drivers"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True)
+    vehicle_id = Column(Integer, nullable=True)
+    number_of_experience = Column(Integer, nullable=True)
+    license_number = Column(String, nullable=True)
+    contact_info = Column(String, nullable=True)
+    # Change tracking for conditional GETs and ?since= delta sync
+    revision = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    updated_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_drivers_vehicle_id", "vehicle_id"),
+    )
+
+class Trip(Base):
+    """
+    SQLAlchemy model for Trip.
+
+    Represents a trip with driver, vehicle, locations, and times.
+    """
+    __tablename__ = "trips"
+    id = Column(Integer, primary_key=True, index=True)
+    driver_id = Column(Integer, nullable=False)
+    vehicle_id = Column(Integer, nullable=False)
+    start_location = Column(String, nullable=False)
+    end_location = Column(String, nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    # "YYYY-MM" of start_time, set on insert so monthly stats group on an index
+    year_month = Column(String(7), nullable=True, default=year_month_default("start_time"))
+    # Length of the trip, set on insert; its index answers "longest booking"
+    # in one probe, which bounds how far back overlap scans have to look
+    duration_seconds = Column(Integer, nullable=True, default=duration_seconds_default, index=True)
+    # Change tracking for conditional GETs and ?since= delta sync
+    revision = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    updated_at = Column(DateTime, nullable=True)
+
+    # Read-only links for embedding related rows; the ids carry no FK constraint
+    driver = relationship("Driver", primaryjoin="foreign(Trip.driver_id) == Driver.id", viewonly=True)
+    vehicle = relationship("Vehicle", primaryjoin="foreign(Trip.vehicle_id) == Vehicle.id", viewonly=True)
+
+    # Scheduling indexes: each double-booking probe is a range scan on one of these
+    __table_args__ = (
+        Index("ix_trips_driver_schedule", "driver_id", "start_time", "end_time"),
+        Index("ix_trips_vehicle_schedule", "vehicle_id", "start_time", "end_time"),
+        Index("ix_trips_start_time", "start_time"),
+        Index("ix_trips_year_month", "year_month"),
+    )
+
+class Maintenance(Base):
+    """
+    SQLAlchemy model for Maintenance records.
+
+    Represents maintenance activities with costs and dates.
+    """
+    __tablename__ = "maintenance"
+    id = Column(Integer, primary_key=True, index=True)
+    vehicle_id = Column(Integer, nullable=False)
+    description = Column(String, nullable=False)
+    cost = Column(Float, nullable=False)
+    maintenance_date = Column(Date, nullable=False)
+    next_maintenance_date = Column(Date, nullable=True)
+    # "YYYY-MM" of maintenance_date, set on insert so monthly stats group on an index
+    year_month = Column(String(7), nullable=True, default=year_month_default("maintenance_date"))
+    # Change tracking for conditional GETs and ?since= delta sync
+    revision = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    updated_at = Column(DateTime, nullable=True)
+
+    vehicle = relationship("Vehicle", primaryjoin="foreign(Maintenance.vehicle_id) == Vehicle.id", viewonly=True)
+
+    # Per-vehicle history and the covering indexes for cost sums by date range and month
+    __table_args__ = (
+        Index("ix_maintenance_vehicle_date", "vehicle_id", "maintenance_date"),
+        Index("ix_maintenance_date_cost", "maintenance_date", "cost"),
+        Index("ix_maintenance_year_month_cost", "year_month", "cost"),
+    )
+
+class FuelExpense(Base):
+    """
+    SQLAlchemy model for Fuel and Expense records.
+
+    Represents fuel consumption and other expenses per vehicle.
+    """
+    __tablename__ = "fuel_expenses"
+    id = Column(Integer, primary_key=True, index=True)
+    vehicle_id = Column(Integer, nullable=False)
+    driver_id = Column(Integer, nullable=True)
+    expense_type = Column(String, nullable=False)  
+    fuel_type = Column(String, nullable=True)  
+    quantity = Column(Float, nullable=True)  
+    cost = Column(Float, nullable=False)  
+    odometer_reading = Column(Float, nullable=True) 
+    location = Column(String, nullable=True)  
+    expense_date = Column(Date, nullable=False)
+    notes = Column(String, nullable=True)
+    # Change tracking for conditional GETs and ?since= delta sync
+    revision = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    updated_at = Column(DateTime, nullable=True)
+
+    vehicle = relationship("Vehicle", primaryjoin="foreign(FuelExpense.vehicle_id) == Vehicle.id", viewonly=True)
+    driver = relationship("Driver", primaryjoin="foreign(FuelExpense.driver_id) == Driver.id", viewonly=True)
+
+    # Per-vehicle history in ledger order, and date-range filters
+    __table_args__ = (
+        Index("ix_fuel_expenses_vehicle_date", "vehicle_id", "expense_date", "id"),
+        Index("ix_fuel_expenses_date", "expense_date"),
+    )
+
+class VehicleFuelLedger(Base):
+    """
+    SQLAlchemy model for running per-vehicle fuel and expense aggregates.
+
+    Fill-ups are fuel records with both a quantity and an odometer reading.
+    Distance telescopes to last odometer - first odometer and litres to the
+    sum of every fill-up after the first, so only the first and last fill-up
+    (ordered by expense_date, id) have to be tracked.
+    """
+    __tablename__ = "vehicle_fuel_ledgers"
+    vehicle_id = Column(Integer, primary_key=True)
+    total_fuel_cost = Column(Float, nullable=False, default=0.0)
+    total_other_cost = Column(Float, nullable=False, default=0.0)
+    fill_count = Column(Integer, nullable=False, default=0)
+    quantity_sum = Column(Float, nullable=False, default=0.0)
+    first_fill_id = Column(Integer, nullable=True)
+    first_fill_date = Column(Date, nullable=True)
+    first_odometer = Column(Float, nullable=True)
+    first_quantity = Column(Float, nullable=True)
+    last_fill_id = Column(Integer, nullable=True)
+    last_fill_date = Column(Date, nullable=True)
+    last_odometer = Column(Float, nullable=True)
+    total_distance = Column(Float, nullable=False, default=0.0)
+    total_litres = Column(Float, nullable=False, default=0.0)
+
+class StatsRollup(Base):
+    """
+    SQLAlchemy model for materialized dashboard aggregates.
+
+    Holds one value per metric and period, where period is a "YYYY-MM"
+    month or "all" for entity totals. Kept up to date by the write handlers.
+    """
+    __tablename__ = "stats_rollups"
+    metric = Column(String, primary_key=True)
+    period = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0)
+
+class RevisionCounter(Base):
+    """
+    SQLAlchemy model for the single-row counter that hands out change revisions.
+
+    Each writing transaction takes the next value once and stamps it on every
+    row it inserts, updates or deletes.
+    """
+    __tablename__ = "revision_counter"
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class Tombstone(Base):
+    """
+    SQLAlchemy model for deleted rows, so delta sync can report deletions.
+    """
+    __tablename__ = "tombstones"
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String, nullable=False)  # table name of the deleted row
+    entity_id = Column(Integer, nullable=False)
+    revision = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_tombstones_entity_revision", "entity", "revision"),
+    )
+
+class DueItem(Base):
+    """
+    SQLAlchemy model for the queue of upcoming maintenance and licence expiries.
+
+    Holds at most one row per vehicle and kind: the next_maintenance_date of
+    the vehicle's latest maintenance record, and its license_expiry_date.
+    The vehicle and maintenance write paths keep it current, so the next
+    items due are a range scan on ix_due_items_due_date.
+    """
+    __tablename__ = "due_items"
+    kind = Column(String, primary_key=True)  # DUE_MAINTENANCE or DUE_LICENSE
+    vehicle_id = Column(Integer, primary_key=True)
+    source_id = Column(Integer, nullable=False)  # maintenance or vehicle id the date comes from
+    due_date = Column(Date, nullable=False)
+
+    __table_args__ = (
+        Index("ix_due_items_due_date", "due_date", "kind", "vehicle_id"),
+    )
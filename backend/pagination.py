@@ -0,0 +1,249 @@
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from serialization import fast_response
+
+# Page size limits for keyset pagination
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Encodes the last id of a page as an opaque cursor.
+
+    Args:
+        last_id (int): The id of the last row on the page.
+
+    Returns:
+        str: The URL-safe cursor.
+    """
+    payload = json.dumps({"after": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decodes a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): The opaque cursor.
+
+    Returns:
+        int: The id after which the next page starts.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))["after"]
+        if not isinstance(last_id, int):
+            raise ValueError(last_id)
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+
+def projection_columns(model, fields: Optional[str]):
+    """
+    Resolves a comma separated fields= parameter to model columns.
+
+    The primary key is always selected so the page can carry a cursor.
+
+    Args:
+        model: The SQLAlchemy model.
+        fields (Optional[str]): Comma separated column names.
+
+    Returns:
+        list or None: The selected columns, or None when no projection was asked for.
+
+    Raises:
+        HTTPException: If a field does not exist on the model.
+    """
+    if not fields:
+        return None
+    table_columns = model.__table__.columns
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in table_columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if "id" not in names:
+        names.insert(0, "id")
+    return [getattr(model, name) for name in dict.fromkeys(names)]
+
+
+def expansion_names(expand: Optional[str], expansions: dict):
+    """
+    Resolves a comma separated expand= parameter to relationship names.
+
+    Args:
+        expand (Optional[str]): Comma separated relationship names.
+        expansions (dict): The relationships the endpoint can embed.
+
+    Returns:
+        list: The requested names, empty when no expansion was asked for.
+
+    Raises:
+        HTTPException: If a name is not one of expansions.
+    """
+    if not expand:
+        return []
+    names = [name.strip() for name in expand.split(",") if name.strip()]
+    unknown = [name for name in names if name not in expansions]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown expansions: {', '.join(unknown)}; expected any of {', '.join(expansions)}"
+        )
+    return list(dict.fromkeys(names))
+
+
+def paginate(statement, model, limit: Optional[int], cursor: Optional[str]):
+    """
+    Adds keyset pagination on id to a list statement when a limit or cursor
+    is given.
+
+    Without either the whole result is returned as before, so existing
+    clients keep working. A paginated statement reads one row past the page
+    to tell whether another page follows.
+
+    Args:
+        statement (Select): The statement selecting the model or its columns.
+        model: The SQLAlchemy model being listed.
+        limit (Optional[int]): The page size.
+        cursor (Optional[str]): The cursor returned with the previous page.
+
+    Returns:
+        tuple: (statement, page_size) where page_size is None when unpaginated.
+    """
+    if limit is None and cursor is None:
+        return statement, None
+    page_size = limit or DEFAULT_PAGE_SIZE
+    if cursor is not None:
+        statement = statement.where(model.id > decode_cursor(cursor))
+    return statement.order_by(model.id).limit(page_size + 1), page_size
+
+
+def split_page(rows, page_size: Optional[int]):
+    """
+    Cuts the rows read by a paginate() statement to the page.
+
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page.
+    """
+    if page_size is not None and len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1].id)
+    return rows, None
+
+
+def list_statement(
+    model, fields: Optional[str], expand: Optional[str] = None, schema=None,
+    expansions: Optional[dict] = None, fast: bool = False
+):
+    """
+    Builds the select statement of a list page; see list_response.
+
+    Returns:
+        tuple: (statement, columns, relations) where columns are the projected
+        columns, or None when whole rows are selected, and relations the
+        names of the embedded relationships.
+    """
+    columns = projection_columns(model, fields)
+    relations = expansion_names(expand, expansions or {})
+    if relations:
+        return select(model).options(*(selectinload(expansions[name][0]) for name in relations)), columns, relations
+    if fast and not columns:
+        columns = [getattr(model, name) for name in schema.model_fields]
+    return (select(*columns) if columns else select(model)), columns, relations
+
+
+def page_rows(result, columns, relations) -> list:
+    """
+    Reads the rows of a list_statement() result: ORM objects when whole rows
+    or relationships were selected, column rows otherwise.
+    """
+    return result.all() if columns and not relations else result.scalars().all()
+
+
+def render_page(
+    rows, next_cursor: Optional[str], response, columns, relations, schema=None,
+    expansions: Optional[dict] = None, fast: bool = False, accept: Optional[str] = None
+):
+    """
+    Serializes a page read with list_statement(); see list_response.
+
+    Returns:
+        list or Response: ORM rows, or the encoded page.
+    """
+    def render(payload, headers):
+        if fast:
+            return fast_response(payload, accept, headers)
+        return JSONResponse(jsonable_encoder(payload), headers=headers)
+
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    if relations:
+        names = [column.key for column in columns] if columns else list(schema.model_fields)
+        payload = []
+        for row in rows:
+            item = {name: getattr(row, name) for name in names}
+            for name in relations:
+                related = getattr(row, name)
+                item[name] = expansions[name][1].model_validate(related).model_dump() if related is not None else None
+            payload.append(item)
+        return render(payload, headers)
+    if columns:
+        return render([row._asdict() for row in rows], headers)
+    response.headers.update(headers)
+    return rows
+
+
+def list_response(
+    db, model, response, limit: Optional[int], cursor: Optional[str], fields: Optional[str],
+    expand: Optional[str] = None, schema=None, expansions: Optional[dict] = None,
+    fast: bool = False, accept: Optional[str] = None
+):
+    """
+    Lists a model with optional keyset pagination, field projection and
+    embedded related rows.
+
+    Projected and expanded pages no longer match the full response model, so
+    they are serialized here and returned as a JSONResponse. Expanded
+    relationships are loaded with one extra IN query per relationship
+    (selectinload), however many rows the page holds.
+
+    With fast set, full pages select the schema's columns as plain tuples
+    instead of ORM objects, and every page is encoded directly with orjson
+    (or MessagePack when accept asks for it) without per-row validation.
+
+    Args:
+        db (Session): The database session.
+        model: The SQLAlchemy model to list.
+        response (Response): The outgoing response, used for the cursor header.
+        limit (Optional[int]): The page size.
+        cursor (Optional[str]): The cursor of the page to fetch.
+        fields (Optional[str]): Comma separated columns to return.
+        expand (Optional[str]): Comma separated relationships to embed.
+        schema: The Pydantic response model whose fields a row carries.
+        expansions (Optional[dict]): Embeddable relationships as
+            name -> (relationship attribute, Pydantic schema).
+        fast (bool): Use the tuple and direct encoding path.
+        accept (Optional[str]): The Accept request header, for the fast path.
+
+    Returns:
+        list or Response: ORM rows, or the encoded page.
+    """
+    statement, columns, relations = list_statement(model, fields, expand, schema, expansions, fast)
+    statement, page_size = paginate(statement, model, limit, cursor)
+    rows, next_cursor = split_page(page_rows(db.execute(statement), columns, relations), page_size)
+    return render_page(rows, next_cursor, response, columns, relations, schema, expansions, fast, accept)
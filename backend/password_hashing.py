@@ -0,0 +1,73 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+
+from passlib.context import CryptContext
+
+
+class PasswordHashingBusy(Exception):
+    """
+    Raised when the password hashing pool and its queue are full.
+    """
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a dedicated, size-limited worker pool.
+
+    bcrypt releases the GIL while hashing, so a small thread pool gives real
+    parallelism without sharing Starlette's threadpool with CRUD endpoints.
+    At most max_workers hashes run at once and at most max_pending more wait
+    in the queue; further submissions fail fast with PasswordHashingBusy.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int, max_pending: int):
+        self.context = context
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._slots = BoundedSemaphore(max_workers + max_pending)
+
+    async def _submit(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusy()
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        """
+        Hashes a password on the pool.
+
+        Args:
+            password (str): The plain text password.
+
+        Returns:
+            str: The hashed password.
+        """
+        return await self._submit(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str):
+        """
+        Verifies a password on the pool and rehashes it if its hash is outdated.
+
+        The rehash is decided by CryptContext.needs_update, e.g. after the
+        configured bcrypt cost factor changes.
+
+        Args:
+            password (str): The plain text password.
+            hashed_password (str): The stored hash.
+
+        Returns:
+            tuple: (verified, new_hash) where new_hash is None unless the
+                stored hash should be replaced.
+        """
+        return await self._submit(self.context.verify_and_update, password, hashed_password)
+
+    def shutdown(self):
+        """
+        Stops the worker threads once queued work has finished.
+        """
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,34 @@
+from sqlalchemy.orm import Session
+from main import SessionLocal, prepare_database, rebuild_aggregates
+
+
+def rebuild_stats():
+    """
+    Recomputes the materialized dashboard aggregates, the per-vehicle fuel
+    ledgers and the due items queue from scratch, the same rebuild the
+    rebuild-stats background job runs.
+
+    Use this after loading data outside the API or if the aggregates are
+    suspected to have drifted from the fact tables.
+
+    Returns:
+        None: Prints success or error messages.
+    """
+    prepare_database()
+    db: Session = SessionLocal()
+    try:
+        rebuilt = rebuild_aggregates(db)
+        print(f"Rebuilt {', '.join(rebuilt)} successfully.")
+    except Exception as e:
+        db.rollback()
+        print(f"Error rebuilding stats: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    """
+    Entry point for the script.
+    Rebuilds the materialized aggregates when run directly.
+    """
+    rebuild_stats()
@@ -0,0 +1,124 @@
+"""
+Change revisions: every insert, update and delete of the tracked models is
+stamped with the revision of its transaction, so list ETags and ?since=
+deltas are derived from revisions instead of from the rows themselves.
+"""
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import Driver, FuelExpense, Maintenance, RevisionCounter, Tombstone, Trip, Vehicle
+
+
+# Models whose inserts, updates and deletes are stamped with revisions
+TRACKED_MODELS = (Vehicle, Driver, Trip, Maintenance, FuelExpense)
+
+
+def ensure_revision_counter(db: Session):
+    """
+    Creates the revision counter row on first start.
+    """
+    try:
+        if db.get(RevisionCounter, 1) is None:
+            db.add(RevisionCounter(id=1, value=0))
+            db.commit()
+    except IntegrityError:
+        db.rollback()
+
+
+def transaction_revision(db: Session) -> int:
+    """
+    Returns the revision of the session's current transaction, taking the
+    next value from the counter on first use.
+
+    The counter row stays write-locked until the transaction ends, so
+    revisions become visible in increasing order and a client that has seen
+    revision N never misses a later commit with a revision <= N.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        int: The revision to stamp on the rows the transaction changes.
+    """
+    revision = db.info.get("revision")
+    if revision is None:
+        revision = db.connection().execute(
+            update(RevisionCounter.__table__)
+            .where(RevisionCounter.id == 1)
+            .values(value=RevisionCounter.value + 1)
+            .returning(RevisionCounter.value)
+        ).scalar_one()
+        db.info["revision"] = revision
+    return revision
+
+
+def stamp_rows(db: Session, rows: List[dict]):
+    """
+    Stamps rows inserted in bulk, which bypass the flush hook below.
+    """
+    revision = transaction_revision(db)
+    now = datetime.utcnow()
+    for row in rows:
+        row["revision"] = revision
+        row["updated_at"] = now
+
+
+@event.listens_for(Session, "before_flush")
+def stamp_changes(session, flush_context, instances):
+    """
+    Stamps new and modified tracked rows and records tombstones for deleted ones.
+    """
+    changed = [obj for obj in session.new if isinstance(obj, TRACKED_MODELS)]
+    changed += [obj for obj in session.dirty if isinstance(obj, TRACKED_MODELS) and session.is_modified(obj)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, TRACKED_MODELS)]
+    if not changed and not deleted:
+        return
+    revision = transaction_revision(session)
+    now = datetime.utcnow()
+    for obj in changed:
+        obj.revision = revision
+        obj.updated_at = now
+    for obj in deleted:
+        session.add(Tombstone(entity=obj.__tablename__, entity_id=obj.id, revision=revision, deleted_at=now))
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def forget_transaction_revision(session):
+    session.info.pop("revision", None)
+
+
+def current_revision_statement():
+    """
+    Selects the latest committed revision across all tracked models.
+    """
+    return select(RevisionCounter.value).where(RevisionCounter.id == 1)
+
+
+def current_revision(db: Session) -> int:
+    """
+    Returns the latest committed revision across all tracked models.
+    """
+    return db.execute(current_revision_statement()).scalar() or 0
+
+
+def entity_revision_statement(model):
+    """
+    Selects the revision of the last update and of the last delete of a
+    model, read from the revision indexes in a single statement.
+    """
+    return select(
+        select(func.max(model.revision)).scalar_subquery(),
+        select(func.max(Tombstone.revision)).where(Tombstone.entity == model.__tablename__).scalar_subquery()
+    )
+
+
+def entity_revision(db: Session, model) -> int:
+    """
+    Returns the revision of the last insert, update or delete of a model.
+    """
+    return max(revision or 0 for revision in db.execute(entity_revision_statement(model)).one())
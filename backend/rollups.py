@@ -0,0 +1,124 @@
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import Driver, Maintenance, StatsRollup, Trip, Vehicle
+
+
+# Rollup metrics; entity totals are kept under ROLLUP_TOTAL_PERIOD
+ROLLUP_VEHICLES = "vehicles"
+ROLLUP_DRIVERS = "drivers"
+ROLLUP_TRIPS = "trips"
+ROLLUP_MAINTENANCE_COST = "maintenance_cost"
+ROLLUP_TOTAL_PERIOD = "all"
+
+
+# INSERT ... ON CONFLICT constructs of the supported databases
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def month_key(value) -> str:
+    """
+    Returns the "YYYY-MM" rollup period of a date or datetime.
+    """
+    return value.strftime("%Y-%m")
+
+
+def bump_rollup(db: Session, metric: str, period: str, delta: float):
+    """
+    Adds delta to a rollup value inside the caller's transaction.
+
+    A single upsert creates the row on first use, so concurrent writers of
+    a new period cannot both try to insert it.
+
+    Args:
+        db (Session): The database session.
+        metric (str): The rollup metric.
+        period (str): The "YYYY-MM" month or ROLLUP_TOTAL_PERIOD.
+        delta (float): The amount to add.
+    """
+    if not delta:
+        return
+    db.execute(rollup_upsert(db.get_bind().dialect.name, metric, period, delta))
+
+
+def rollup_upsert(dialect_name: str, metric: str, period: str, delta: float):
+    """
+    Builds the upsert behind bump_rollup for a database dialect.
+    """
+    statement = UPSERT_INSERTS[dialect_name](StatsRollup).values(metric=metric, period=period, value=delta)
+    return statement.on_conflict_do_update(
+        index_elements=[StatsRollup.metric, StatsRollup.period],
+        set_={"value": StatsRollup.value + delta}
+    )
+
+
+def rollup_value_statement(metric: str, period: str = ROLLUP_TOTAL_PERIOD):
+    """
+    Selects a single rollup value.
+    """
+    return select(StatsRollup.value).where(StatsRollup.metric == metric, StatsRollup.period == period)
+
+
+def rollup_value(db: Session, metric: str, period: str = ROLLUP_TOTAL_PERIOD) -> float:
+    """
+    Reads a single rollup value, 0 when it has never been recorded.
+    """
+    return db.execute(rollup_value_statement(metric, period)).scalar() or 0
+
+
+def rollup_months_statement(metric: str, after_month: str):
+    """
+    Selects the non-zero monthly rollups of a metric after a given month as
+    (month, value) rows ordered by month.
+    """
+    return select(StatsRollup.period, StatsRollup.value).where(
+        StatsRollup.metric == metric,
+        StatsRollup.period > after_month,
+        StatsRollup.period != ROLLUP_TOTAL_PERIOD,
+        StatsRollup.value != 0
+    ).order_by(StatsRollup.period)
+
+
+def rollup_months(db: Session, metric: str, after_month: str):
+    """
+    Reads the non-zero monthly rollups of a metric after a given month.
+
+    Args:
+        db (Session): The database session.
+        metric (str): The rollup metric.
+        after_month (str): Only months strictly after this "YYYY-MM" are returned.
+
+    Returns:
+        list: (month, value) rows ordered by month.
+    """
+    return db.execute(rollup_months_statement(metric, after_month)).all()
+
+
+def rebuild_rollups(db: Session):
+    """
+    Recomputes every dashboard rollup from the fact tables.
+
+    Args:
+        db (Session): The database session.
+    """
+    db.query(StatsRollup).delete(synchronize_session=False)
+    rollups = [
+        StatsRollup(metric=ROLLUP_VEHICLES, period=ROLLUP_TOTAL_PERIOD, value=db.query(func.count(Vehicle.id)).scalar() or 0),
+        StatsRollup(metric=ROLLUP_DRIVERS, period=ROLLUP_TOTAL_PERIOD, value=db.query(func.count(Driver.id)).scalar() or 0),
+        StatsRollup(metric=ROLLUP_TRIPS, period=ROLLUP_TOTAL_PERIOD, value=db.query(func.count(Trip.id)).scalar() or 0),
+    ]
+    for month, trip_count in db.query(Trip.year_month, func.count(Trip.id)).group_by(Trip.year_month):
+        rollups.append(StatsRollup(metric=ROLLUP_TRIPS, period=month, value=trip_count))
+    for month, cost in db.query(Maintenance.year_month, func.sum(Maintenance.cost)).group_by(Maintenance.year_month):
+        rollups.append(StatsRollup(metric=ROLLUP_MAINTENANCE_COST, period=month, value=cost or 0.0))
+    db.add_all(rollups)
+    db.commit()
+
+
+def ensure_rollups(db: Session):
+    """
+    Builds the rollups once for databases created before they existed.
+    """
+    if db.query(StatsRollup.metric).first() is None:
+        rebuild_rollups(db)
@@ -0,0 +1,212 @@
+from bisect import bisect_left
+from datetime import datetime
+from threading import RLock
+
+
+def as_naive(value: datetime) -> datetime:
+    """
+    Drops timezone information the same way the SQLite DateTime column does.
+
+    Args:
+        value (datetime): The datetime to normalise.
+
+    Returns:
+        datetime: The datetime without tzinfo.
+    """
+    return value.replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+class IntervalIndex:
+    """
+    Sorted interval index for the bookings of a single driver or vehicle.
+
+    Intervals are kept ordered by start time together with the longest
+    interval seen so far. Any interval overlapping [start, end) must begin
+    after start - longest, so a probe only inspects that window instead of
+    the whole booking history.
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._entries = []
+        self._longest = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, start: datetime, end: datetime, trip_id: int):
+        """
+        Adds a booked interval to the index.
+
+        Args:
+            start (datetime): The interval start.
+            end (datetime): The interval end.
+            trip_id (int): The id of the trip occupying the interval.
+        """
+        start, end = as_naive(start), as_naive(end)
+        entry = (start, end, trip_id)
+        position = bisect_left(self._entries, entry)
+        self._entries.insert(position, entry)
+        self._starts.insert(position, start)
+        length = end - start
+        if self._longest is None or length > self._longest:
+            self._longest = length
+
+    def remove(self, start: datetime, end: datetime, trip_id: int):
+        """
+        Removes a booked interval from the index if present.
+
+        Args:
+            start (datetime): The interval start.
+            end (datetime): The interval end.
+            trip_id (int): The id of the trip occupying the interval.
+        """
+        entry = (as_naive(start), as_naive(end), trip_id)
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+            del self._starts[position]
+
+    def overlapping(self, start: datetime, end: datetime):
+        """
+        Yields every interval overlapping the half-open window [start, end).
+
+        Args:
+            start (datetime): The window start.
+            end (datetime): The window end.
+
+        Yields:
+            tuple: (start, end, trip_id) for each overlapping interval.
+        """
+        if not self._entries:
+            return
+        start, end = as_naive(start), as_naive(end)
+        low = bisect_left(self._starts, start - self._longest)
+        high = bisect_left(self._starts, end)
+        for position in range(low, high):
+            entry = self._entries[position]
+            if entry[1] > start:
+                yield entry
+
+    def first_overlap(self, start: datetime, end: datetime):
+        """
+        Returns the id of the first interval overlapping [start, end), or None.
+        """
+        for entry in self.overlapping(start, end):
+            return entry[2]
+        return None
+
+
+class ScheduleIndex:
+    """
+    In-process booking index keyed by driver and vehicle.
+
+    Each resource is loaded lazily from the database on first use through
+    the supplied loader and then kept in sync by calling add() after every
+    committed trip insert. Hold `lock` across check, commit and add() so two
+    requests in the same process cannot book the same slot.
+    """
+
+    def __init__(self, loader):
+        """
+        Args:
+            loader (callable): loader(kind, resource_id) returning an iterable
+                of (start_time, end_time, trip_id) rows, where kind is
+                "driver" or "vehicle".
+        """
+        self._loader = loader
+        self._indexes = {}
+        self.lock = RLock()
+
+    def _index_for(self, kind: str, resource_id: int) -> IntervalIndex:
+        key = (kind, resource_id)
+        index = self._indexes.get(key)
+        if index is None:
+            index = IntervalIndex()
+            for start, end, trip_id in self._loader(kind, resource_id):
+                index.add(start, end, trip_id)
+            self._indexes[key] = index
+        return index
+
+    def find_conflict(self, driver_id: int, vehicle_id: int, start: datetime, end: datetime):
+        """
+        Returns the id of a trip booking the driver or vehicle in [start, end).
+
+        Args:
+            driver_id (int): The driver to check.
+            vehicle_id (int): The vehicle to check.
+            start (datetime): The requested start time.
+            end (datetime): The requested end time.
+
+        Returns:
+            int or None: A conflicting trip id, or None if both are free.
+        """
+        with self.lock:
+            conflict = self._index_for("driver", driver_id).first_overlap(start, end)
+            if conflict is None:
+                conflict = self._index_for("vehicle", vehicle_id).first_overlap(start, end)
+            return conflict
+
+    def is_free(self, kind: str, resource_id: int, start: datetime, end: datetime) -> bool:
+        """
+        Returns True if nothing books the driver or vehicle in [start, end).
+
+        Args:
+            kind (str): "driver" or "vehicle".
+            resource_id (int): The driver or vehicle id.
+            start (datetime): The window start.
+            end (datetime): The window end.
+        """
+        with self.lock:
+            return self._index_for(kind, resource_id).first_overlap(start, end) is None
+
+    def add(self, driver_id: int, vehicle_id: int, start: datetime, end: datetime, trip_id: int):
+        """
+        Records a committed trip for both its driver and its vehicle.
+        """
+        with self.lock:
+            for key in (("driver", driver_id), ("vehicle", vehicle_id)):
+                index = self._indexes.get(key)
+                if index is not None:
+                    index.add(start, end, trip_id)
+
+    def clear(self):
+        """
+        Drops every loaded index so resources are reloaded on next use.
+        """
+        with self.lock:
+            self._indexes.clear()
+
+
+def sweep_conflicts(bookings):
+    """
+    Detects collisions inside a batch of bookings with a sort-and-sweep.
+
+    Bookings are visited in start order while the end of the last accepted
+    booking is tracked per resource, so a booking collides exactly when one
+    of its resources is still busy at its start. Rejected bookings do not
+    occupy their resources. Ties keep the batch order.
+
+    Args:
+        bookings (iterable): (key, resources, start, end) tuples where
+            resources is an iterable of hashable resource keys such as
+            ("driver", 3).
+
+    Returns:
+        dict: key -> key of the earlier accepted booking it collides with.
+    """
+    busy_until = {}
+    conflicts = {}
+    ordered = sorted(bookings, key=lambda booking: (as_naive(booking[2]), as_naive(booking[3])))
+    for key, resources, start, end in ordered:
+        start, end = as_naive(start), as_naive(end)
+        resources = tuple(resources)
+        for resource in resources:
+            busy = busy_until.get(resource)
+            if busy is not None and busy[0] > start:
+                conflicts[key] = busy[1]
+                break
+        else:
+            for resource in resources:
+                busy_until[resource] = (end, key)
+    return conflicts
@@ -0,0 +1,73 @@
+import json
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import HTTPException, Response
+
+try:
+    import orjson
+except ImportError:  # the fast path still works, encoded by the json module
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack responses are then refused with 406
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def _encode_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not serializable")
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """
+    Returns True if an Accept header asks for MessagePack.
+
+    Only an explicit msgpack media type selects it; */* and
+    application/json keep JSON.
+    """
+    if not accept:
+        return False
+    return any(part.split(";")[0].strip().lower() in MSGPACK_MEDIA_TYPES for part in accept.split(","))
+
+
+def dumps_json(payload) -> bytes:
+    """
+    Encodes plain dicts, lists and scalars as JSON with orjson.
+
+    Dates and datetimes come out in ISO 8601 exactly as Pydantic writes them.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_encode_default, separators=(",", ":")).encode()
+
+
+def fast_response(payload, accept: Optional[str] = None, headers: Optional[dict] = None) -> Response:
+    """
+    Encodes a payload of plain rows directly, skipping response_model
+    validation and jsonable_encoder.
+
+    The payload must already have the wire shape: dicts of column values.
+    MessagePack carries the same keys and values, with dates as ISO strings.
+
+    Args:
+        payload: The rows or document to send.
+        accept (Optional[str]): The Accept request header.
+        headers (Optional[dict]): Extra response headers.
+
+    Returns:
+        Response: The encoded body with its media type.
+
+    Raises:
+        HTTPException: 406 if MessagePack is requested but not installed.
+    """
+    headers = {**(headers or {}), "Vary": "Accept"}
+    if wants_msgpack(accept):
+        if msgpack is None:
+            raise HTTPException(status_code=406, detail="MessagePack responses require the msgpack package")
+        return Response(msgpack.packb(payload, default=_encode_default), media_type="application/msgpack", headers=headers)
+    return Response(dumps_json(payload), media_type="application/json", headers=headers)
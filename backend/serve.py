@@ -0,0 +1,183 @@
+"""
+Production launcher for the Fleet Manager API.
+
+Runs a small pre-fork master that binds the listening socket once and
+supervises N uvicorn worker processes sharing it:
+
+    python serve.py --workers 4 --port 8000
+    python serve.py --workers 8 --preload
+
+Signals sent to the master:
+    SIGTERM / SIGINT: graceful shutdown; workers stop accepting, finish the
+        requests in flight and exit within --graceful-timeout.
+    SIGHUP: graceful reload; a fresh set of workers is started, then the
+        old ones are shut down gracefully. Without --preload the new workers
+        import the application again and pick up code changes; with
+        --preload they are forked from the already imported application.
+    SIGTTIN / SIGTTOU: add or remove one worker.
+
+Workers that die unexpectedly are restarted. With more than one worker
+the SQLite invalidation bus is enabled (unless INVALIDATION_BUS is set) so
+stats caches and token revocations stay coherent across workers, and the
+in-process trip interval index is turned off because it is only correct
+with a single writer process.
+
+POSIX only: it relies on os.fork and signals.
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Fleet Manager API with several worker processes.")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    parser.add_argument("--preload", action="store_true",
+                        help="import the app once in the master and fork workers from it")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="seconds workers get to finish requests on shutdown or reload")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args(argv)
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def configure_environment(workers: int):
+    """
+    Sets the defaults multi-worker deployments need before the app is imported.
+    """
+    if workers > 1:
+        os.environ.setdefault("INVALIDATION_BUS", "sqlite")
+        if os.environ.get("TRIP_INTERVAL_INDEX") == "1":
+            print("TRIP_INTERVAL_INDEX is only safe with one worker; falling back to database probes.")
+            os.environ["TRIP_INTERVAL_INDEX"] = "0"
+
+
+class Master:
+    """
+    Supervises the worker processes serving a shared socket.
+    """
+
+    def __init__(self, args, sock: socket.socket, app):
+        self.args = args
+        self.sock = sock
+        self.app = app
+        self.target_workers = args.workers
+        self.workers = {}  # pid -> generation
+        self.generation = 0
+        self.signals = []
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = self.generation
+            return
+        # Worker process
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)
+        config = uvicorn.Config(
+            self.app, log_level=self.args.log_level,
+            timeout_graceful_shutdown=self.args.graceful_timeout
+        )
+        try:
+            uvicorn.Server(config).run(sockets=[self.sock])
+        finally:
+            os._exit(0)
+
+    def stop_workers(self, pids, graceful: bool = True):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM if graceful else signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            generation = self.workers.pop(pid, None)
+            if generation == self.generation and status != 0 and not self.stopping:
+                print(f"Worker {pid} exited with status {status}")
+
+    def wait_for_exit(self, pids, timeout: float):
+        deadline = time.monotonic() + timeout
+        while any(pid in self.workers for pid in pids) and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        self.stop_workers([pid for pid in pids if pid in self.workers], graceful=False)
+        self.reap()
+
+    def reload(self):
+        old = list(self.workers)
+        self.generation += 1
+        for _ in range(self.target_workers):
+            self.spawn()
+        self.stop_workers(old)
+        self.wait_for_exit(old, self.args.graceful_timeout)
+
+    def run(self):
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(signum, lambda received, frame: self.signals.append(received))
+        for _ in range(self.target_workers):
+            self.spawn()
+        print(f"Serving on {self.args.host}:{self.args.port} with {self.target_workers} workers (master {os.getpid()})")
+
+        while True:
+            time.sleep(0.2)
+            while self.signals:
+                received = self.signals.pop(0)
+                if received in (signal.SIGTERM, signal.SIGINT):
+                    self.stopping = True
+                    pids = list(self.workers)
+                    self.stop_workers(pids)
+                    self.wait_for_exit(pids, self.args.graceful_timeout)
+                    return
+                if received == signal.SIGHUP:
+                    self.reload()
+                elif received == signal.SIGTTIN:
+                    self.target_workers += 1
+                elif received == signal.SIGTTOU and self.target_workers > 1:
+                    self.target_workers -= 1
+                    current = [pid for pid, generation in self.workers.items() if generation == self.generation]
+                    self.stop_workers(current[-1:])
+            self.reap()
+            current = [pid for pid, generation in self.workers.items() if generation == self.generation]
+            for _ in range(self.target_workers - len(current)):
+                self.spawn()
+
+
+def serve(argv=None):
+    args = parse_args(argv)
+    configure_environment(args.workers)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    sock = bind_socket(args.host, args.port, args.backlog)
+    if args.preload:
+        from main import app
+    else:
+        app = "main:app"
+    Master(args, sock, app).run()
+
+
+if __name__ == "__main__":
+    serve()
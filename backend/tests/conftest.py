@@ -0,0 +1,65 @@
+"""
+Shared fixtures: every test runs the app against a temporary SQLite
+database, stats cache, invalidation bus and job queue.
+
+The environment is configured before main is imported, since main reads it
+at import time.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = tempfile.mkdtemp(prefix="fleet_manager_tests_")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'fleet_manager.db')}"
+os.environ["STATS_CACHE_PATH"] = os.path.join(TEST_DIR, "cache.db")
+os.environ["INVALIDATION_BUS_PATH"] = os.path.join(TEST_DIR, "bus.db")
+os.environ["JOB_QUEUE_PATH"] = os.path.join(TEST_DIR, "jobs.db")
+os.environ["JOB_RESULTS_DIR"] = os.path.join(TEST_DIR, "job_results")
+os.environ["JOB_WORKERS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+sys.path.insert(0, BACKEND_DIR)
+
+import main  # noqa: E402
+from models import Base, RevisionCounter  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_directory():
+    yield TEST_DIR
+    main.engine.dispose()
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def client(app_client):
+    """
+    A TestClient on an empty database with cold caches.
+    """
+    yield app_client
+    with main.engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            if table.name != RevisionCounter.__tablename__:
+                connection.execute(table.delete())
+    main.stats_cache.backend.clear()
+    main.token_cache = main.TokenCache(main.TOKEN_CACHE_SIZE)
+    if main.trip_schedule is not None:
+        main.trip_schedule.clear()
+
+
+@pytest.fixture
+def db(client):
+    session = main.SessionLocal()
+    yield session
+    session.close()
@@ -0,0 +1,80 @@
+import inspect
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import main
+
+async_api = pytest.importorskip("async_api")
+
+
+@pytest.fixture
+def async_client(client):
+    app = FastAPI()
+    app.router.routes = list(main.app.router.routes)
+    async_api.install_async_routes(app)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_the_crud_and_stats_surface_runs_on_the_event_loop():
+    routes = {(route.path, method): route for route in async_api.router.routes for method in route.methods}
+    assert {("/vehicles", "POST"), ("/fuel-expenses/{expense_id}", "PUT"), ("/trips", "POST")} <= set(routes)
+    assert {("/stats/dashboard", "GET"), ("/fuel-expenses/stats/fleet", "GET"), ("/upcoming", "GET")} <= set(routes)
+    assert ("/trips/bulk", "POST") not in routes
+    assert all(inspect.iscoroutinefunction(route.endpoint) for route in routes.values())
+
+
+def test_async_writes_keep_the_derived_tables_current(async_client):
+    client = async_client
+    endpoints = {route.endpoint for route in client.app.routes if getattr(route, "path", None) == "/vehicles"}
+    assert endpoints == {async_api.get_vehicles, async_api.create_vehicle}
+    vehicle = client.post("/vehicles", json={"name": "Van", "license_expiry_date": "2030-01-01"}).json()
+    client.post("/maintenance", json={
+        "vehicle_id": vehicle["id"], "description": "Tyres", "cost": 80.0,
+        "maintenance_date": "2024-02-01", "next_maintenance_date": "2029-01-01"
+    })
+    first = client.post("/fuel-expenses", json={
+        "vehicle_id": vehicle["id"], "expense_type": "fuel", "quantity": 40, "cost": 60, "odometer_reading": 1000,
+        "expense_date": "2024-03-01"
+    }).json()
+    second = client.post("/fuel-expenses", json={
+        "vehicle_id": vehicle["id"], "expense_type": "fuel", "quantity": 50, "cost": 70, "odometer_reading": 1500,
+        "expense_date": "2024-03-08"
+    }).json()
+    assert client.get(f"/fuel-expenses/stats/vehicle/{vehicle['id']}").json()["fuel_efficiency"] == 10.0
+
+    client.put(f"/fuel-expenses/{second['id']}", json={**second, "odometer_reading": 2000})
+    assert client.get(f"/fuel-expenses/stats/vehicle/{vehicle['id']}").json()["fuel_efficiency"] == 20.0
+    revision = int(client.get("/fuel-expenses").headers["X-Revision"])
+    assert client.delete(f"/fuel-expenses/{first['id']}").json() == {"detail": "Expense record deleted"}
+    delta = client.get("/fuel-expenses", params={"since": revision}).json()
+    assert [row["id"] for row in delta["deleted"]] == [first["id"]]
+
+    assert [item["kind"] for item in client.get("/upcoming").json()] == ["maintenance", "license"]
+    assert client.get("/stats/summary").json()["total_vehicles"] == 1
+
+
+def test_async_trip_bookings_reject_double_bookings(async_client):
+    client = async_client
+    vehicle = client.post("/vehicles", json={"name": "Van"}).json()
+    driver = client.post("/drivers", json={"name": "Ada"}).json()
+    trip = {
+        "driver_id": driver["id"], "vehicle_id": vehicle["id"], "start_location": "A", "end_location": "B",
+        "start_time": "2024-05-01T08:00:00", "end_time": "2024-05-01T10:00:00"
+    }
+    assert client.post("/trips", json=trip).status_code == 200
+    assert client.post("/trips", json={**trip, "start_time": "2024-05-01T09:00:00"}).status_code == 400
+    assert client.get("/stats/summary").json()["total_trips"] == 1
+
+
+def test_async_reads_see_sync_writes(async_client, db):
+    client = async_client
+    db.add(main.Vehicle(name="Van"))
+    db.commit()
+
+    listing = client.get("/vehicles")
+    assert [row["name"] for row in listing.json()] == ["Van"]
+    assert client.get("/vehicles", headers={"If-None-Match": listing.headers["ETag"]}).status_code == 304
+    assert client.get("/vehicles", params={"fields": "name", "limit": 1}).json() == [{"id": listing.json()[0]["id"], "name": "Van"}]
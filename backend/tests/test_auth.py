@@ -0,0 +1,76 @@
+import time
+
+import main
+from token_cache import TokenCache, token_digest
+
+
+class RecordingBus:
+    def __init__(self):
+        self.events = []
+
+    def publish(self, topic, payload):
+        self.events.append((topic, payload))
+
+
+def login(client, email="ops@example.com", password="secret"):
+    client.post("/register", json={"email": email, "password": password})
+    response = client.post("/token", data={"username": email, "password": password})
+    return response.json()["access_token"]
+
+
+def test_current_user_is_served_from_the_token_cache(client):
+    token = login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/users/me", headers=headers).json()["email"] == "ops@example.com"
+    hits = main.token_cache.hits
+    assert client.get("/users/me", headers=headers).status_code == 200
+    assert main.token_cache.hits == hits + 1
+    assert client.get("/users/me", headers={"Authorization": "Bearer not-a-jwt"}).status_code == 401
+
+
+def test_logout_revokes_the_token_and_publishes_only_its_digest(client, monkeypatch):
+    bus = RecordingBus()
+    monkeypatch.setattr(main, "invalidation_bus", bus)
+    token = login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/users/me", headers=headers)
+
+    assert client.post("/logout", headers=headers).status_code == 200
+    assert client.get("/users/me", headers=headers).status_code == 401
+    [(topic, payload)] = bus.events
+    assert topic == "token-revoked"
+    assert payload["digest"] == token_digest(token)
+    assert token not in str(payload)
+
+
+def test_revocation_from_another_worker_evicts_the_cached_token():
+    cache = TokenCache()
+    cache.put("token-a", "principal", time.time() + 60)
+    digest = token_digest("token-a")
+
+    cache.revoke(digest, time.time() + 60)
+    assert cache.get("token-a") is None
+    assert cache.is_revoked("token-a")
+    cache.put("token-a", "principal", time.time() + 60)
+    assert cache.get("token-a") is None
+
+
+def test_revocation_outlives_the_worker_that_received_the_logout(client, monkeypatch):
+    token = login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/logout", headers=headers)
+
+    # A restarted or newly spawned worker starts with an empty token cache
+    monkeypatch.setattr(main, "token_cache", TokenCache())
+    assert client.get("/users/me", headers=headers).status_code == 401
+    assert main.token_cache.is_revoked(token)
+
+
+def test_logout_prunes_expired_revocations(client, db):
+    db.add(main.RevokedToken(digest="stale", expires_at=time.time() - 1))
+    db.commit()
+    token = login(client)
+    client.post("/logout", headers={"Authorization": f"Bearer {token}"})
+
+    assert [row.digest for row in db.query(main.RevokedToken)] == [token_digest(token)]
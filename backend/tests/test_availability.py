@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import main
+from bookings import longest_booking
+
+START = datetime(2024, 3, 1, 8, 0)
+
+
+def book(client, driver_id, vehicle_id, start, end):
+    response = client.post("/trips", json={
+        "driver_id": driver_id, "vehicle_id": vehicle_id, "start_location": "Depot", "end_location": "Port",
+        "start_time": start.isoformat(), "end_time": end.isoformat()
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def create_fleet(client):
+    vehicles = [client.post("/vehicles", json={"name": f"Van {n}"}).json()["id"] for n in range(3)]
+    drivers = [client.post("/drivers", json={"name": f"Driver {n}"}).json()["id"] for n in range(3)]
+    return vehicles, drivers
+
+
+def test_trip_duration_is_stored_and_bounds_the_scan(client, db):
+    vehicles, drivers = create_fleet(client)
+    book(client, drivers[0], vehicles[0], START, START + timedelta(hours=2, seconds=30))
+
+    assert db.query(main.Trip.duration_seconds).scalar() == 2 * 3600 + 30
+    assert longest_booking(db) == timedelta(hours=2, seconds=31)
+
+
+def test_long_trip_starting_before_the_window_is_busy(client):
+    vehicles, drivers = create_fleet(client)
+    book(client, drivers[0], vehicles[0], START - timedelta(days=10), START + timedelta(days=1))
+    book(client, drivers[1], vehicles[1], START - timedelta(hours=1), START - timedelta(minutes=1))
+
+    result = client.get("/availability", params={
+        "start_time": START.isoformat(), "end_time": (START + timedelta(hours=4)).isoformat()
+    }).json()
+    assert result["free_vehicle_ids"] == vehicles[1:]
+    assert result["free_driver_ids"] == drivers[1:]
+
+
+def test_bulk_search_answers_each_window(client):
+    vehicles, drivers = create_fleet(client)
+    book(client, drivers[0], vehicles[0], START, START + timedelta(hours=2))
+    book(client, drivers[1], vehicles[1], START + timedelta(days=1), START + timedelta(days=1, hours=2))
+
+    results = client.post("/availability", json={
+        "windows": [
+            {"start_time": START.isoformat(), "end_time": (START + timedelta(hours=1)).isoformat()},
+            {"start_time": (START + timedelta(days=1)).isoformat(), "end_time": (START + timedelta(days=1, hours=1)).isoformat()},
+            {"start_time": (START + timedelta(hours=2)).isoformat(), "end_time": (START + timedelta(hours=3)).isoformat()},
+        ],
+        "vehicle_ids": vehicles[:2],
+    }).json()
+    assert [result["free_vehicle_ids"] for result in results] == [[vehicles[1]], [vehicles[0]], vehicles[:2]]
+    assert [result["free_driver_ids"] for result in results] == [drivers[1:], [drivers[0], drivers[2]], drivers]
@@ -0,0 +1,27 @@
+import pytest
+
+import main
+from models import DueItem, Trip, VehicleFuelLedger
+
+benchmark = pytest.importorskip("benchmark")
+
+
+def test_seeded_database_is_consistent_with_the_api(client, db):
+    args = benchmark.parse_args(["--vehicles", "4", "--drivers", "4", "--years", "0.1"])
+    counts = benchmark.seed_database(main, args)
+
+    assert counts["vehicles"] == 4 and counts["trips"] > 0
+    # Bulk-inserted rows carry revisions, so conditional GETs and ?since= see them
+    assert db.query(Trip).filter(Trip.revision == 0).count() == 0
+    assert len(client.get("/vehicles", params={"since": 0}).json()["changed"]) == 4
+    # Aggregates were rebuilt with the same helper as the rebuild-stats job
+    summary = client.get("/stats/summary").json()
+    assert (summary["total_vehicles"], summary["total_trips"]) == (4, counts["trips"])
+    assert db.query(DueItem).count() >= 4
+    assert db.query(VehicleFuelLedger).count() == 4
+
+
+def test_summarize_reports_latency_percentiles():
+    summary = benchmark.summarize([0.001 * n for n in range(1, 101)], [200] * 100, 1.0)
+    assert summary["requests"] == 100
+    assert summary["latency_ms"]["p50"] == pytest.approx(50, abs=1)
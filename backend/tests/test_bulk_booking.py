@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+import main
+from rollups import ROLLUP_TRIPS, month_key, rollup_value
+from scheduling import sweep_conflicts
+
+START = datetime(2024, 6, 3, 8, 0)
+
+
+def trip(driver_id, vehicle_id, start, end):
+    return {
+        "driver_id": driver_id, "vehicle_id": vehicle_id, "start_location": "Depot", "end_location": "Port",
+        "start_time": start.isoformat(), "end_time": end.isoformat()
+    }
+
+
+def test_sweep_conflicts_reports_the_earlier_booking():
+    conflicts = sweep_conflicts([
+        ("c", [("driver", 1)], START + timedelta(hours=1), START + timedelta(hours=2)),
+        ("a", [("driver", 1), ("vehicle", 1)], START, START + timedelta(hours=2)),
+        ("b", [("vehicle", 1)], START + timedelta(hours=2), START + timedelta(hours=3)),
+    ])
+    assert conflicts == {"c": "a"}
+
+
+def test_rejected_rows_do_not_block_later_rows(client):
+    report = client.post("/trips/bulk", json=[
+        trip(1, 1, START, START + timedelta(hours=4)),
+        trip(1, 2, START + timedelta(hours=1), START + timedelta(hours=5)),
+        trip(2, 2, START + timedelta(hours=4), START + timedelta(hours=6)),
+        trip(3, 3, START + timedelta(hours=2), START + timedelta(hours=1)),
+    ]).json()
+
+    assert [result["accepted"] for result in report["results"]] == [True, False, True, False]
+    assert report["results"][1]["detail"] == "Driver or vehicle is already booked by row 0 of this batch"
+    assert report["results"][3]["detail"] == "End time must be after start time"
+    trip_ids = [result["trip_id"] for result in report["results"] if result["accepted"]]
+    assert sorted(trip["id"] for trip in client.get("/trips").json()) == sorted(trip_ids)
+
+
+def test_accepted_rows_update_the_trip_rollups(client, db):
+    client.post("/trips/bulk", json=[
+        trip(driver_id, driver_id, START + timedelta(days=31 * month), START + timedelta(days=31 * month, hours=1))
+        for driver_id in (1, 2) for month in (0, 1)
+    ])
+
+    assert client.get("/stats/summary").json()["total_trips"] == 4
+    assert rollup_value(db, ROLLUP_TRIPS, month_key(START)) == 2
+
+
+def test_batches_over_the_limit_are_refused(client, monkeypatch):
+    monkeypatch.setattr(main, "MAX_BULK_TRIPS", 2)
+    response = client.post("/trips/bulk", json=[
+        trip(index, index, START, START + timedelta(hours=1)) for index in range(3)
+    ])
+    assert response.status_code == 400
+    assert client.get("/trips").json() == []
@@ -0,0 +1,104 @@
+import os
+import time
+
+import pytest
+
+from cache import LRUCacheBackend, ResponseCache, SQLiteCacheBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return LRUCacheBackend(max_entries=2)
+    return SQLiteCacheBackend(os.path.join(tmp_path, "cache.db"))
+
+
+def test_entries_expire_after_their_ttl(backend, monkeypatch):
+    backend.set("a", {"value": 1}, 10, ["trips"])
+    assert backend.get("a") == {"value": 1}
+
+    clock = "monotonic" if isinstance(backend, LRUCacheBackend) else "time"
+    now = getattr(time, clock)()
+    monkeypatch.setattr(time, clock, lambda: now + 11)
+    assert backend.get("a") is None
+
+
+def test_invalidation_drops_only_the_tagged_entries(backend):
+    backend.set("summary", 1, 60, ["vehicles", "trips"])
+    backend.set("costs", 2, 60, ["maintenance"])
+
+    backend.invalidate(["trips"])
+    assert (backend.get("summary"), backend.get("costs")) == (None, 2)
+
+
+def test_lru_backend_evicts_the_least_recently_used_entry():
+    backend = LRUCacheBackend(max_entries=2)
+    backend.set("a", 1, 60, [])
+    backend.set("b", 2, 60, [])
+    backend.get("a")
+    backend.set("c", 3, 60, [])
+    assert (backend.get("a"), backend.get("b"), backend.get("c")) == (1, None, 3)
+    assert backend.evictions == 1
+
+
+def test_response_cache_computes_once_until_invalidated():
+    cache = ResponseCache(LRUCacheBackend(), ttl=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"count": len(calls)}
+
+    key = ResponseCache.key("stats/summary", date_from=None, vehicle_id=3)
+    assert key == "stats/summary?vehicle_id=3"
+    assert cache.get_or_set(key, ["trips"], compute) == {"count": 1}
+    assert cache.get_or_set(key, ["trips"], compute) == {"count": 1}
+    cache.invalidate("trips")
+    assert cache.get_or_set(key, ["trips"], compute) == {"count": 2}
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_a_value_computed_during_a_write_is_not_stored():
+    cache = ResponseCache(LRUCacheBackend(), ttl=60)
+
+    def compute():
+        cache.invalidate("trips")
+        return 1
+
+    cache.get_or_set("stats/summary", ["trips"], compute)
+    assert len(cache.backend) == 0
+
+
+def test_a_stale_generation_is_not_stored(backend):
+    generation = backend.generation(["trips", "vehicles"])
+    backend.invalidate(["trips"])
+    assert not backend.set("summary", 1, 60, ["trips", "vehicles"], generation)
+    assert backend.get("summary") is None
+
+    assert backend.set("summary", 1, 60, ["trips", "vehicles"], backend.generation(["trips", "vehicles"]))
+    assert backend.get("summary") == 1
+
+
+def test_a_value_computed_while_another_process_writes_is_not_stored(tmp_path):
+    path = os.path.join(tmp_path, "cache.db")
+    cache, other_worker = ResponseCache(SQLiteCacheBackend(path)), ResponseCache(SQLiteCacheBackend(path))
+
+    def compute():
+        other_worker.invalidate("trips")
+        return 1
+
+    cache.get_or_set("stats/summary", ["trips"], compute)
+    assert len(cache.backend) == 0
+    assert cache.get_or_set("stats/summary", ["trips"], lambda: 2) == 2
+    assert other_worker.backend.get("stats/summary") == 2
+
+
+def test_stats_endpoints_are_invalidated_by_writes(client):
+    before = client.get("/stats/cache").json()
+    assert client.get("/stats/summary").json()["total_vehicles"] == 0
+    assert client.get("/stats/summary").json()["total_vehicles"] == 0
+    client.post("/vehicles", json={"name": "Van"})
+
+    assert client.get("/stats/summary").json()["total_vehicles"] == 1
+    after = client.get("/stats/cache").json()
+    assert (after["hits"] - before["hits"], after["misses"] - before["misses"]) == (1, 2)
@@ -0,0 +1,66 @@
+import io
+
+import import_records
+import main
+from csv_import import import_csv
+from models import Vehicle
+from rollups import ROLLUP_MAINTENANCE_COST, ROLLUP_TOTAL_PERIOD, ROLLUP_VEHICLES, rollup_value
+
+
+def upload(client, entity, text):
+    return client.post(f"/import/{entity}", files={"file": (f"{entity}.csv", text.encode("utf-8"), "text/csv")})
+
+
+def test_valid_rows_are_imported_and_invalid_rows_reported_by_line(client):
+    report = upload(client, "vehicles", (
+        "name,model,year_of_car,license_expiry_date\n"
+        "Van 1,Transit,2020,2030-01-01\n"
+        "Van 2,Transit,not-a-year,\n"
+        ",Sprinter,2021,\n"
+        "Van 3,,,\n"
+    )).json()
+
+    assert (report["entity"], report["imported"], report["rejected"]) == ("vehicles", 2, 2)
+    assert [(error["line"], error["field"]) for error in report["errors"]] == [(3, "year_of_car"), (4, "name")]
+    assert [vehicle["name"] for vehicle in client.get("/vehicles").json()] == ["Van 1", "Van 3"]
+
+
+def test_imports_update_the_derived_tables(client, db):
+    upload(client, "vehicles", "name,license_expiry_date\nVan 1,2030-01-01\nVan 2,\n")
+    vehicle_id = db.query(Vehicle.id).filter(Vehicle.name == "Van 1").scalar()
+    upload(client, "maintenance", (
+        "vehicle_id,description,maintenance_date,cost,next_maintenance_date\n"
+        f"{vehicle_id},Oil,2024-03-01,120,\n"
+        f"{vehicle_id},Tyres,2024-03-20,380,2024-09-20\n"
+    ))
+
+    assert rollup_value(db, ROLLUP_VEHICLES, ROLLUP_TOTAL_PERIOD) == 2
+    assert rollup_value(db, ROLLUP_MAINTENANCE_COST, "2024-03") == 500
+    assert {item["kind"] for item in client.get("/upcoming").json()} == {"license", "maintenance"}
+
+
+def test_missing_required_columns_are_rejected_up_front(client):
+    response = upload(client, "fuel-expenses", "vehicle_id,cost\n1,20\n")
+    assert response.status_code == 400
+    assert "expense_type" in response.json()["detail"]
+
+
+def test_rows_are_committed_chunk_by_chunk(db):
+    chunks = []
+
+    def store_rows(session, rows):
+        chunks.append(len(rows))
+        session.add_all(Vehicle(**row) for row in rows)
+
+    lines = io.StringIO("name\n" + "".join(f"Van {index}\n" for index in range(5)))
+    report = import_csv(db, lines, main.VehicleCreate, store_rows, chunk_size=2)
+    assert (report["imported"], chunks) == (5, [2, 2, 1])
+
+
+def test_command_line_import(client, tmp_path, capsys):
+    path = tmp_path / "drivers.csv"
+    path.write_text("name,license_number\nAda,L-1\nBo,\n", encoding="utf-8")
+    import_records.import_records("drivers", str(path))
+
+    assert "Imported 2 drivers rows, rejected 0." in capsys.readouterr().out
+    assert len(client.get("/drivers").json()) == 2
@@ -0,0 +1,40 @@
+import os
+
+from sqlalchemy import create_engine, text
+
+import main
+from database import engine_options, install_sqlite_pragmas
+
+
+def test_pool_options_follow_the_backend_and_environment(monkeypatch):
+    assert engine_options("sqlite://") == {}
+    assert engine_options("sqlite:///:memory:") == {}
+
+    server = engine_options("postgresql://fleet@db/fleet")
+    assert (server["pool_pre_ping"], server["pool_recycle"]) == (True, 1800)
+    sqlite_file = engine_options("sqlite:///./fleet.db")
+    assert (sqlite_file["pool_pre_ping"], sqlite_file["pool_recycle"]) == (False, -1)
+
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "off")
+    options = engine_options("postgresql://fleet@db/fleet")
+    assert (options["pool_size"], options["pool_pre_ping"]) == (20, False)
+
+
+def test_every_sqlite_connection_gets_the_pragmas(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "1234")
+    url = f"sqlite:///{os.path.join(tmp_path, 'pragmas.db')}"
+    engine = create_engine(url, **engine_options(url))
+    install_sqlite_pragmas(engine)
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+    finally:
+        engine.dispose()
+
+
+def test_the_application_engine_runs_in_wal_mode(client):
+    with main.engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
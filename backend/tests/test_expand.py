@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+import main
+
+START = datetime(2024, 7, 1, 8, 0)
+
+
+@contextmanager
+def counted_statements():
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(main.engine, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        event.remove(main.engine, "before_cursor_execute", count)
+
+
+def add_trips(client, count):
+    for index in range(count):
+        vehicle_id = client.post("/vehicles", json={"name": f"Van {index}"}).json()["id"]
+        driver_id = client.post("/drivers", json={"name": f"Driver {index}"}).json()["id"]
+        client.post("/trips", json={
+            "driver_id": driver_id, "vehicle_id": vehicle_id, "start_location": "Depot", "end_location": "Port",
+            "start_time": START.isoformat(), "end_time": (START + timedelta(hours=1)).isoformat()
+        })
+
+
+def test_expanded_trips_embed_their_driver_and_vehicle(client):
+    add_trips(client, 2)
+    trips = client.get("/trips", params={"expand": "driver,vehicle"}).json()
+
+    assert [(trip["driver"]["name"], trip["vehicle"]["name"]) for trip in trips] == [
+        ("Driver 0", "Van 0"), ("Driver 1", "Van 1")
+    ]
+    assert trips[0]["driver_id"] == trips[0]["driver"]["id"]
+
+
+def test_expansion_queries_do_not_grow_with_the_page(client):
+    add_trips(client, 2)
+    with counted_statements() as few:
+        client.get("/trips", params={"expand": "driver,vehicle"})
+    add_trips(client, 8)
+    with counted_statements() as many:
+        client.get("/trips", params={"expand": "driver,vehicle"})
+    assert len(many) == len(few)
+
+
+def test_expansions_combine_with_fields_and_report_missing_rows(client):
+    client.post("/fuel-expenses", json={"vehicle_id": 999, "expense_type": "toll", "cost": 5, "expense_date": "2024-07-01"})
+    (expense,) = client.get("/fuel-expenses", params={"expand": "vehicle", "fields": "cost"}).json()
+    assert expense == {"id": expense["id"], "cost": 5.0, "vehicle": None}
+
+
+def test_unknown_expansions_are_rejected(client):
+    response = client.get("/maintenance", params={"expand": "driver"})
+    assert response.status_code == 400
+    assert "vehicle" in response.json()["detail"]
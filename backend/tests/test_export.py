@@ -0,0 +1,43 @@
+import csv
+import io
+import json
+
+import main
+
+TRIP = {
+    "driver_id": 1, "vehicle_id": 7, "start_location": "Depot", "end_location": "Port",
+    "start_time": "2024-04-02T08:00:00", "end_time": "2024-04-02T10:00:00"
+}
+
+
+def test_trip_export_has_only_public_columns(client):
+    client.post("/trips", json=TRIP)
+
+    response = client.get("/trips/export", params={"format": "csv"})
+    assert response.headers["content-disposition"] == 'attachment; filename="trips.csv"'
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == main.TRIP_EXPORT_COLUMNS
+    assert not {"year_month", "duration_seconds", "revision", "updated_at"} & set(rows[0])
+    assert rows[1][1:] == ["1", "7", "Depot", "Port", "2024-04-02T08:00:00", "2024-04-02T10:00:00"]
+
+
+def test_ndjson_export_filters_by_vehicle_and_date(client):
+    client.post("/trips", json=TRIP)
+    client.post("/trips", json={**TRIP, "vehicle_id": 8})
+    client.post("/trips", json={**TRIP, "start_time": "2024-05-02T08:00:00", "end_time": "2024-05-02T09:00:00"})
+
+    response = client.get("/trips/export", params={
+        "format": "ndjson", "vehicle_id": 7, "date_from": "2024-04-01", "date_to": "2024-04-30"
+    })
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [(record["vehicle_id"], record["start_time"]) for record in records] == [(7, "2024-04-02T08:00:00")]
+    assert list(records[0]) == main.TRIP_EXPORT_COLUMNS
+
+
+def test_fuel_expense_export_matches_the_schema_fields(client):
+    client.post("/fuel-expenses", json={
+        "vehicle_id": 7, "expense_type": "fuel", "quantity": 40.0, "cost": 72.5, "expense_date": "2024-04-03"
+    })
+    records = [json.loads(line) for line in client.get("/fuel-expenses/export", params={"format": "ndjson"}).text.splitlines()]
+    assert list(records[0]) == ["id", *main.FuelExpenseCreate.model_fields]
+    assert records[0]["cost"] == 72.5
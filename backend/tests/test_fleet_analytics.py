@@ -0,0 +1,72 @@
+from datetime import date
+
+import pytest
+
+from fleet_analytics import analyze_fuel_expenses
+
+
+def columns(rows):
+    """
+    Turns (id, vehicle_id, type, cost, quantity, odometer, date) rows into
+    the parallel columns analyze_fuel_expenses takes.
+    """
+    return [list(column) for column in zip(*rows)]
+
+
+def fills(vehicle_id, first_id, distances, litres=50.0):
+    odometers = [10000.0]
+    for distance in distances:
+        odometers.append(odometers[-1] + distance)
+    return [
+        (first_id + index, vehicle_id, "fuel", litres * 2, litres, odometer, date(2024, 1, 1 + index))
+        for index, odometer in enumerate(odometers)
+    ]
+
+
+def test_totals_efficiency_and_monthly_spend_per_vehicle():
+    rows = fills(1, 1, [500.0, 500.0]) + [
+        (4, 1, "toll", 15.0, None, None, date(2024, 2, 1)),
+        (5, 2, "fuel", 60.0, 30.0, None, date(2024, 1, 10)),
+    ]
+    first, second = analyze_fuel_expenses(*columns(rows))
+
+    assert (first["vehicle_id"], first["fill_count"]) == (1, 3)
+    assert (first["total_fuel_costs"], first["total_other_expenses"]) == (300.0, 15.0)
+    assert (first["total_distance"], first["total_litres"]) == (1000.0, 100.0)
+    assert first["fuel_efficiency"] == pytest.approx(10.0)
+    assert first["cost_per_km"] == pytest.approx(0.315)
+    assert first["monthly_spend"] == [{"month": "2024-01", "cost": 300.0}, {"month": "2024-02", "cost": 15.0}]
+    # A fill without an odometer reading gives no distance to rate
+    assert (second["fill_count"], second["fuel_efficiency"], second["cost_per_km"]) == (0, None, None)
+
+
+def test_outlier_refuels_are_flagged_by_robust_z_score():
+    rows = fills(1, 1, [480.0, 500.0, 520.0, 490.0, 510.0])
+    rows.append((7, 1, "fuel", 100.0, 50.0, rows[-1][5] + 5000.0, date(2024, 1, 20)))
+    rows.append((8, 1, "fuel", 100.0, 50.0, rows[-1][5], date(2024, 1, 21)))
+    (vehicle,) = analyze_fuel_expenses(*columns(rows))
+
+    assert [outlier["expense_id"] for outlier in vehicle["outlier_refuels"]] == [7, 8]
+    assert vehicle["outlier_refuels"][1]["distance"] == 0.0
+
+
+def test_no_expenses_give_no_vehicles():
+    assert analyze_fuel_expenses([], [], [], [], [], [], []) == []
+
+
+def test_fleet_endpoint_filters_dates_and_answers_conditional_gets(client):
+    for expense_date, odometer in (("2024-01-05", 1000.0), ("2024-01-20", 1400.0), ("2024-03-01", 2000.0)):
+        client.post("/fuel-expenses", json={
+            "vehicle_id": 1, "expense_type": "fuel", "quantity": 40.0, "cost": 80.0,
+            "odometer_reading": odometer, "expense_date": expense_date
+        })
+
+    response = client.get("/fuel-expenses/stats/fleet", params={"date_to": "2024-01-31"})
+    (vehicle,) = response.json()["vehicles"]
+    assert (vehicle["fill_count"], vehicle["total_distance"]) == (2, 400.0)
+    assert vehicle["fuel_efficiency"] == pytest.approx(10.0)
+
+    etag = response.headers["ETag"]
+    assert client.get(
+        "/fuel-expenses/stats/fleet", params={"date_to": "2024-01-31"}, headers={"If-None-Match": etag}
+    ).status_code == 304
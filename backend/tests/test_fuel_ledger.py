@@ -0,0 +1,63 @@
+import pytest
+
+from fuel_ledger import rebuild_fuel_ledgers
+
+FILLS = [("2024-01-05", 1000.0, 40.0), ("2024-01-20", 1500.0, 50.0), ("2024-02-04", 2100.0, 50.0)]
+
+
+def add_fill(client, expense_date, odometer, litres, vehicle_id=1):
+    return client.post("/fuel-expenses", json={
+        "vehicle_id": vehicle_id, "expense_type": "fuel", "quantity": litres, "cost": litres * 2,
+        "odometer_reading": odometer, "expense_date": expense_date
+    }).json()
+
+
+def stats(client, vehicle_id=1):
+    return client.get(f"/fuel-expenses/stats/vehicle/{vehicle_id}").json()
+
+
+def assert_matches_rebuild(client, db):
+    incremental = stats(client)
+    rebuild_fuel_ledgers(db)
+    assert stats(client) == incremental
+    return incremental
+
+
+def test_efficiency_uses_the_fills_between_the_first_and_last(client, db):
+    for fill in FILLS:
+        add_fill(client, *fill)
+    client.post("/fuel-expenses", json={"vehicle_id": 1, "expense_type": "toll", "cost": 20.0, "expense_date": "2024-01-10"})
+
+    result = assert_matches_rebuild(client, db)
+    assert result["total_fuel_costs"] == 280.0
+    assert result["total_other_expenses"] == 20.0
+    assert result["fuel_efficiency"] == pytest.approx(1100 / 100)
+    assert result["average_cost_per_km"] == pytest.approx(300 / 1100)
+
+
+def test_deleting_an_endpoint_repairs_the_ledger(client, db):
+    first, _, last = [add_fill(client, *fill) for fill in FILLS]
+
+    client.delete(f"/fuel-expenses/{first['id']}")
+    assert assert_matches_rebuild(client, db)["fuel_efficiency"] == pytest.approx(600 / 50)
+    client.delete(f"/fuel-expenses/{last['id']}")
+    result = assert_matches_rebuild(client, db)
+    assert result["fuel_efficiency"] is None
+    assert result["total_fuel_costs"] == 100.0
+
+
+def test_moving_a_fill_between_vehicles_updates_both_ledgers(client, db):
+    fills = [add_fill(client, *fill) for fill in FILLS]
+    moved = {**fills[2], "vehicle_id": 2}
+    del moved["id"], moved["revision"], moved["updated_at"]
+
+    assert client.put(f"/fuel-expenses/{fills[2]['id']}", json=moved).status_code == 200
+    assert stats(client, 2)["total_fuel_costs"] == 100.0
+    assert assert_matches_rebuild(client, db)["fuel_efficiency"] == pytest.approx(500 / 50)
+
+
+def test_out_of_order_fill_becomes_the_new_first(client, db):
+    for fill in FILLS[1:]:
+        add_fill(client, *fill)
+    add_fill(client, *FILLS[0])
+    assert assert_matches_rebuild(client, db)["fuel_efficiency"] == pytest.approx(1100 / 100)
@@ -0,0 +1,37 @@
+import re
+
+import main
+
+
+def db_timing(response):
+    match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries, (\d+) rows"', response.headers["Server-Timing"])
+    return int(match.group(1)), int(match.group(2))
+
+
+def test_server_timing_counts_statements_and_rows(client):
+    for number in range(3):
+        client.post("/vehicles", json={"name": f"Van {number}"})
+
+    _, empty_rows = db_timing(client.get("/drivers"))
+    statements, rows = db_timing(client.get("/vehicles"))
+    assert statements >= 1
+    assert rows == empty_rows + 3
+
+
+def test_write_rows_come_from_the_rowcount(client):
+    vehicle = client.post("/vehicles", json={"name": "Van"}).json()
+    _, rows = db_timing(client.put(f"/vehicles/{vehicle['id']}", json={"name": "Renamed"}))
+    assert rows >= 1
+
+
+def test_metrics_report_requests_by_route(client):
+    client.get("/vehicles")
+    metrics = client.get("/metrics").text
+    assert 'fleet_http_requests_total{method="GET",route="/vehicles",status="200"}' in metrics
+
+
+def test_slow_queries_are_logged_with_their_plan(client, monkeypatch):
+    monkeypatch.setattr(main.query_monitor, "slow_query_seconds", 0.0)
+    client.get("/vehicles")
+    slow_queries = client.get("/metrics/slow-queries").json()
+    assert any("vehicles" in entry["statement"] and entry["plan"] for entry in slow_queries)
@@ -0,0 +1,87 @@
+import os
+import time
+
+import pytest
+from sqlalchemy import insert
+
+import main
+from invalidation_bus import InvalidationBus
+from models import Vehicle
+from rollups import ROLLUP_TOTAL_PERIOD, ROLLUP_VEHICLES, bump_rollup
+from token_cache import token_digest
+
+serve = pytest.importorskip("serve")
+
+
+@pytest.fixture
+def workers(tmp_path):
+    path = os.path.join(tmp_path, "bus.db")
+    buses = [InvalidationBus(path), InvalidationBus(path)]
+    yield buses
+    for bus in buses:
+        bus.stop()
+
+
+def test_events_reach_the_other_workers_only(workers):
+    first, second = workers
+    received = {"first": [], "second": []}
+    first.subscribe("stats", received["first"].append)
+    second.subscribe("stats", received["second"].append)
+    second.subscribe("token-revoked", lambda payload: pytest.fail("no revocation was published"))
+
+    first.publish("stats", ["vehicles"])
+    assert (first.poll(), second.poll()) == (0, 1)
+    assert received == {"first": [], "second": [["vehicles"]]}
+    assert second.poll() == 0
+
+
+def test_a_started_worker_skips_older_events_and_polls_in_the_background(workers):
+    first, second = workers
+    second.poll_interval = 0.01
+    received = []
+    second.subscribe("stats", received.append)
+    first.publish("stats", ["drivers"])
+
+    second.start()
+    first.publish("stats", ["trips"])
+    deadline = time.monotonic() + 5
+    while not received and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert received == [["trips"]]
+    assert second.stats()["running"]
+
+
+def test_remote_changes_drop_this_workers_cached_stats(client, db):
+    assert client.get("/stats/summary").json()["total_vehicles"] == 0
+    # Written by "another worker": nothing in this process is notified
+    db.execute(insert(Vehicle), [{"name": "Van"}])
+    bump_rollup(db, ROLLUP_VEHICLES, ROLLUP_TOTAL_PERIOD, 1)
+    db.commit()
+    assert client.get("/stats/summary").json()["total_vehicles"] == 0
+
+    main.apply_remote_change(["vehicles"])
+    assert client.get("/stats/summary").json()["total_vehicles"] == 1
+
+
+def test_remote_revocations_reject_the_token_here(client):
+    client.post("/register", json={"email": "ops@example.com", "password": "secret"})
+    token = client.post("/token", data={"username": "ops@example.com", "password": "secret"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/users/me", headers=headers).status_code == 200
+
+    main.apply_remote_revocation({"digest": token_digest(token), "expires_at": time.time() + 60})
+    assert client.get("/users/me", headers=headers).status_code == 401
+
+
+def test_multi_worker_serving_enables_the_bus_and_disables_the_interval_index(monkeypatch):
+    monkeypatch.delenv("INVALIDATION_BUS", raising=False)
+    monkeypatch.setenv("TRIP_INTERVAL_INDEX", "1")
+    serve.configure_environment(1)
+    assert "INVALIDATION_BUS" not in os.environ
+
+    serve.configure_environment(4)
+    assert (os.environ["INVALIDATION_BUS"], os.environ["TRIP_INTERVAL_INDEX"]) == ("sqlite", "0")
+
+    monkeypatch.setenv("INVALIDATION_BUS", "none")
+    serve.configure_environment(4)
+    assert os.environ["INVALIDATION_BUS"] == "none"
@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+import os
+import sqlite3
+import time
+
+import pytest
+
+import main
+from jobs import JOB_CANCELLED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JobQueue
+
+
+def echo_job(params, path):
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(params, output)
+    return "application/json"
+
+
+def failing_job(params, path):
+    raise RuntimeError("report exploded")
+
+
+def slow_job(params, path):
+    time.sleep(30)
+    return "application/json"
+
+
+def wait_for(get_job, job_id, states, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = get_job(job_id)
+        if job["status"] in states:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not reach {states}")
+
+
+@pytest.fixture
+def queue(tmp_path):
+    job_queue = JobQueue(
+        os.path.join(tmp_path, "jobs.db"), os.path.join(tmp_path, "results"), workers=1, poll_interval=0.05
+    )
+    job_queue.register("echo", echo_job, tags=("vehicles",))
+    job_queue.register("fail", failing_job)
+    job_queue.register("slow", slow_job)
+    yield job_queue
+    job_queue.stop()
+
+
+@pytest.fixture
+def api_jobs(client, monkeypatch):
+    monkeypatch.setattr(main.job_queue, "workers", 1)
+    monkeypatch.setattr(main.job_queue, "poll_interval", 0.05)
+    main.job_queue.start()
+    yield client
+    main.job_queue.stop()
+
+
+def test_jobs_run_in_processes_and_record_their_outcome(queue):
+    completed = []
+    queue.on_complete = completed.append
+    echo = queue.submit("echo", {"n": 1})
+    failure = queue.submit("fail", {})
+    assert echo["status"] == JOB_QUEUED
+    queue.start()
+
+    done = wait_for(queue.get, echo["id"], (JOB_SUCCEEDED,))
+    with open(done["result_path"], encoding="utf-8") as result:
+        assert json.load(result) == {"n": 1}
+    failed = wait_for(queue.get, failure["id"], (JOB_FAILED,))
+    assert failed["error"] == "RuntimeError: report exploded"
+    assert completed == [("vehicles",)]
+
+
+def test_cancelling_terminates_running_jobs_and_drops_queued_ones(queue):
+    running = queue.submit("slow", {})
+    queued = queue.submit("slow", {})
+    queue.start()
+    wait_for(queue.get, running["id"], (JOB_RUNNING,))
+
+    assert queue.cancel(queued["id"])["status"] == JOB_CANCELLED
+    assert queue.cancel(running["id"])["cancel_requested"]
+    assert wait_for(queue.get, running["id"], (JOB_CANCELLED,))["result_path"] is None
+    assert queue.stats()["running_here"] == 0
+
+
+def test_stopping_queues_running_jobs_again(queue):
+    job = queue.submit("slow", {})
+    queue.start()
+    wait_for(queue.get, job["id"], (JOB_RUNNING,))
+    queue.stop()
+    assert queue.get(job["id"])["status"] == JOB_QUEUED
+
+
+def test_running_jobs_hold_a_lease_that_their_dispatcher_renews(queue):
+    queue.lease = 0.6
+    job = queue.submit("slow", {})
+    queue.start()
+    wait_for(queue.get, job["id"], (JOB_RUNNING,))
+    row = queue._execute("SELECT worker_host, worker_pid, lease_expires_at FROM jobs WHERE id = ?", (job["id"],))[0]
+    assert row["worker_host"] == queue.hostname and row["worker_pid"] is not None
+
+    time.sleep(1)
+    assert queue.get(job["id"])["status"] == JOB_RUNNING
+    renewed = queue._execute("SELECT lease_expires_at FROM jobs WHERE id = ?", (job["id"],))[0]
+    assert renewed["lease_expires_at"] > row["lease_expires_at"]
+
+
+def test_jobs_whose_lease_expired_are_failed_by_any_dispatcher(queue):
+    lost, alive = queue.submit("slow", {}), queue.submit("slow", {})
+    now = time.time()
+    # Claimed by dispatchers on other hosts; pids mean nothing here
+    for job, expires_at in ((lost, now - 1), (alive, now + 60)):
+        queue._execute(
+            "UPDATE jobs SET status = ?, started_at = ?, worker_host = 'other-host', worker_pid = 1, "
+            "lease_expires_at = ? WHERE id = ?",
+            (JOB_RUNNING, now - 120, expires_at, job["id"])
+        )
+
+    queue._recover_orphans()
+    assert queue.get(lost["id"])["status"] == JOB_FAILED
+    assert queue.get(lost["id"])["error"] == "Job process was lost"
+    assert queue.get(alive["id"])["status"] == JOB_RUNNING
+
+
+def test_queues_created_before_leases_gain_the_columns(tmp_path):
+    path = os.path.join(tmp_path, "jobs.db")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL, "
+        "created_at REAL NOT NULL, started_at REAL, finished_at REAL, worker_pid INTEGER, "
+        "cancel_requested INTEGER NOT NULL DEFAULT 0, media_type TEXT, result_path TEXT, error TEXT)"
+    )
+    connection.execute(
+        "INSERT INTO jobs (id, kind, params, status, created_at, started_at) VALUES ('old', 'slow', '{}', ?, ?, ?)",
+        (JOB_RUNNING, time.time() - 120, time.time() - 120)
+    )
+    connection.commit()
+    connection.close()
+
+    job_queue = JobQueue(path, os.path.join(tmp_path, "results"), workers=1)
+    job_queue._recover_orphans()
+    assert job_queue.get("old")["status"] == JOB_FAILED
+
+
+def test_rebuild_stats_job_through_the_api(api_jobs):
+    response = api_jobs.post("/jobs", json={"kind": "rebuild-stats"})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["Location"] == f"/jobs/{job_id}"
+
+    job = wait_for(lambda job_id: api_jobs.get(f"/jobs/{job_id}").json(), job_id, (JOB_SUCCEEDED, JOB_FAILED))
+    assert (job["status"], job["result_url"]) == (JOB_SUCCEEDED, f"/jobs/{job_id}/result")
+    assert api_jobs.get(job["result_url"]).json() == {"rebuilt": ["rollups", "fuel_ledgers", "due_items"]}
+
+
+def test_export_job_writes_a_csv_result(api_jobs):
+    api_jobs.post("/fuel-expenses", json={"vehicle_id": 1, "expense_type": "toll", "cost": 4.5, "expense_date": "2024-05-01"})
+    job_id = api_jobs.post("/jobs", json={"kind": "fuel-expenses-export", "params": {"format": "csv"}}).json()["id"]
+    wait_for(lambda job_id: api_jobs.get(f"/jobs/{job_id}").json(), job_id, (JOB_SUCCEEDED,))
+
+    result = api_jobs.get(f"/jobs/{job_id}/result")
+    assert result.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(result.text)))
+    assert [(row["expense_type"], row["cost"]) for row in rows] == [("toll", "4.5")]
+
+
+def test_job_requests_are_validated(client):
+    assert client.post("/jobs", json={"kind": "mine-bitcoin"}).status_code == 400
+    assert client.post("/jobs", json={"kind": "trips-export", "params": {"format": "xml"}}).status_code == 422
+    assert client.get("/jobs/unknown").status_code == 404
+
+    # Without a dispatcher in this process the job stays queued
+    job_id = client.post("/jobs", json={"kind": "trips-export"}).json()["id"]
+    assert client.get(f"/jobs/{job_id}/result").status_code == 409
+    assert client.delete(f"/jobs/{job_id}").json()["status"] == JOB_CANCELLED
@@ -0,0 +1,51 @@
+import asyncio
+
+import main
+from live_updates import StatsBroker, diff_documents, merge_delta, sse_event
+
+
+def test_diff_sends_only_changed_keys():
+    old = {"stats": {"total_trips": 1, "total_drivers": 2}, "monthly_trips": [1]}
+    new = {"stats": {"total_trips": 2, "total_drivers": 2}, "monthly_trips": [1]}
+    assert diff_documents(old, new) == {"stats": {"total_trips": 2}}
+    assert diff_documents(None, new) == new
+    assert diff_documents(new, {"stats": new["stats"]}) == {"monthly_trips": None}
+
+
+def test_pending_deltas_merge_into_one():
+    pending = {"stats": {"total_trips": 2}}
+    merge_delta(pending, {"stats": {"total_vehicles": 1}, "monthly_trips": []})
+    assert pending == {"stats": {"total_trips": 2, "total_vehicles": 1}, "monthly_trips": []}
+
+
+def test_sse_event_format():
+    assert sse_event("delta", {"a": 1}, 3) == 'id: 3\nevent: delta\ndata: {"a":1}\n\n'
+
+
+def test_broker_recomputes_once_per_debounce_window():
+    async def scenario():
+        values = iter(range(100))
+        broker = StatsBroker(lambda: {"value": next(values)}, debounce=0.05)
+        subscription, sequence, snapshot = await broker.subscribe()
+        for _ in range(5):
+            broker.publish("trips")
+        update = await subscription.next(1)
+        broker.unsubscribe(subscription)
+        return snapshot, update, broker.stats()
+
+    snapshot, update, stats = asyncio.run(scenario())
+    assert (snapshot, update) == ({"value": 0}, (1, {"value": 1}))
+    assert (stats["published"], stats["recomputed"], stats["subscribers"]) == (5, 2, 0)
+
+
+def test_websocket_pushes_a_snapshot_then_deltas(client, monkeypatch):
+    monkeypatch.setattr(main.dashboard_broker, "debounce", 0.05)
+    with client.websocket_connect("/stats/dashboard/ws") as websocket:
+        snapshot = websocket.receive_json()
+        assert (snapshot["type"], snapshot["data"]["stats"]["total_vehicles"]) == ("snapshot", 0)
+
+        client.post("/vehicles", json={"name": "Van"})
+        delta = websocket.receive_json()
+        assert delta["type"] == "delta" and delta["sequence"] > snapshot["sequence"]
+        assert delta["data"] == {"stats": {"total_vehicles": 1}}
+    assert client.get("/stats/live").json()["subscribers"] == 0
@@ -0,0 +1,119 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+
+from migrations import MIGRATIONS, is_new_database, run_migrations
+from models import Base
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tables as created by releases before the migration path existed
+BASELINE_SCHEMA = [
+    "CREATE TABLE vehicles (id INTEGER PRIMARY KEY, name VARCHAR, model VARCHAR, make VARCHAR, color VARCHAR, "
+    "registration_number VARCHAR, license_expiry_date DATE, year_of_car INTEGER)",
+    "CREATE TABLE drivers (id INTEGER PRIMARY KEY, name VARCHAR, vehicle_id INTEGER, number_of_experience INTEGER, "
+    "license_number VARCHAR, contact_info VARCHAR)",
+    "CREATE TABLE trips (id INTEGER PRIMARY KEY, driver_id INTEGER NOT NULL, vehicle_id INTEGER NOT NULL, "
+    "start_location VARCHAR NOT NULL, end_location VARCHAR NOT NULL, start_time DATETIME NOT NULL, end_time DATETIME NOT NULL)",
+    "CREATE TABLE maintenance (id INTEGER PRIMARY KEY, vehicle_id INTEGER NOT NULL, description VARCHAR NOT NULL, "
+    "cost FLOAT NOT NULL, maintenance_date DATE NOT NULL, next_maintenance_date DATE)",
+    "CREATE TABLE fuel_expenses (id INTEGER PRIMARY KEY, vehicle_id INTEGER NOT NULL, driver_id INTEGER, "
+    "expense_type VARCHAR NOT NULL, fuel_type VARCHAR, quantity FLOAT, cost FLOAT NOT NULL, odometer_reading FLOAT, "
+    "location VARCHAR, expense_date DATE NOT NULL, notes VARCHAR)",
+    "INSERT INTO trips VALUES (1, 1, 1, 'A', 'B', '2024-02-03 08:00:00.000000', '2024-02-03 09:30:00.000000')",
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_baseline_database_is_upgraded_in_place(engine):
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.execute(text(statement))
+    assert not is_new_database(engine)
+
+    assert run_migrations(engine, Base.metadata) == [1, 2, 3, 4]
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes("trips")}
+    assert {"ix_trips_driver_schedule", "ix_trips_year_month", "ix_trips_duration_seconds"} <= indexes
+    with engine.connect() as connection:
+        row = connection.execute(text("SELECT year_month, duration_seconds, revision FROM trips")).one()
+    assert tuple(row) == ("2024-02", 5400, 0)
+    assert run_migrations(engine) == []
+
+
+def test_duration_column_added_before_versioning_is_kept(engine):
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(text("ALTER TABLE trips ADD COLUMN duration_seconds INTEGER"))
+
+    assert run_migrations(engine)[0] == 1
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT duration_seconds FROM trips")).scalar() == 5400
+
+
+def test_new_database_is_stamped_without_replaying(engine):
+    assert is_new_database(engine)
+    assert run_migrations(engine, Base.metadata) == [version for version, _, _ in MIGRATIONS]
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT MAX(version) FROM schema_migrations")).scalar() == MIGRATIONS[-1][0]
+
+
+def test_a_failing_migration_leaves_no_columns_behind(engine, monkeypatch):
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.execute(text(statement))
+    broken = [(3, "year_month columns for monthly stats", [MIGRATIONS[2][2][0], "UPDATE no_such_table SET x = 1"])]
+    monkeypatch.setattr("migrations.MIGRATIONS", MIGRATIONS[:2] + broken)
+
+    with pytest.raises(OperationalError):
+        run_migrations(engine)
+    columns = {column["name"] for column in inspect(engine).get_columns("trips")}
+    assert not {"duration_seconds", "year_month"} & columns
+    assert not inspect(engine).has_table("schema_migrations")
+
+    monkeypatch.undo()
+    assert run_migrations(engine) == [1, 2, 3, 4]
+
+
+def test_processes_starting_at_once_upgrade_the_database_once(engine, tmp_path):
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.execute(text(statement))
+    env = {**os.environ, "DATABASE_URL": str(engine.url), "JOB_WORKERS": "0", "PYTHONPATH": BACKEND}
+    processes = [
+        subprocess.Popen([sys.executable, os.path.join(BACKEND, "migrate.py")], cwd=tmp_path, env=env,
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(4)
+    ]
+    outputs = [process.communicate(timeout=120)[0] for process in processes]
+
+    assert not [output for output in outputs if "Error" in output]
+    assert [output for output in outputs if "Applied" in output] == [
+        "Applied migrations 1, 2, 3, 4.\nDatabase schema is at version 4.\n"
+    ]
+    with engine.connect() as connection:
+        versions = connection.execute(text("SELECT version FROM schema_migrations ORDER BY version")).scalars().all()
+        row = connection.execute(text("SELECT year_month, duration_seconds, revision FROM trips")).one()
+    assert (versions, tuple(row)) == ([1, 2, 3, 4], ("2024-02", 5400, 0))
+
+
+def test_importing_the_app_does_not_touch_the_database(tmp_path):
+    path = tmp_path / "untouched.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{path}", "JOB_WORKERS": "0"}
+    subprocess.run([sys.executable, "-c", "import main"], cwd=tmp_path, env={**env, "PYTHONPATH": BACKEND}, check=True)
+    assert not path.exists()
+
+    subprocess.run([sys.executable, os.path.join(BACKEND, "migrate.py")], cwd=tmp_path,
+                   env={**env, "PYTHONPATH": BACKEND}, check=True, capture_output=True)
+    assert path.exists()
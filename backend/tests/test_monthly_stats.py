@@ -0,0 +1,51 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, insert, text
+
+import main
+from models import Maintenance, Trip
+
+
+def test_next_month_start_rolls_over_the_year():
+    assert main.next_month_start(datetime(2024, 12, 31, 23, 59)) == datetime(2025, 1, 1)
+    assert main.next_month_start(datetime(2024, 2, 1)) == datetime(2024, 3, 1)
+
+
+def test_year_month_is_filled_on_every_insert_path(client, db):
+    client.post("/maintenance", json={"vehicle_id": 1, "description": "Oil", "cost": 80, "maintenance_date": "2024-02-29"})
+    db.execute(insert(Trip), [{
+        "driver_id": 1, "vehicle_id": 1, "start_location": "Depot", "end_location": "Port",
+        "start_time": datetime(2024, 12, 31, 23, 0), "end_time": datetime(2025, 1, 1, 1, 0)
+    }])
+    db.commit()
+
+    assert db.query(Maintenance.year_month).scalar() == "2024-02"
+    assert db.query(Trip.year_month).scalar() == "2024-12"
+
+
+def test_first_month_counts_only_the_days_inside_the_window(client, monkeypatch):
+    today = date.today()
+    window_start = datetime(today.year - 1, today.month, 15)
+    monkeypatch.setattr(main, "stats_window_start", lambda: window_start)
+    next_month = main.next_month_start(window_start)
+    for start in (window_start - timedelta(days=5), window_start + timedelta(days=5), next_month + timedelta(days=1)):
+        client.post("/trips", json={
+            "driver_id": 1, "vehicle_id": 1, "start_location": "Depot", "end_location": "Port",
+            "start_time": start.isoformat(), "end_time": (start + timedelta(hours=1)).isoformat()
+        })
+        client.post("/maintenance", json={
+            "vehicle_id": 1, "description": "Service", "cost": 100, "maintenance_date": start.date().isoformat()
+        })
+
+    expected_months = [window_start.strftime("%Y-%m"), next_month.strftime("%Y-%m")]
+    trips = client.get("/stats/monthly-trips").json()
+    assert [(row["month"], row["trip_count"]) for row in trips] == list(zip(expected_months, [1, 1]))
+    costs = client.get("/stats/maintenance-costs").json()
+    assert [(row["month"], row["cost"]) for row in costs] == list(zip(expected_months, [100, 100]))
+
+
+def test_monthly_groupings_read_the_covering_index(db):
+    statement = db.query(Maintenance.year_month, func.sum(Maintenance.cost)).group_by(Maintenance.year_month).statement
+    sql = str(statement.compile(compile_kwargs={"literal_binds": True}))
+    plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert "COVERING INDEX ix_maintenance_year_month_cost" in plan
@@ -0,0 +1,59 @@
+import pytest
+from fastapi import HTTPException
+
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def add_vehicles(client, count):
+    return [client.post("/vehicles", json={"name": f"Van {index}"}).json()["id"] for index in range(count)]
+
+
+def test_cursor_round_trips_and_rejects_garbage():
+    assert decode_cursor(encode_cursor(42)) == 42
+    for cursor in ("not-base64!", encode_cursor(42)[:-3], "eyJhZnRlciI6ICJ4In0"):
+        with pytest.raises(HTTPException):
+            decode_cursor(cursor)
+
+
+def test_keyset_pages_cover_every_row_once(client):
+    vehicle_ids = add_vehicles(client, 7)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/vehicles", params=params)
+        seen += [vehicle["id"] for vehicle in response.json()]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert seen == vehicle_ids
+
+
+def test_deleting_a_seen_row_does_not_shift_the_next_page(client):
+    add_vehicles(client, 4)
+    first = client.get("/vehicles", params={"limit": 2})
+    client.delete(f"/vehicles/{first.json()[0]['id']}")
+
+    second = client.get("/vehicles", params={"limit": 2, "cursor": first.headers[NEXT_CURSOR_HEADER]})
+    assert [vehicle["name"] for vehicle in second.json()] == ["Van 2", "Van 3"]
+
+
+def test_without_limit_or_cursor_the_whole_list_is_returned(client):
+    add_vehicles(client, 3)
+    response = client.get("/vehicles")
+    assert len(response.json()) == 3
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_fields_project_columns_and_keep_the_id(client):
+    add_vehicles(client, 2)
+    rows = client.get("/vehicles", params={"fields": "name"}).json()
+    assert [set(row) for row in rows] == [{"id", "name"}] * 2
+
+    response = client.get("/vehicles", params={"fields": "name,hashed_password"})
+    assert response.status_code == 400
+
+
+def test_page_size_is_capped(client):
+    assert client.get("/vehicles", params={"limit": 100000}).status_code == 422
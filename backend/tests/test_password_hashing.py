@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+import pytest
+from passlib.context import CryptContext
+
+import main
+from models import User
+from password_hashing import PasswordHasher, PasswordHashingBusy
+
+
+class BlockingContext:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password):
+        self.release.wait(5)
+        return f"hashed-{password}"
+
+
+def test_submissions_beyond_the_pool_and_queue_fail_fast():
+    async def scenario():
+        context = BlockingContext()
+        hasher = PasswordHasher(context, max_workers=1, max_pending=1)
+        running = [asyncio.ensure_future(hasher.hash(str(index))) for index in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHashingBusy):
+            await hasher.hash("overflow")
+        context.release.set()
+        results = await asyncio.gather(*running)
+        # Finished hashes free their slots again
+        results.append(await hasher.hash("later"))
+        hasher.shutdown()
+        return results
+
+    assert asyncio.run(scenario()) == ["hashed-0", "hashed-1", "hashed-later"]
+
+
+def test_a_full_pool_answers_login_with_429(client, monkeypatch):
+    class BusyHasher:
+        async def hash(self, password):
+            raise PasswordHashingBusy()
+
+        async def verify_and_update(self, password, hashed_password):
+            raise PasswordHashingBusy()
+
+    monkeypatch.setattr(main, "password_hasher", BusyHasher())
+    response = client.post("/register", json={"email": "ops@example.com", "password": "secret"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_rehashes_passwords_hashed_with_an_old_cost(client, db, monkeypatch):
+    client.post("/register", json={"email": "ops@example.com", "password": "secret"})
+    old_hash = db.query(User.hashed_password).scalar()
+    stronger = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=main.BCRYPT_ROUNDS + 1)
+    monkeypatch.setattr(main, "password_hasher", PasswordHasher(stronger, 1, 1))
+
+    response = client.post("/token", data={"username": "ops@example.com", "password": "secret"})
+    assert response.status_code == 200
+    db.expire_all()
+    new_hash = db.query(User.hashed_password).scalar()
+    assert new_hash != old_hash and not stronger.needs_update(new_hash)
+    assert client.post("/token", data={"username": "ops@example.com", "password": "wrong"}).status_code == 401
@@ -0,0 +1,65 @@
+from conditional import REVISION_HEADER, etag_matches, make_etag
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = make_etag("vehicles", 3)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert make_etag("vehicles", 3) != make_etag("vehicles", 4)
+
+
+def test_unchanged_lists_are_answered_with_304(client):
+    client.post("/vehicles", json={"name": "Van"})
+    first = client.get("/vehicles")
+    etag = first.headers["ETag"]
+
+    repeat = client.get("/vehicles", headers={"If-None-Match": etag})
+    assert (repeat.status_code, repeat.content, repeat.headers["ETag"]) == (304, b"", etag)
+
+    client.post("/vehicles", json={"name": "Truck"})
+    changed = client.get("/vehicles", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    # Parameters are part of the tag
+    assert client.get("/vehicles", params={"limit": 1}).headers["ETag"] != changed.headers["ETag"]
+
+
+def test_since_returns_changes_and_tombstones_after_a_revision(client):
+    van = client.post("/vehicles", json={"name": "Van"}).json()
+    truck = client.post("/vehicles", json={"name": "Truck"}).json()
+    revision = int(client.get("/vehicles").headers[REVISION_HEADER])
+
+    client.put(f"/vehicles/{truck['id']}", json={"name": "Truck 2"})
+    client.delete(f"/vehicles/{van['id']}")
+    client.post("/vehicles", json={"name": "Bus"})
+
+    delta = client.get("/vehicles", params={"since": revision}).json()
+    assert [vehicle["name"] for vehicle in delta["changed"]] == ["Truck 2", "Bus"]
+    assert [row["id"] for row in delta["deleted"]] == [van["id"]]
+    assert delta["revision"] > revision
+    assert client.get("/vehicles", params={"since": delta["revision"]}).json() == {
+        "revision": delta["revision"], "changed": [], "deleted": []
+    }
+
+
+def test_a_reused_id_supersedes_its_tombstone(client):
+    van = client.post("/vehicles", json={"name": "Van"}).json()
+    revision = int(client.get("/vehicles").headers[REVISION_HEADER])
+    client.delete(f"/vehicles/{van['id']}")
+    # SQLite hands the highest id out again once it is deleted
+    truck = client.post("/vehicles", json={"name": "Truck"}).json()
+    assert truck["id"] == van["id"]
+
+    delta = client.get("/vehicles", params={"since": revision}).json()
+    assert ([vehicle["name"] for vehicle in delta["changed"]], delta["deleted"]) == (["Truck"], [])
+
+
+def test_since_cannot_be_combined_with_pagination(client):
+    assert client.get("/trips", params={"since": 0, "limit": 10}).status_code == 400
+
+
+def test_stats_carry_an_etag_that_changes_with_writes(client):
+    etag = client.get("/stats/summary").headers["ETag"]
+    assert client.get("/stats/summary", headers={"If-None-Match": etag}).status_code == 304
+    client.post("/drivers", json={"name": "Ada"})
+    assert client.get("/stats/summary", headers={"If-None-Match": etag}).status_code == 200
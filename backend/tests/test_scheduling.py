@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+
+import main
+from scheduling import IntervalIndex, ScheduleIndex
+
+START = datetime(2024, 5, 1, 9, 0)
+
+
+def hours(count):
+    return timedelta(hours=count)
+
+
+def test_interval_index_finds_overlaps_of_the_half_open_window():
+    index = IntervalIndex()
+    index.add(START, START + hours(2), 1)
+    index.add(START + hours(3), START + hours(4), 2)
+    index.add(START - hours(48), START + hours(48), 3)
+
+    assert [trip_id for _, _, trip_id in index.overlapping(START + hours(1), START + hours(3))] == [3, 1]
+    assert index.first_overlap(START + hours(100), START + hours(101)) is None
+    # Touching intervals do not overlap
+    assert [trip_id for _, _, trip_id in index.overlapping(START + hours(2), START + hours(3))] == [3]
+
+    index.remove(START - hours(48), START + hours(48), 3)
+    assert len(index) == 2
+    assert index.first_overlap(START + hours(2), START + hours(3)) is None
+
+
+def test_interval_index_ignores_timezone_like_the_database():
+    index = IntervalIndex()
+    index.add(START.replace(tzinfo=timezone.utc), START + hours(1), 1)
+    assert index.first_overlap(START, START + hours(1)) == 1
+
+
+def test_schedule_index_loads_each_resource_once():
+    loads = []
+
+    def loader(kind, resource_id):
+        loads.append((kind, resource_id))
+        return [(START, START + hours(1), 7)] if (kind, resource_id) == ("vehicle", 2) else []
+
+    schedule = ScheduleIndex(loader)
+    assert schedule.find_conflict(1, 2, START, START + hours(2)) == 7
+    assert schedule.find_conflict(1, 3, START, START + hours(2)) is None
+
+    schedule.add(1, 3, START, START + hours(2), 8)
+    assert schedule.find_conflict(1, 4, START + hours(1), START + hours(3)) == 8
+    assert not schedule.is_free("vehicle", 3, START, START + hours(1))
+    assert loads == [("driver", 1), ("vehicle", 2), ("vehicle", 3)]
+
+
+def test_create_trip_uses_the_interval_index_when_enabled(client, monkeypatch):
+    monkeypatch.setattr(main, "trip_schedule", ScheduleIndex(main.load_trip_intervals))
+    trip = {
+        "driver_id": 1, "vehicle_id": 1, "start_location": "Depot", "end_location": "Port",
+        "start_time": START.isoformat(), "end_time": (START + hours(2)).isoformat()
+    }
+    assert client.post("/trips", json=trip).status_code == 200
+
+    assert client.post("/trips", json={**trip, "vehicle_id": 2}).status_code == 400
+    # A fresh index loads the booking back from the database
+    main.trip_schedule.clear()
+    assert client.post("/trips", json={**trip, "driver_id": 2}).status_code == 400
+    assert client.post("/trips", json={**trip, "driver_id": 2, "vehicle_id": 2}).status_code == 200
@@ -0,0 +1,59 @@
+import json
+from datetime import date, datetime
+
+import pytest
+
+import main
+import serialization
+from serialization import dumps_json, wants_msgpack
+
+msgpack = pytest.importorskip("msgpack")
+
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+def add_records(client):
+    vehicle_id = client.post("/vehicles", json={"name": "Van", "license_expiry_date": "2030-01-31"}).json()["id"]
+    client.post("/trips", json={
+        "driver_id": 1, "vehicle_id": vehicle_id, "start_location": "Depot", "end_location": "Port",
+        "start_time": "2024-08-01T08:00:00", "end_time": "2024-08-01T09:30:00"
+    })
+
+
+def test_accept_header_selects_msgpack_only_explicitly():
+    assert wants_msgpack("application/x-msgpack;q=0.9, application/json")
+    assert not wants_msgpack("*/*")
+    assert not wants_msgpack(None)
+
+
+@pytest.mark.parametrize("orjson", [serialization.orjson, None])
+def test_json_encoders_write_dates_like_pydantic(monkeypatch, orjson):
+    monkeypatch.setattr(serialization, "orjson", orjson)
+    payload = {"day": date(2024, 8, 1), "at": datetime(2024, 8, 1, 8, 0, 30), "cost": 1.5}
+    assert json.loads(dumps_json(payload)) == {"day": "2024-08-01", "at": "2024-08-01T08:00:30", "cost": 1.5}
+
+
+@pytest.mark.parametrize("path", ["/vehicles", "/trips", "/trips?fields=start_time"])
+def test_fast_lists_match_the_validated_ones(client, monkeypatch, path):
+    add_records(client)
+    validated = client.get(path).json()
+    monkeypatch.setattr(main, "FAST_LIST_RESPONSES", True)
+    fast = client.get(path)
+
+    assert fast.json() == validated
+    assert "Accept" in fast.headers["Vary"]
+
+
+def test_msgpack_lists_carry_the_same_rows(client):
+    add_records(client)
+    response = client.get("/trips", headers=MSGPACK)
+
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content) == client.get("/trips").json()
+    # The representation is part of the ETag
+    assert response.headers["ETag"] != client.get("/trips").headers["ETag"]
+
+
+def test_msgpack_is_refused_when_not_installed(client, monkeypatch):
+    monkeypatch.setattr(serialization, "msgpack", None)
+    assert client.get("/vehicles", headers=MSGPACK).status_code == 406
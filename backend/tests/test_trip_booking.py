@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+START = datetime(2024, 5, 1, 9, 0)
+
+
+def trip(driver_id, vehicle_id, start, end):
+    return {
+        "driver_id": driver_id, "vehicle_id": vehicle_id, "start_location": "Depot", "end_location": "Port",
+        "start_time": start.isoformat(), "end_time": end.isoformat()
+    }
+
+
+def test_overlapping_trips_are_rejected(client):
+    assert client.post("/trips", json=trip(1, 1, START, START + timedelta(hours=2))).status_code == 200
+
+    assert client.post("/trips", json=trip(1, 2, START + timedelta(hours=1), START + timedelta(hours=3))).status_code == 400
+    assert client.post("/trips", json=trip(2, 1, START - timedelta(hours=1), START + timedelta(minutes=1))).status_code == 400
+    assert client.post("/trips", json=trip(1, 1, START + timedelta(hours=2), START + timedelta(hours=3))).status_code == 200
+
+
+def test_trip_longer_than_any_previous_one_still_conflicts(client):
+    client.post("/trips", json=trip(1, 1, START, START + timedelta(hours=1)))
+    long_trip = trip(1, 1, START - timedelta(days=30), START + timedelta(days=30))
+    assert client.post("/trips", json=long_trip).status_code == 400
+
+    client.post("/trips", json=trip(2, 2, START - timedelta(days=20), START + timedelta(days=20)))
+    # Starts long before the probe window but is still running inside it
+    assert client.post("/trips", json=trip(2, 3, START, START + timedelta(hours=1))).status_code == 400
+    assert client.post("/trips", json=trip(3, 2, START + timedelta(days=19), START + timedelta(days=21))).status_code == 400
+
+
+def test_bulk_booking_checks_the_stored_and_the_batch_trips(client):
+    client.post("/trips", json=trip(1, 1, START - timedelta(days=10), START + timedelta(days=10)))
+
+    report = client.post("/trips/bulk", json=[
+        trip(1, 2, START, START + timedelta(hours=1)),
+        trip(2, 3, START, START + timedelta(hours=1)),
+        trip(2, 4, START + timedelta(minutes=30), START + timedelta(hours=2)),
+        trip(3, 1, START + timedelta(days=11), START + timedelta(days=12)),
+    ]).json()
+    assert [result["accepted"] for result in report["results"]] == [False, True, False, True]
+    assert (report["accepted"], report["rejected"]) == (2, 2)
@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+
+
+def test_licence_expiry_of_new_vehicle_is_upcoming(client):
+    expiry = date.today() + timedelta(days=10)
+    vehicle = client.post("/vehicles", json={
+        "name": "Van 1", "make": "Ford", "registration_number": "AB-123",
+        "license_expiry_date": expiry.isoformat(), "year_of_car": 2020
+    }).json()
+
+    assert vehicle["license_expiry_date"] == expiry.isoformat()
+    assert vehicle["year_of_car"] == 2020
+    items = client.get("/upcoming", params={"within_days": 30}).json()
+    assert items == [{
+        "kind": "license", "vehicle_id": vehicle["id"], "vehicle_name": "Van 1",
+        "source_id": vehicle["id"], "due_date": expiry.isoformat(), "days_until_due": 10
+    }]
+
+
+def test_updated_licence_expiry_moves_the_item(client):
+    vehicle = client.post("/vehicles", json={"name": "Van 2"}).json()
+    assert client.get("/upcoming", params={"within_days": 30}).json() == []
+
+    expiry = date.today() + timedelta(days=5)
+    updated = client.put(f"/vehicles/{vehicle['id']}", json={
+        "name": "Van 2", "license_expiry_date": expiry.isoformat()
+    }).json()
+    assert updated["license_expiry_date"] == expiry.isoformat()
+    assert [item["due_date"] for item in client.get("/upcoming", params={"within_days": 30}).json()] == [expiry.isoformat()]
+
+    client.put(f"/vehicles/{vehicle['id']}", json={"name": "Van 2"})
+    assert client.get("/upcoming", params={"within_days": 30}).json() == []
+
+
+def test_maintenance_due_dates_are_listed_soonest_first(client):
+    first = client.post("/vehicles", json={"name": "Truck A"}).json()
+    second = client.post("/vehicles", json={
+        "name": "Truck B", "license_expiry_date": (date.today() + timedelta(days=40)).isoformat()
+    }).json()
+    client.post("/maintenance", json={
+        "vehicle_id": first["id"], "description": "Service", "maintenance_date": date.today().isoformat(),
+        "cost": 100.0, "next_maintenance_date": (date.today() + timedelta(days=20)).isoformat()
+    })
+
+    items = client.get("/upcoming").json()
+    assert [(item["kind"], item["vehicle_id"]) for item in items] == [
+        ("maintenance", first["id"]), ("license", second["id"])
+    ]
+    assert client.get("/upcoming", params={"kind": "license"}).json()[0]["vehicle_id"] == second["id"]
+    assert client.get("/upcoming", params={"limit": 1}).json()[0]["kind"] == "maintenance"
@@ -0,0 +1,83 @@
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+def token_digest(token: str) -> str:
+    """
+    Returns the SHA-256 hex digest identifying a token without revealing it.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified access tokens and the principals they carry.
+
+    Entries expire at the token's own exp claim, so a cached token is never
+    trusted longer than the JWT itself. Revoked tokens are remembered until
+    they would have expired and are refused even if presented again.
+
+    Tokens are held by their token_digest(), so neither the cache nor the
+    revocations it receives from other workers carry usable credentials.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._revoked = {}
+        self._lock = Lock()
+
+    def get(self, token: str):
+        """
+        Returns the cached principal for token, or None if unknown or expired.
+        """
+        now = time.time()
+        digest = token_digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, token: str, principal, expires_at: float):
+        """
+        Caches a verified token until expires_at (a UNIX timestamp).
+        """
+        digest = token_digest(token)
+        with self._lock:
+            if digest in self._revoked:
+                return
+            self._entries[digest] = (principal, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def revoke(self, digest: str, expires_at: float):
+        """
+        Evicts the token with the given token_digest() and refuses it until
+        expires_at.
+        """
+        now = time.time()
+        with self._lock:
+            self._entries.pop(digest, None)
+            self._revoked[digest] = expires_at
+            for revoked_digest, revoked_until in list(self._revoked.items()):
+                if revoked_until <= now:
+                    del self._revoked[revoked_digest]
+
+    def is_revoked(self, token: str) -> bool:
+        """
+        Returns True if token was revoked and has not expired yet.
+        """
+        with self._lock:
+            revoked_until = self._revoked.get(token_digest(token))
+            return revoked_until is not None and revoked_until > time.time()
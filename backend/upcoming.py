@@ -0,0 +1,157 @@
+"""
+Queue of upcoming maintenance and licence expiry dates, one row per vehicle
+and kind, refreshed by the vehicle and maintenance write paths.
+"""
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, aliased
+
+from models import DueItem, Maintenance, Vehicle
+
+
+# Upcoming maintenance and licence expiry queue
+DUE_MAINTENANCE = "maintenance"
+DUE_LICENSE = "license"
+
+
+def due_item_source_statement(vehicle_ids: Optional[List[int]] = None):
+    """
+    Selects the dates the due_items rows of some or all vehicles derive from.
+
+    The latest maintenance record of each vehicle (by maintenance_date, then
+    id) is found with one backwards probe on ix_maintenance_vehicle_date;
+    older records are superseded and never due.
+
+    Args:
+        vehicle_ids (Optional[List[int]]): The vehicles to compute, all if None.
+
+    Returns:
+        Select: The statement; pass its rows to due_item_dicts.
+    """
+    latest = aliased(Maintenance)
+    latest_id = select(latest.id).where(latest.vehicle_id == Vehicle.id).order_by(
+        latest.maintenance_date.desc(), latest.id.desc()
+    ).limit(1).scalar_subquery()
+    statement = select(
+        Vehicle.id, Vehicle.license_expiry_date, Maintenance.id, Maintenance.next_maintenance_date
+    ).outerjoin(Maintenance, Maintenance.id == latest_id)
+    if vehicle_ids is not None:
+        statement = statement.where(Vehicle.id.in_(vehicle_ids))
+    return statement
+
+
+def due_item_dicts(source_rows) -> List[dict]:
+    """
+    Turns due_item_source_statement() rows into row dicts for DueItem.
+    """
+    rows = []
+    for vehicle_id, license_expiry_date, maintenance_id, next_maintenance_date in source_rows:
+        if license_expiry_date is not None:
+            rows.append({"kind": DUE_LICENSE, "vehicle_id": vehicle_id, "source_id": vehicle_id, "due_date": license_expiry_date})
+        if next_maintenance_date is not None:
+            rows.append({"kind": DUE_MAINTENANCE, "vehicle_id": vehicle_id, "source_id": maintenance_id, "due_date": next_maintenance_date})
+    return rows
+
+
+def due_item_rows(db: Session, vehicle_ids: Optional[List[int]] = None) -> List[dict]:
+    """
+    Computes the due_items rows of some or all vehicles.
+
+    Args:
+        db (Session): The database session.
+        vehicle_ids (Optional[List[int]]): The vehicles to compute, all if None.
+
+    Returns:
+        list: Row dicts for DueItem.
+    """
+    return due_item_dicts(db.execute(due_item_source_statement(vehicle_ids)))
+
+
+def refresh_due_items(db: Session, vehicle_ids):
+    """
+    Recomputes the due items of the given vehicles inside the caller's transaction.
+
+    Call after flushing any vehicle or maintenance change of those vehicles.
+
+    Args:
+        db (Session): The database session.
+        vehicle_ids: The ids of the vehicles whose records changed.
+    """
+    vehicle_ids = sorted(set(vehicle_ids))
+    if not vehicle_ids:
+        return
+    db.flush()
+    db.query(DueItem).filter(DueItem.vehicle_id.in_(vehicle_ids)).delete(synchronize_session=False)
+    rows = due_item_rows(db, vehicle_ids)
+    if rows:
+        db.execute(insert(DueItem), rows)
+
+
+def rebuild_due_items(db: Session):
+    """
+    Recomputes the whole due items queue.
+
+    Args:
+        db (Session): The database session.
+    """
+    db.query(DueItem).delete(synchronize_session=False)
+    rows = due_item_rows(db)
+    if rows:
+        db.execute(insert(DueItem), rows)
+    db.commit()
+
+
+def ensure_due_items(db: Session):
+    """
+    Builds the due items queue once for databases created before it existed.
+    """
+    if db.query(DueItem.vehicle_id).first() is None and db.query(Vehicle.id).first() is not None:
+        rebuild_due_items(db)
+
+
+def due_items_statement(today: date, limit: Optional[int], within_days: Optional[int], kind: Optional[str]):
+    """
+    Selects the due items queue in due date order; see due_items.
+    """
+    statement = select(
+        DueItem.kind, DueItem.vehicle_id, Vehicle.name, DueItem.source_id, DueItem.due_date
+    ).join(Vehicle, Vehicle.id == DueItem.vehicle_id).order_by(DueItem.due_date, DueItem.kind, DueItem.vehicle_id)
+    if within_days is not None:
+        statement = statement.where(DueItem.due_date <= today + timedelta(days=within_days))
+    if kind is not None:
+        statement = statement.where(DueItem.kind == kind)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+def due_item_schemas(today: date, rows) -> List[dict]:
+    """
+    Turns due_items_statement() rows into DueItemSchema dicts.
+    """
+    return [
+        {
+            "kind": item_kind, "vehicle_id": vehicle_id, "vehicle_name": vehicle_name,
+            "source_id": source_id, "due_date": due_date, "days_until_due": (due_date - today).days
+        }
+        for item_kind, vehicle_id, vehicle_name, source_id, due_date in rows
+    ]
+
+
+def due_items(db: Session, limit: Optional[int], within_days: Optional[int], kind: Optional[str]) -> List[dict]:
+    """
+    Reads the due items queue in due date order.
+
+    Args:
+        db (Session): The database session.
+        limit (Optional[int]): The maximum number of items.
+        within_days (Optional[int]): Only items due within this many days.
+        kind (Optional[str]): Only items of this kind.
+
+    Returns:
+        list: DueItemSchema dicts.
+    """
+    today = date.today()
+    return due_item_schemas(today, db.execute(due_items_statement(today, limit, within_days, kind)))